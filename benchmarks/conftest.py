@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_DIR, "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubServer, redirect_http
+
+# the resolutions exercised by scripts/test_plugin.py
+RESOLUTIONS = [
+    [400, 300], # Inky wHAT
+    [640, 400], # Inky Impression 4"
+    [600, 448], # Inky Impression 5.7"
+    [800, 480], # Inky Impression 7.3"
+]
+ORIENTATIONS = ["horizontal", "vertical"]
+
+# api keys only need to be present, the stub server accepts anything
+API_KEYS = {
+    "NASA_SECRET": "benchmark",
+    "UNSPLASH_ACCESS_KEY": "benchmark",
+    "OPEN_AI_SECRET": "benchmark",
+    "OPEN_WEATHER_MAP_SECRET": "benchmark",
+    "GITHUB_SECRET": "benchmark",
+}
+
+def has_chromium():
+    return shutil.which("chromium-headless-shell") is not None
+
+requires_chromium = pytest.mark.skipif(not has_chromium(), reason="chromium-headless-shell is not installed")
+
+@pytest.fixture(scope="session")
+def stub_server():
+    server = StubServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def offline(stub_server, monkeypatch):
+    """Routes every plugin request to the stub server."""
+    for key, value in API_KEYS.items():
+        monkeypatch.setenv(key, value)
+    # the openai client talks to its api with httpx, which honours the base url setting
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{stub_server.base_url}/api.openai.com/v1")
+    # every round sends its requests, instead of sharing the responses of the previous round
+    monkeypatch.setattr("utils.http_utils.DEFAULT_MAX_AGE", 0)
+    with redirect_http(stub_server.base_url):
+        yield stub_server
+
+@pytest.fixture
+def device_config_factory(tmp_path, monkeypatch):
+    """Returns a function creating a Config, backed by a temporary copy of the development config."""
+    from config import Config
+    from utils.render_cache import configure_render_cache
+
+    monkeypatch.setattr(Config, "current_image_file", str(tmp_path / "current_image.png"))
+    monkeypatch.setattr(Config, "plugin_image_dir", str(tmp_path / "plugins"))
+    monkeypatch.setattr("utils.data_cache.DATA_CACHE_DIR", str(tmp_path / "data"))
+    os.makedirs(tmp_path / "plugins", exist_ok=True)
+
+    def create(resolution=(800, 480), orientation="horizontal", **values):
+        with open(os.path.join(SRC_DIR, "config", "device_dev.json")) as f:
+            config = json.load(f)
+        config.update({
+            "display_type": "mock",
+            "resolution": list(resolution),
+            "orientation": orientation,
+            "timezone": "Europe/Warsaw",
+            "time_format": "24h",
+            "output_dir": str(tmp_path / "mock_display_output"),
+            "plugin_sandbox": {"enabled": False},
+            "tracing": {"enabled": False},
+            "render_cache": {"enabled": False},
+        }, **values)
+
+        config_file = tmp_path / "device.json"
+        config_file.write_text(json.dumps(config))
+        monkeypatch.setattr(Config, "config_file", str(config_file))
+        device_config = Config()
+        configure_render_cache(device_config)
+        return device_config
+
+    return create
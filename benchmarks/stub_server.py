@@ -0,0 +1,116 @@
+"""Local stand-in for the web APIs used by plugins, serving the recorded responses in fixtures/.
+
+Requests are matched on host and path, ignoring the query string, against the patterns in
+fixtures/routes.json. redirect_http() points requests and urllib (used by feedparser) at the
+server, so plugins run unchanged and never reach the network.
+"""
+import fnmatch
+import json
+import mimetypes
+import os
+import threading
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+mimetypes.add_type("text/calendar", ".ics")
+
+class StubServer:
+    """Serves the fixture of each route on a local port, answering 404 for unknown routes."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        with open(os.path.join(fixtures_dir, "routes.json")) as f:
+            self.routes = json.load(f)
+        self.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def resolve(self, route):
+        """Returns the fixture file for a 'host/path' route, or None."""
+        for pattern, fixture in self.routes.items():
+            if fnmatch.fnmatchcase(route, pattern):
+                return os.path.join(self.fixtures_dir, fixture)
+        return None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                route = urlsplit(self.path).path.lstrip("/")
+                stub.requests.append(route)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+                fixture = stub.resolve(route)
+                if fixture is None:
+                    self.send_error(404, f"No fixture for {route}")
+                    return
+                with open(fixture, "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", mimetypes.guess_type(fixture)[0] or "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _serve
+            do_POST = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def rewrite_url(url, base_url):
+    """Maps https://host/path?query to <base_url>/host/path?query."""
+    parts = urlsplit(url)
+    if url.startswith(base_url):
+        return url
+    rewritten = f"{base_url}/{parts.netloc}{parts.path}"
+    return f"{rewritten}?{parts.query}" if parts.query else rewritten
+
+@contextmanager
+def redirect_http(base_url):
+    """Sends the http requests made with requests and urllib to the stub server."""
+    adapter_send = requests.adapters.HTTPAdapter.send
+    opener_open = urllib.request.OpenerDirector.open
+
+    def send(adapter, request, *args, **kwargs):
+        request.url = rewrite_url(request.url, base_url)
+        return adapter_send(adapter, request, *args, **kwargs)
+
+    def open_url(opener, fullurl, *args, **kwargs):
+        if isinstance(fullurl, str):
+            fullurl = rewrite_url(fullurl, base_url)
+        else:
+            fullurl.full_url = rewrite_url(fullurl.full_url, base_url)
+        return opener_open(opener, fullurl, *args, **kwargs)
+
+    requests.adapters.HTTPAdapter.send = send
+    urllib.request.OpenerDirector.open = open_url
+    try:
+        yield
+    finally:
+        requests.adapters.HTTPAdapter.send = adapter_send
+        urllib.request.OpenerDirector.open = opener_open
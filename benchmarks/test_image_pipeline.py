@@ -0,0 +1,77 @@
+"""Benchmarks the post processing applied to every image before it is sent to the display."""
+import os
+
+import pytest
+from PIL import Image
+
+from conftest import RESOLUTIONS, ORIENTATIONS
+from stub_server import FIXTURES_DIR
+
+ENHANCEMENT_SETTINGS = {"brightness": 1.1, "contrast": 1.2, "saturation": 1.3, "sharpness": 1.5}
+
+@pytest.fixture(scope="module")
+def photo():
+    with Image.open(os.path.join(FIXTURES_DIR, "photo.jpg")) as img:
+        return img.convert("RGB")
+
+def display_image(photo, resolution):
+    """An image the size of the display, like the ones plugins render."""
+    return photo.resize(tuple(resolution))
+
+def resolution_params():
+    return [pytest.param(resolution, id=f"{resolution[0]}x{resolution[1]}") for resolution in RESOLUTIONS]
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+@pytest.mark.parametrize("resolution", resolution_params())
+def test_resize_image(benchmark, photo, resolution, orientation):
+    from utils.image_utils import change_orientation, resize_image
+
+    benchmark.group = "resize_image"
+    image = benchmark(lambda: resize_image(change_orientation(photo, orientation), resolution))
+    assert list(image.size) == list(resolution)
+
+@pytest.mark.parametrize("resolution", resolution_params())
+def test_apply_image_enhancement(benchmark, photo, resolution):
+    from utils.image_utils import apply_image_enhancement
+
+    image = display_image(photo, resolution)
+    benchmark.group = "apply_image_enhancement"
+    enhanced = benchmark(apply_image_enhancement, image, ENHANCEMENT_SETTINGS)
+    assert enhanced.size == image.size
+
+@pytest.mark.parametrize("resolution", resolution_params())
+def test_compute_image_hash(benchmark, photo, resolution):
+    from utils.image_utils import compute_image_hash
+
+    image = display_image(photo, resolution)
+    benchmark.group = "compute_image_hash"
+    assert len(benchmark(compute_image_hash, image)) == 64
+
+@pytest.mark.parametrize("resolution", resolution_params())
+def test_split_image_for_bi_color_epd(benchmark, photo, resolution):
+    from display.waveshare_display import split_image_for_bi_color_epd
+
+    image = display_image(photo, resolution)
+    benchmark.group = "split_image_for_bi_color_epd"
+    black_layer, red_layer = benchmark(split_image_for_bi_color_epd, image)
+    assert black_layer.mode == red_layer.mode == "1"
+
+@pytest.mark.parametrize("playlists", [1, 10])
+def test_write_config(benchmark, device_config_factory, playlists):
+    device_config = device_config_factory()
+    playlist_manager = device_config.get_playlist_manager()
+    for index in range(playlists):
+        name = f"Benchmark {index}"
+        playlist_manager.add_playlist(name, f"{index % 24:02d}:00", f"{index % 24:02d}:30")
+        playlist = playlist_manager.get_playlist(name)
+        for plugin_index in range(5):
+            playlist.add_plugin({
+                "plugin_id": "clock",
+                "name": f"Clock {plugin_index}",
+                "plugin_settings": {"selectedClockFace": "Cyfrowy Zegar"},
+                "refresh": {"interval": 3600}
+            })
+
+    benchmark.group = "write_config"
+    benchmark(device_config.write_config)
+    assert os.path.getsize(device_config.config_file) > 0
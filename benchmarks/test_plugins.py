@@ -0,0 +1,78 @@
+"""Benchmarks generate_image of each plugin that can run offline, at every supported resolution."""
+import json
+import os
+
+import pytest
+
+from conftest import SRC_DIR, RESOLUTIONS, ORIENTATIONS, requires_chromium
+
+ROUNDS = 5
+
+# plugins returning the photo at its own size, it is resized for the display afterwards
+PHOTO_PLUGINS = ("apod", "newspaper")
+
+TODO_SETTINGS = {
+    "title": "Zadania",
+    "listStyle": "disc",
+    "fontSize": "normal",
+    "list-title[]": ["Dom", "Praca"],
+    "list[]": ["Kupić mleko\nZrobić pranie\nPosprzątać kuchnię\nPodlać kwiaty", "Raport kwartalny\nSpotkanie z zespołem"],
+}
+
+STYLE_SETTINGS = {"selectedFrame": "Rectangle", "backgroundOption": "color", "backgroundColor": "#ffffff", "textColor": "#000000"}
+
+# (case id, plugin id, settings, uses chromium, has a native implementation)
+CASES = [
+    ("clock_gradient", "clock", {"selectedClockFace": "Gradientowy Zegar", "primaryColor": "#db3246", "secondaryColor": "#000000"}, False, False),
+    ("clock_digital", "clock", {"selectedClockFace": "Cyfrowy Zegar", "primaryColor": "#ffffff", "secondaryColor": "#000000"}, False, False),
+    ("clock_divided", "clock", {"selectedClockFace": "Podzielony Zegar", "primaryColor": "#20b7ae", "secondaryColor": "#ffffff"}, False, False),
+    ("clock_word", "clock", {"selectedClockFace": "Słowy Zegar", "primaryColor": "#000000", "secondaryColor": "#ffffff"}, False, False),
+    ("comic", "comic", {"comic": "XKCD", "titleCaption": "true", "fontSize": "18"}, False, False),
+    ("apod", "apod", {}, False, False),
+    ("unsplash", "unsplash", {}, False, False),
+    ("image_url", "image_url", {"url": "https://images.example.com/photo.jpg"}, False, False),
+    ("newspaper", "newspaper", {"newspaperSlug": "ny_nyt"}, False, False),
+    ("countdown", "countdown", {**STYLE_SETTINGS, "title": "Wakacje", "date": "2030-07-01"}, True, True),
+    ("year_progress", "year_progress", dict(STYLE_SETTINGS), True, True),
+    ("todo_list", "todo_list", {**STYLE_SETTINGS, **TODO_SETTINGS}, True, True),
+    ("github_stars", "github", {**STYLE_SETTINGS, "githubType": "stars", "githubUsername": "fatihak", "githubRepository": "InkyPi"}, True, True),
+    ("ai_text", "ai_text", {**STYLE_SETTINGS, "title": "Dziś w historii", "textModel": "gpt-4o", "textPrompt": "Wydarzenie historyczne z dzisiejszej daty"}, True, True),
+    ("rss", "rss", {**STYLE_SETTINGS, "title": "Wiadomości", "feedUrl": "https://example.com/feed.xml", "includeImages": "false"}, True, False),
+    ("calendar", "calendar", {**STYLE_SETTINGS, "calendarURLs[]": ["https://example.com/calendar.ics"], "calendarColors[]": ["#007BFF"], "viewMode": "dayGridMonth"}, True, False),
+    ("weather", "weather", {**STYLE_SETTINGS, "latitude": "52.23", "longitude": "21.01", "units": "metric", "weatherProvider": "OpenMeteo", "customTitle": "Warszawa"}, True, False),
+]
+
+def load_plugin(plugin_id):
+    from plugins.plugin_registry import load_plugins, get_plugin_instance
+    with open(os.path.join(SRC_DIR, "plugins", plugin_id, "plugin-info.json")) as f:
+        plugin_config = json.load(f)
+    load_plugins([plugin_config])
+    return get_plugin_instance(plugin_config)
+
+def get_params():
+    for case_id, plugin_id, settings, uses_chromium, has_native in CASES:
+        backends = ["chromium", "native"] if has_native else ["chromium" if uses_chromium else "pillow"]
+        for backend in backends:
+            marks = [requires_chromium] if backend == "chromium" else []
+            for resolution in RESOLUTIONS:
+                for orientation in ORIENTATIONS:
+                    yield pytest.param(plugin_id, settings, backend, resolution, orientation, marks=marks,
+                                       id=f"{case_id}-{backend}-{resolution[0]}x{resolution[1]}-{orientation}")
+
+@pytest.mark.parametrize("plugin_id,settings,backend,resolution,orientation", list(get_params()))
+def test_generate_image(benchmark, offline, device_config_factory, monkeypatch, plugin_id, settings, backend, resolution, orientation):
+    device_config = device_config_factory(resolution, orientation)
+    plugin = load_plugin(plugin_id)
+    # every round fetches its data, like a refresh once the cached data expired
+    monkeypatch.setattr("plugins.base_plugin.base_plugin.read_cached_data", lambda key: None)
+    if backend in ("chromium", "native"):
+        monkeypatch.setitem(plugin.config, "render_backend", backend)
+
+    benchmark.group = f"generate_image-{plugin_id}"
+    image = benchmark.pedantic(plugin.generate_image, args=(dict(settings), device_config),
+                               rounds=ROUNDS, iterations=1, warmup_rounds=1)
+
+    assert image is not None
+    expected = resolution if orientation == "horizontal" else resolution[::-1]
+    if plugin_id not in PHOTO_PLUGINS:
+        assert list(image.size) == list(expected)
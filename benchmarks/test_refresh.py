@@ -0,0 +1,60 @@
+"""Benchmarks complete refresh cycles of the RefreshTask, from generating the image to the MockDisplay."""
+import pytest
+
+from conftest import RESOLUTIONS
+
+ROUNDS = 5
+
+CLOCK_SETTINGS = {"selectedClockFace": "Cyfrowy Zegar", "primaryColor": "#ffffff", "secondaryColor": "#000000"}
+
+@pytest.fixture
+def refresh_task_factory(device_config_factory):
+    from display.display_manager import DisplayManager
+    from plugins.plugin_registry import load_plugins
+    from refresh_task import RefreshTask
+
+    tasks = []
+
+    def create(resolution):
+        device_config = device_config_factory(resolution)
+        load_plugins(device_config.get_plugins())
+        refresh_task = RefreshTask(device_config, DisplayManager(device_config))
+        refresh_task.start()
+        tasks.append(refresh_task)
+        return device_config, refresh_task
+
+    yield create
+    for refresh_task in tasks:
+        refresh_task.stop()
+
+def reset_displayed_image(device_config):
+    # an unchanged image skips the display, so every round starts from an unknown image
+    device_config.refresh_info.image_hash = None
+
+@pytest.mark.parametrize("resolution", [pytest.param(resolution, id=f"{resolution[0]}x{resolution[1]}") for resolution in RESOLUTIONS])
+def test_manual_refresh_cycle(benchmark, offline, refresh_task_factory, resolution):
+    from refresh_task import ManualRefresh
+
+    device_config, refresh_task = refresh_task_factory(resolution)
+
+    benchmark.group = "refresh_cycle-manual"
+    benchmark.pedantic(lambda: refresh_task.manual_update(ManualRefresh("clock", dict(CLOCK_SETTINGS))),
+                       setup=lambda: reset_displayed_image(device_config), rounds=ROUNDS, warmup_rounds=1)
+    assert device_config.get_refresh_info().plugin_id == "clock"
+
+@pytest.mark.parametrize("resolution", [pytest.param(resolution, id=f"{resolution[0]}x{resolution[1]}") for resolution in RESOLUTIONS])
+def test_playlist_refresh_cycle(benchmark, offline, refresh_task_factory, resolution):
+    from refresh_task import PlaylistRefresh
+
+    device_config, refresh_task = refresh_task_factory(resolution)
+    playlist_manager = device_config.get_playlist_manager()
+    playlist = playlist_manager.playlists[0]
+    playlist.add_plugin({"plugin_id": "comic", "name": "Benchmark Comic",
+                         "plugin_settings": {"comic": "XKCD", "titleCaption": "true", "fontSize": "18"},
+                         "refresh": {"interval": 3600}})
+    plugin_instance = playlist.find_plugin("comic", "Benchmark Comic")
+
+    benchmark.group = "refresh_cycle-playlist"
+    benchmark.pedantic(lambda: refresh_task.manual_update(PlaylistRefresh(playlist, plugin_instance, force=True)),
+                       setup=lambda: reset_displayed_image(device_config), rounds=ROUNDS, warmup_rounds=1)
+    assert device_config.get_refresh_info().plugin_instance == "Benchmark Comic"
@@ -381,4 +381,7 @@ install_app_service
 echo "Update JS and CSS files"
 bash $SCRIPT_DIR/update_vendors.sh
 
+echo "Compressing static files"
+$VENV_PATH/bin/python $SCRIPT_DIR/../scripts/compress_static.py
+
 ask_for_reboot
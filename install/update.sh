@@ -102,6 +102,9 @@ sudo chmod +x $BINPATH/$APPNAME
 echo "Update JS and CSS files"
 bash $SCRIPT_DIR/update_vendors.sh
 
+echo "Compressing static files"
+$VENV_PATH/bin/python $SCRIPT_DIR/../scripts/compress_static.py
+
 echo "Restarting $APPNAME service."
 sudo systemctl daemon-reload
 sudo systemctl restart $APPNAME.service
@@ -0,0 +1,88 @@
+"""Benchmarks font loading, text measurement and line wrapping.
+
+Compares loading fonts from disk and wrapping word by word, as done before fonts were
+cached, against the cached get_font and the binary search wrap_text in utils.app_utils.
+
+    python scripts/benchmark_text.py [--iterations 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from PIL import ImageFont
+from utils.app_utils import get_font, get_text_length, wrap_text, resolve_path
+
+SAMPLE_TEXT = (
+    "Cueball is standing at a whiteboard, explaining a complicated diagram to a small audience. "
+    "Every arrow points to another arrow, and the last one points back to the first. "
+    "Megan raises her hand to ask whether the diagram was drawn before or after the meeting "
+    "that decided the meeting was unnecessary."
+)
+FONT_SIZES = [14, 18, 24, 32]
+WIDTHS = [300, 480, 800]
+
+def wrap_word_by_word(text, font, width):
+    lines = []
+    words = text.split()[::-1]
+    while words:
+        line = words.pop()
+        while words and font.getbbox(line + ' ' + words[-1])[2] < width:
+            line += ' ' + words.pop()
+        lines.append(line)
+    return lines
+
+def uncached_font(size):
+    return ImageFont.truetype(resolve_path(os.path.join("static", "fonts", "Jost.ttf")), size)
+
+def measure(label, function, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"{label:40} {elapsed * 1000:8.3f} ms")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark font loading and text wrapping.")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    def load_uncached():
+        for size in FONT_SIZES:
+            uncached_font(size)
+
+    def load_cached():
+        for size in FONT_SIZES:
+            get_font("Jost", size)
+
+    def wrap_uncached():
+        for size in FONT_SIZES:
+            font = uncached_font(size)
+            for width in WIDTHS:
+                wrap_word_by_word(SAMPLE_TEXT, font, width)
+
+    def wrap_cached():
+        for size in FONT_SIZES:
+            font = get_font("Jost", size)
+            for width in WIDTHS:
+                wrap_text(SAMPLE_TEXT, font, width)
+
+    def wrap_cold():
+        get_text_length.cache_clear()
+        wrap_cached()
+
+    print(f"{len(FONT_SIZES)} font sizes, {len(WIDTHS)} widths, {len(SAMPLE_TEXT.split())} words")
+    before = measure("load fonts (truetype)", load_uncached, args.iterations)
+    after = measure("load fonts (get_font)", load_cached, args.iterations)
+    print(f"{'speedup':40} {before / after:8.1f}x")
+    before = measure("load + wrap (word by word getbbox)", wrap_uncached, args.iterations)
+    measure("load + wrap (binary search, cold cache)", wrap_cold, args.iterations)
+    after = measure("load + wrap (cached, binary search)", wrap_cached, args.iterations)
+    print(f"{'speedup':40} {before / after:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Writes gzip and brotli variants of the static assets, served to browsers accepting them.
+
+Run at install and after updating the vendored scripts. Brotli variants are only written when
+the brotli package is installed, variants that are not smaller than the asset are skipped.
+
+    python scripts/compress_static.py [static_dir]
+"""
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "static")
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".ttf", ".otf", ".json", ".html", ".txt"}
+
+# generated at runtime, never worth compressing ahead of time
+SKIPPED_DIRS = {"images"}
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # a fixed mtime keeps the output identical between runs
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def write_variant(path, data, encoding, extension):
+    variant_path = path + extension
+    if os.path.exists(variant_path) and os.path.getmtime(variant_path) >= os.path.getmtime(path):
+        return False
+    compressed = compress(data, encoding)
+    if len(compressed) >= len(data):
+        if os.path.exists(variant_path):
+            os.remove(variant_path)
+        return False
+    with open(variant_path, "wb") as f:
+        f.write(compressed)
+    return True
+
+def main():
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR
+    encodings = [("gzip", ".gz")]
+    if brotli is not None:
+        encodings.insert(0, ("br", ".br"))
+    else:
+        print("brotli is not installed, writing gzip variants only")
+
+    written = 0
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if not (root == static_dir and d in SKIPPED_DIRS)]
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            for encoding, extension in encodings:
+                written += write_variant(path, data, encoding, extension)
+    print(f"Wrote {written} compressed variants in {static_dir}")
+
+if __name__ == "__main__":
+    main()
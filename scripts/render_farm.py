@@ -0,0 +1,299 @@
+"""Renders every plugin instance at every resolution and orientation in parallel.
+
+The source is either a device config, rendering the plugin instances of all its playlists,
+or a JSON list of plugin instances:
+
+    [{"plugin_id": "clock", "name": "Zegar", "plugin_settings": {"selectedClockFace": "Cyfrowy Zegar"}}]
+
+Each image is post processed like it would be for the display, then the images, a contact sheet
+and the timings are written to the output directory. With --golden, the images are compared to
+the references in that directory with a structural similarity score, and --update-golden
+replaces the references with the new renders. Plugins showing the time or live data change
+between runs, so golden comparisons are meant for instances with fixed content.
+
+    python scripts/render_farm.py src/config/device.json [--output render_farm] [--workers 4]
+    python scripts/render_farm.py instances.json --resolutions 800x480 --orientations horizontal
+    python scripts/render_farm.py src/config/device.json --golden golden/ [--update-golden] [--min-similarity 0.98]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+from dotenv import load_dotenv
+from PIL import Image, ImageDraw
+
+RESOLUTIONS = [
+    [400, 300],	# Inky wHAT
+    [640, 400], # Inky Impression 4"
+    [600, 448], # Inky Impression 5.7"
+    [800, 480], # Inky Impression 7.3"
+]
+ORIENTATIONS = ["horizontal", "vertical"]
+
+DEV_CONFIG_FILE = os.path.join(SRC_DIR, "config", "device_dev.json")
+
+THUMBNAIL_SIZE = 240
+LABEL_HEIGHT = 36
+SSIM_WINDOW = 7
+
+class FarmDeviceConfig:
+    """The part of Config used by plugins, for one resolution and orientation of a device config."""
+
+    def __init__(self, config, resolution, orientation):
+        self.config = dict(config, resolution=list(resolution), orientation=orientation)
+
+    def get_config(self, key=None, default={}):
+        if key is not None:
+            return self.config.get(key, default)
+        return self.config
+
+    def get_resolution(self):
+        width, height = self.config["resolution"]
+        return (int(width), int(height))
+
+    def load_env_key(self, key):
+        load_dotenv(override=True)
+        return os.getenv(key)
+
+def read_plugin_configs():
+    plugin_configs = []
+    plugins_dir = os.path.join(SRC_DIR, "plugins")
+    for plugin_id in sorted(os.listdir(plugins_dir)):
+        plugin_info_file = os.path.join(plugins_dir, plugin_id, "plugin-info.json")
+        if os.path.isfile(plugin_info_file):
+            with open(plugin_info_file) as f:
+                plugin_configs.append(json.load(f))
+    return plugin_configs
+
+def read_source(path):
+    """Returns the device config and the plugin instances of a device config or plugin instance list."""
+    with open(path) as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        with open(DEV_CONFIG_FILE) as f:
+            return json.load(f), data
+
+    instances = []
+    for playlist in data.get("playlist_config", {}).get("playlists", []):
+        instances.extend(playlist.get("plugins", []))
+    return data, instances
+
+def parse_resolutions(value):
+    resolutions = []
+    for item in value.split(","):
+        match = re.fullmatch(r"\s*(\d+)x(\d+)\s*", item)
+        if not match:
+            raise argparse.ArgumentTypeError(f"Invalid resolution '{item}', expected WIDTHxHEIGHT.")
+        resolutions.append([int(match.group(1)), int(match.group(2))])
+    return resolutions
+
+def get_image_name(instance, resolution, orientation):
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", f"{instance['plugin_id']}_{instance['name']}").strip("_")
+    return f"{slug}_{resolution[0]}x{resolution[1]}_{orientation}.png"
+
+def _init_worker(plugin_configs):
+    import locale
+    import logging
+    from plugins.plugin_registry import load_plugins
+    from utils.render_cache import set_enabled as set_render_cache_enabled
+
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        locale.setlocale(locale.LC_TIME, "pl_PL.UTF-8")
+    except locale.Error:
+        pass
+    # every render is timed, so none may come from the render cache
+    set_render_cache_enabled(False)
+    load_plugins(plugin_configs)
+
+def render_job(job):
+    """Renders one plugin instance, returns its result with the timings in milliseconds."""
+    from plugins.plugin_registry import get_plugin_instance
+    from utils.image_utils import change_orientation, resize_image
+
+    instance, config, resolution, orientation, output_dir = job
+    result = {
+        "name": get_image_name(instance, resolution, orientation),
+        "plugin_id": instance["plugin_id"],
+        "instance": instance["name"],
+        "resolution": resolution,
+        "orientation": orientation,
+        "generate_ms": None,
+        "post_process_ms": None,
+        "error": None
+    }
+    try:
+        plugin = get_plugin_instance({"id": instance["plugin_id"]})
+        device_config = FarmDeviceConfig(config, resolution, orientation)
+
+        start = time.perf_counter()
+        image = plugin.generate_image(dict(instance.get("plugin_settings") or {}), device_config)
+        result["generate_ms"] = (time.perf_counter() - start) * 1000
+        if image is None:
+            raise RuntimeError("Plugin returned no image.")
+
+        # the post processing applied by the display manager
+        start = time.perf_counter()
+        image = change_orientation(image, orientation)
+        image = resize_image(image, resolution, plugin.config.get("image_settings", []))
+        result["post_process_ms"] = (time.perf_counter() - start) * 1000
+
+        # rotate vertical images back, so they are saved as they appear on the display
+        if orientation == "vertical":
+            image = image.rotate(-90, expand=1)
+        image.convert("RGB").save(os.path.join(output_dir, result["name"]))
+    except Exception as e:
+        result["error"] = f"{e.__class__.__name__}: {e}"
+    return result
+
+def _box_mean(values, window):
+    """Mean over each window x window block, using an integral image."""
+    integral = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    sums = (integral[window:, window:] - integral[:-window, window:]
+            - integral[window:, :-window] + integral[:-window, :-window])
+    return sums / (window * window)
+
+def structural_similarity(image, reference):
+    """Mean structural similarity (SSIM) of the luminance of two images, 1.0 for identical images."""
+    if image.size != reference.size:
+        return 0.0
+    a = np.asarray(image.convert("L"), dtype=np.float64)
+    b = np.asarray(reference.convert("L"), dtype=np.float64)
+    if min(a.shape) < SSIM_WINDOW:
+        return float(np.array_equal(a, b))
+
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mean_a, mean_b = _box_mean(a, SSIM_WINDOW), _box_mean(b, SSIM_WINDOW)
+    var_a = _box_mean(a * a, SSIM_WINDOW) - mean_a ** 2
+    var_b = _box_mean(b * b, SSIM_WINDOW) - mean_b ** 2
+    covariance = _box_mean(a * b, SSIM_WINDOW) - mean_a * mean_b
+    ssim = ((2 * mean_a * mean_b + c1) * (2 * covariance + c2)) / ((mean_a ** 2 + mean_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+def compare_golden(results, output_dir, golden_dir, min_similarity, update):
+    """Compares the renders to the references, or replaces the references when updating."""
+    os.makedirs(golden_dir, exist_ok=True)
+    failures = 0
+    for result in results:
+        if result["error"]:
+            continue
+        image_path = os.path.join(output_dir, result["name"])
+        golden_path = os.path.join(golden_dir, result["name"])
+        with Image.open(image_path) as image:
+            if update or not os.path.isfile(golden_path):
+                image.save(golden_path)
+                result["golden"] = "updated" if update else "new"
+                continue
+            with Image.open(golden_path) as reference:
+                result["similarity"] = structural_similarity(image, reference)
+        result["golden"] = "ok" if result["similarity"] >= min_similarity else "changed"
+        failures += result["golden"] == "changed"
+    return failures
+
+def write_contact_sheet(results, output_dir, resolutions, orientations):
+    """Writes a grid with a row per plugin instance and a column per resolution and orientation."""
+    from utils.app_utils import get_font
+
+    columns = [(tuple(resolution), orientation) for resolution in resolutions for orientation in orientations]
+    rows = list(dict.fromkeys((result["plugin_id"], result["instance"]) for result in results))
+    cell_width, cell_height = THUMBNAIL_SIZE + 16, THUMBNAIL_SIZE + LABEL_HEIGHT + 16
+
+    sheet = Image.new("RGB", (cell_width * len(columns), cell_height * len(rows)), (236, 236, 236))
+    draw = ImageDraw.Draw(sheet)
+    font = get_font("Jost", 13)
+    for result in results:
+        x = columns.index((tuple(result["resolution"]), result["orientation"])) * cell_width + 8
+        y = rows.index((result["plugin_id"], result["instance"])) * cell_height + 8
+
+        if result["error"]:
+            draw.rectangle((x, y, x + THUMBNAIL_SIZE, y + THUMBNAIL_SIZE), fill=(255, 220, 220), outline=(200, 0, 0))
+            draw.multiline_text((x + 6, y + 6), result["error"][:160].replace(": ", ":\n", 1), font=font, fill=(160, 0, 0))
+        else:
+            with Image.open(os.path.join(output_dir, result["name"])) as image:
+                image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+                sheet.paste(image, (x + (THUMBNAIL_SIZE - image.width) // 2, y + (THUMBNAIL_SIZE - image.height) // 2))
+            if result.get("golden") == "changed":
+                draw.rectangle((x - 3, y - 3, x + THUMBNAIL_SIZE + 3, y + THUMBNAIL_SIZE + 3), outline=(220, 0, 0), width=3)
+
+        width, height = result["resolution"]
+        label = f"{result['instance']} | {width}x{height} {result['orientation']}"
+        details = f"{result['generate_ms']:.0f} ms" if result["generate_ms"] is not None else "failed"
+        if result.get("similarity") is not None:
+            details += f" | ssim {result['similarity']:.3f}"
+        draw.text((x, y + THUMBNAIL_SIZE + 4), label, font=font, fill=(0, 0, 0))
+        draw.text((x, y + THUMBNAIL_SIZE + 20), details, font=font, fill=(80, 80, 80))
+
+    path = os.path.join(output_dir, "contact_sheet.png")
+    sheet.save(path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch render plugin instances at every resolution and orientation.")
+    parser.add_argument("source", help="device config or JSON list of plugin instances")
+    parser.add_argument("--output", default="render_farm", help="directory for the images, contact sheet and timings")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of render processes")
+    parser.add_argument("--resolutions", type=parse_resolutions, default=RESOLUTIONS, help="e.g. 800x480,400x300")
+    parser.add_argument("--orientations", nargs="+", choices=ORIENTATIONS, default=ORIENTATIONS)
+    parser.add_argument("--plugins", nargs="+", help="only render instances of these plugin ids")
+    parser.add_argument("--golden", help="directory of reference images to compare against")
+    parser.add_argument("--update-golden", action="store_true", help="replace the reference images with the new renders")
+    parser.add_argument("--min-similarity", type=float, default=0.98, help="lowest similarity accepted by --golden")
+    args = parser.parse_args()
+
+    config, instances = read_source(args.source)
+    if args.plugins:
+        instances = [instance for instance in instances if instance["plugin_id"] in args.plugins]
+    if not instances:
+        sys.exit("No plugin instances to render.")
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs = [(instance, config, resolution, orientation, args.output)
+            for instance in instances for resolution in args.resolutions for orientation in args.orientations]
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(read_plugin_configs(),)) as executor:
+        futures = [executor.submit(render_job, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "FAIL" if result["error"] else "ok"
+            print(f"{status:4} {result['name']}" + (f": {result['error']}" if result["error"] else ""))
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    # keep the order of the jobs, as_completed returns them in the order they finish
+    order = {get_image_name(instance, resolution, orientation): index for index, (instance, _, resolution, orientation, _) in enumerate(jobs)}
+    results.sort(key=lambda result: order[result["name"]])
+
+    failures = sum(1 for result in results if result["error"])
+    changed = 0
+    if args.golden:
+        changed = compare_golden(results, args.output, args.golden, args.min_similarity, args.update_golden)
+
+    sheet_path = write_contact_sheet(results, args.output, args.resolutions, args.orientations)
+    with open(os.path.join(args.output, "timings.json"), "w") as f:
+        json.dump(results, f, indent=2)
+
+    print()
+    print(f"{'image':60} {'generate':>10} {'post':>8} {'ssim':>7}")
+    for result in sorted(results, key=lambda result: -(result["generate_ms"] or 0)):
+        generate = f"{result['generate_ms']:.0f} ms" if result["generate_ms"] is not None else "-"
+        post = f"{result['post_process_ms']:.0f} ms" if result["post_process_ms"] is not None else "-"
+        similarity = f"{result['similarity']:.3f}" if result.get("similarity") is not None else ""
+        print(f"{result['name'][:60]:60} {generate:>10} {post:>8} {similarity:>7}")
+    print(f"\nRendered {len(results)} images in {elapsed:.1f} s with {args.workers} workers, contact sheet: {sheet_path}")
+
+    if failures or changed:
+        sys.exit(f"{failures} render(s) failed, {changed} render(s) differ from the golden images")
+
+if __name__ == "__main__":
+    main()
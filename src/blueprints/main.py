@@ -1,10 +1,14 @@
-from flask import Blueprint, request, jsonify, current_app, render_template, send_file
+from flask import Blueprint, request, jsonify, current_app, render_template, send_file, Response
+from utils.metrics import render_metrics
+from utils.tracing import is_enabled as is_tracing_enabled, get_traces, get_trace, to_chrome_trace
+from utils.page_cache import cached_page
 import os
 from datetime import datetime
 
 main_bp = Blueprint("main", __name__)
 
 @main_bp.route('/')
+@cached_page()
 def main_page():
     device_config = current_app.config['DEVICE_CONFIG']
     return render_template('inky.html', config=device_config.get_config(), plugins=device_config.get_plugins())
@@ -39,4 +43,24 @@ def get_current_image():
     response = send_file(image_path, mimetype='image/png')
     response.headers['Last-Modified'] = last_modified.strftime('%a, %d %b %Y %H:%M:%S GMT')
     response.headers['Cache-Control'] = 'no-cache'
-    return response
\ No newline at end of file
+    return response
+
+@main_bp.route('/metrics')
+def metrics():
+    """Exposes the refresh pipeline and system metrics in the Prometheus text format."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@main_bp.route('/debug/traces')
+def traces_page():
+    return render_template('traces.html', traces=get_traces(), enabled=is_tracing_enabled())
+
+@main_bp.route('/debug/traces.json')
+def export_traces():
+    """Exports the recent traces, or a single trace by id, in the Chrome trace event format."""
+    trace_id = request.args.get('id')
+    if trace_id:
+        trace = get_trace(trace_id)
+        if trace is None:
+            return jsonify({"error": "Trace not found"}), 404
+        return jsonify(to_chrome_trace([trace]))
+    return jsonify(to_chrome_trace(get_traces()))
@@ -3,14 +3,20 @@ from utils.time_utils import calculate_seconds
 import json
 from datetime import datetime, timedelta
 import os
+import re
 import logging
+from model import PlaylistManager
 from utils.app_utils import resolve_path, handle_request_files, parse_form
 from utils.locale_utils import t
+from utils.page_cache import cached_page
 
 
 logger = logging.getLogger(__name__)
 playlist_bp = Blueprint("playlist", __name__)
 
+# playlist start and end times, '24:00' ends a playlist at midnight
+PLAYLIST_TIME_PATTERN = re.compile(r"^(([01]\d|2[0-3]):[0-5]\d|24:00)$")
+
 @playlist_bp.route('/add_plugin', methods=['POST'])
 def add_plugin():
     device_config = current_app.config['DEVICE_CONFIG']
@@ -47,6 +53,17 @@ def add_plugin():
                 return jsonify({"error": t("refresh_interval_required", lang)}), 400
             refresh_interval_seconds = calculate_seconds(int(interval), unit)
             refresh_config = {"interval": refresh_interval_seconds}
+            if refresh_settings.get("adaptive"):
+                max_unit, max_interval = refresh_settings.get("maxUnit"), refresh_settings.get("maxInterval")
+                adaptive_config = {}
+                if max_interval:
+                    if max_unit not in ["minute", "hour", "day"]:
+                        return jsonify({"error": t("refresh_interval_unit_required", lang)}), 400
+                    max_interval_seconds = calculate_seconds(int(max_interval), max_unit)
+                    if max_interval_seconds < refresh_interval_seconds:
+                        return jsonify({"error": t("adaptive_max_interval_too_short", lang)}), 400
+                    adaptive_config["max_interval"] = max_interval_seconds
+                refresh_config["adaptive"] = adaptive_config
         else:
             refresh_time = refresh_settings.get('refreshTime')
             if not refresh_settings.get('refreshTime'):
@@ -60,25 +77,42 @@ def add_plugin():
             "plugin_settings": plugin_settings,
             "name": instance_name
         }
-        result = playlist_manager.add_plugin_to_playlist(playlist, plugin_dict)
-        if not result:
-            return jsonify({"error": t("failed_add_playlist", lang)}), 500
-
-        device_config.write_config()
+        with device_config.lock:
+            # checked again, another request may have added the instance while the files were saved
+            if playlist_manager.find_plugin(plugin_id, instance_name):
+                return jsonify({"error": t("playlist_exists", lang, name=instance_name)}), 400
+            result = playlist_manager.add_plugin_to_playlist(playlist, plugin_dict)
+            if not result:
+                return jsonify({"error": t("failed_add_playlist", lang)}), 500
+
+            device_config.write_config()
     except Exception as e:
         return jsonify({"error": t("error_occurred", lang, e=str(e))}), 500
     return jsonify({"success": True, "message": t("scheduled_refresh_configured", lang)})
 
 @playlist_bp.route('/playlist')
+@cached_page(max_age=60)  # refresh times are shown relative to now, to the minute
 def playlists():
     device_config = current_app.config['DEVICE_CONFIG']
     playlist_manager = device_config.get_playlist_manager()
     refresh_info = device_config.get_refresh_info()
 
+    with device_config.lock:
+        playlist_config = playlist_manager.to_dict()
+
+    # current interval of the adaptive instances, keyed by playlist and instance name
+    adaptive_intervals = {
+        (playlist.name, plugin_instance.name): plugin_instance.get_refresh_interval()
+        for playlist in playlist_manager.playlists
+        for plugin_instance in playlist.plugins
+        if plugin_instance.is_adaptive()
+    }
+
     return render_template(
         'playlist.html',
-        playlist_config=playlist_manager.to_dict(),
-        refresh_info=refresh_info.to_dict()
+        playlist_config=playlist_config,
+        refresh_info=refresh_info.to_dict(),
+        adaptive_intervals=adaptive_intervals
     )
 
 @playlist_bp.route('/create_playlist', methods=['POST'])
@@ -99,16 +133,17 @@ def create_playlist():
         return jsonify({"error": t("start_and_end_time_required", lang)}), 400
 
     try:
-        playlist = playlist_manager.get_playlist(playlist_name)
-        if playlist:
-            return jsonify({"error": t("playlist_exists", lang, name=playlist_name)}), 400
+        with device_config.lock:
+            playlist = playlist_manager.get_playlist(playlist_name)
+            if playlist:
+                return jsonify({"error": t("playlist_exists", lang, name=playlist_name)}), 400
 
-        result = playlist_manager.add_playlist(playlist_name, start_time, end_time)
-        if not result:
-            return jsonify({"error": t("failed_to_create_playlist", lang)}), 500
+            result = playlist_manager.add_playlist(playlist_name, start_time, end_time)
+            if not result:
+                return jsonify({"error": t("failed_to_create_playlist", lang)}), 500
 
-        # save changes to device config file
-        device_config.write_config()
+            # save changes to device config file
+            device_config.write_config()
 
     except Exception as e:
         logger.exception("EXCEPTION CAUGHT: " + str(e))
@@ -133,14 +168,15 @@ def update_playlist(playlist_name):
     if not new_name or not start_time or not end_time:
         return jsonify({"success": False, "error": t("missing_required_fields", lang)}), 400
 
-    playlist = playlist_manager.get_playlist(playlist_name)
-    if not playlist:
-        return jsonify({"error": t("playlist_doesnt_exists", lang, playlist_name=playlist_name)}), 400
+    with device_config.lock:
+        playlist = playlist_manager.get_playlist(playlist_name)
+        if not playlist:
+            return jsonify({"error": t("playlist_doesnt_exists", lang, playlist_name=playlist_name)}), 400
 
-    result = playlist_manager.update_playlist(playlist_name, new_name, start_time, end_time)
-    if not result:
-        return jsonify({"error": t("failed_to_delete_playlist", lang)}), 500
-    device_config.write_config()
+        result = playlist_manager.update_playlist(playlist_name, new_name, start_time, end_time)
+        if not result:
+            return jsonify({"error": t("failed_to_delete_playlist", lang)}), 500
+        device_config.write_config()
 
     return jsonify({"success": True, "message": t("updated_playlist", lang, playlist_name=playlist_name)})
 
@@ -154,17 +190,18 @@ def delete_playlist(playlist_name):
     if not playlist_name:
         return jsonify({"error": t("playlist_name_required", lang)}), 400
 
-    playlist = playlist_manager.get_playlist(playlist_name)
-    if not playlist:
-        return jsonify({"error": t("playlist_doesnt_exists", lang, playlist_name=playlist_name)}), 400
+    with device_config.lock:
+        playlist = playlist_manager.get_playlist(playlist_name)
+        if not playlist:
+            return jsonify({"error": t("playlist_doesnt_exists", lang, playlist_name=playlist_name)}), 400
 
-    # Delete all images associated with plugin instances in this playlist
-    from blueprints.plugin import _delete_plugin_instance_images
-    for plugin_instance in playlist.plugins:
-        _delete_plugin_instance_images(device_config, plugin_instance)
+        # Delete all images associated with plugin instances in this playlist
+        from blueprints.plugin import _delete_plugin_instance_images
+        for plugin_instance in playlist.plugins:
+            _delete_plugin_instance_images(device_config, plugin_instance)
 
-    playlist_manager.delete_playlist(playlist_name)
-    device_config.write_config()
+        playlist_manager.delete_playlist(playlist_name)
+        device_config.write_config()
 
     return jsonify({"success": True, "message": t("deleted_playlist", lang, playlist_name=playlist_name)})
 
@@ -208,3 +245,200 @@ def format_relative_time(iso_date_string):
             date=dt.strftime(month_day_format).lstrip("0"),
             time=dt.strftime(time_format).lstrip("0")
         )  # Removes leading zero in day
+
+def _validate_playlist_times(start_time, end_time, lang):
+    if not start_time or not end_time:
+        raise ValueError(t("start_and_end_time_required", lang))
+    for value in (start_time, end_time):
+        if not isinstance(value, str) or not PLAYLIST_TIME_PATTERN.match(value):
+            raise ValueError(t("invalid_time", lang, time=value))
+
+def _validate_refresh(refresh, lang):
+    """Validates refresh settings in the stored format, {"interval": seconds} or {"scheduled": "HH:MM"}."""
+    if not isinstance(refresh, dict) or not (refresh.get("interval") or refresh.get("scheduled")):
+        raise ValueError(t("invalid_refresh_settings", lang))
+    if "interval" in refresh:
+        interval = refresh["interval"]
+        if not isinstance(interval, int) or isinstance(interval, bool) or interval <= 0:
+            raise ValueError(t("invalid_refresh_settings", lang))
+        adaptive = refresh.get("adaptive", {})
+        if not isinstance(adaptive, dict):
+            raise ValueError(t("invalid_refresh_settings", lang))
+        max_interval = adaptive.get("max_interval")
+        if max_interval is not None and (not isinstance(max_interval, int) or isinstance(max_interval, bool) or max_interval < interval):
+            raise ValueError(t("adaptive_max_interval_too_short", lang))
+    if "scheduled" in refresh:
+        try:
+            datetime.strptime(refresh["scheduled"], "%H:%M")
+        except (TypeError, ValueError):
+            raise ValueError(t("invalid_time", lang, time=refresh["scheduled"]))
+
+def _batch_create_playlist(device_config, playlist_manager, operation, deleted_instances, lang):
+    playlist_name = operation.get("playlist_name")
+    if not playlist_name or not str(playlist_name).strip():
+        raise ValueError(t("playlist_name_required", lang))
+    _validate_playlist_times(operation.get("start_time"), operation.get("end_time"), lang)
+    if playlist_manager.get_playlist(playlist_name):
+        raise ValueError(t("playlist_exists", lang, name=playlist_name))
+    playlist_manager.add_playlist(playlist_name, operation["start_time"], operation["end_time"])
+    return t("created_new_playlist", lang)
+
+def _batch_update_playlist(device_config, playlist_manager, operation, deleted_instances, lang):
+    playlist_name, new_name = operation.get("playlist_name"), operation.get("new_name")
+    if not playlist_name or not new_name:
+        raise ValueError(t("missing_required_fields", lang))
+    _validate_playlist_times(operation.get("start_time"), operation.get("end_time"), lang)
+    if not playlist_manager.get_playlist(playlist_name):
+        raise ValueError(t("playlist_doesnt_exists", lang, playlist_name=playlist_name))
+    if new_name != playlist_name and playlist_manager.get_playlist(new_name):
+        raise ValueError(t("playlist_exists", lang, name=new_name))
+    playlist_manager.update_playlist(playlist_name, new_name, operation["start_time"], operation["end_time"])
+    return t("updated_playlist", lang, playlist_name=playlist_name)
+
+def _batch_delete_playlist(device_config, playlist_manager, operation, deleted_instances, lang):
+    playlist_name = operation.get("playlist_name")
+    playlist = playlist_manager.get_playlist(playlist_name)
+    if not playlist:
+        raise ValueError(t("playlist_doesnt_exists", lang, playlist_name=playlist_name))
+    deleted_instances.extend(playlist.plugins)
+    playlist_manager.delete_playlist(playlist_name)
+    return t("deleted_playlist", lang, playlist_name=playlist_name)
+
+def _batch_add_plugin(device_config, playlist_manager, operation, deleted_instances, lang):
+    playlist_name, plugin_id = operation.get("playlist_name"), operation.get("plugin_id")
+    instance_name = operation.get("instance_name")
+    if not playlist_name:
+        raise ValueError(t("playlist_name_required", lang))
+    if not playlist_manager.get_playlist(playlist_name):
+        raise ValueError(t("playlist_doesnt_exists", lang, playlist_name=playlist_name))
+    if device_config.get_plugin(plugin_id) is None:
+        raise ValueError(t("plugin_not_found_id", lang, plugin_id=plugin_id))
+    if not instance_name or not str(instance_name).strip():
+        raise ValueError(t("instance_name_required", lang))
+    if not all(char.isalpha() or char.isspace() or char.isnumeric() for char in instance_name):
+        raise ValueError(t("invalid_instance_name", lang))
+    if playlist_manager.find_plugin(plugin_id, instance_name):
+        raise ValueError(t("playlist_exists", lang, name=instance_name))
+    _validate_refresh(operation.get("refresh"), lang)
+    plugin_settings = operation.get("plugin_settings", {})
+    if not isinstance(plugin_settings, dict):
+        raise ValueError(t("missing_required_fields", lang))
+
+    playlist_manager.add_plugin_to_playlist(playlist_name, {
+        "plugin_id": plugin_id,
+        "refresh": operation["refresh"],
+        "plugin_settings": plugin_settings,
+        "name": instance_name
+    })
+    return t("scheduled_refresh_configured", lang)
+
+def _batch_update_plugin_instance(device_config, playlist_manager, operation, deleted_instances, lang):
+    plugin_id, instance_name = operation.get("plugin_id"), operation.get("instance_name")
+    plugin_instance = playlist_manager.find_plugin(plugin_id, instance_name)
+    if not plugin_instance:
+        raise ValueError(t("plugin_instance_doesnt_exist", lang, plugin_instance_name=instance_name))
+    if "plugin_settings" in operation:
+        if not isinstance(operation["plugin_settings"], dict):
+            raise ValueError(t("missing_required_fields", lang))
+        plugin_instance.settings = operation["plugin_settings"]
+    if "refresh" in operation:
+        _validate_refresh(operation["refresh"], lang)
+        plugin_instance.refresh = operation["refresh"]
+    return t("updated_plugin_instance", lang, instance_name=instance_name)
+
+def _batch_delete_plugin_instance(device_config, playlist_manager, operation, deleted_instances, lang):
+    playlist_name, plugin_id = operation.get("playlist_name"), operation.get("plugin_id")
+    instance_name = operation.get("instance_name")
+    playlist = playlist_manager.get_playlist(playlist_name)
+    if not playlist:
+        raise ValueError(t("playlist_not_found_name", lang, playlist_name=playlist_name))
+    plugin_instance = playlist.find_plugin(plugin_id, instance_name)
+    if not plugin_instance:
+        raise ValueError(t("plugin_instance_not_found_name", lang, plugin_instance_name=instance_name))
+    deleted_instances.append(plugin_instance)
+    playlist.delete_plugin(plugin_id, instance_name)
+    return t("deleted_plugin_instance", lang)
+
+# operations accepted by /api/batch, each validating and applying one operation to the given playlists
+BATCH_OPERATIONS = {
+    "create_playlist": _batch_create_playlist,
+    "update_playlist": _batch_update_playlist,
+    "delete_playlist": _batch_delete_playlist,
+    "add_plugin": _batch_add_plugin,
+    "update_plugin_instance": _batch_update_plugin_instance,
+    "delete_plugin_instance": _batch_delete_plugin_instance,
+}
+
+@playlist_bp.route('/api/batch', methods=['POST'])
+def batch():
+    """Applies a list of playlist and plugin instance operations at once, with a single config write.
+
+        {"dry_run": false, "operations": [
+            {"op": "create_playlist", "playlist_name": "Morning", "start_time": "06:00", "end_time": "09:00"},
+            {"op": "add_plugin", "playlist_name": "Morning", "plugin_id": "clock", "instance_name": "Clock",
+             "refresh": {"interval": 3600}, "plugin_settings": {}}
+        ]}
+
+    The operations are first validated by applying them in order to a copy of the playlists, so
+    later operations see the changes of earlier ones. The result of each operation is returned, and
+    only if all of them succeeded and dry_run is not set they are applied to the playlists as well.
+    If the config cannot be written, the playlists are restored and nothing is applied.
+    """
+    device_config = current_app.config['DEVICE_CONFIG']
+    lang = device_config.config.get("language", "pl")
+
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+    dry_run = bool(data.get("dry_run", False))
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": t("batch_operations_required", lang)}), 400
+
+    with device_config.lock:
+        playlist_manager = device_config.get_playlist_manager()
+        previous_playlists = playlist_manager.to_dict()
+        working_copy = PlaylistManager.from_dict(previous_playlists)
+
+        results = []
+        for operation in operations:
+            op = operation.get("op") if isinstance(operation, dict) else None
+            try:
+                if not isinstance(op, str) or op not in BATCH_OPERATIONS:
+                    raise ValueError(t("unknown_batch_operation", lang, op=op))
+                message = BATCH_OPERATIONS[op](device_config, working_copy, operation, [], lang)
+                results.append({"op": op, "success": True, "message": message})
+            except ValueError as e:
+                results.append({"op": op, "success": False, "error": str(e)})
+            except Exception as e:
+                logger.exception("EXCEPTION CAUGHT: " + str(e))
+                results.append({"op": op, "success": False, "error": t("error_occurred", lang, e=e)})
+
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            return jsonify({"success": False, "dry_run": dry_run, "results": results,
+                            "error": t("batch_failed", lang, n=failed, total=len(results))}), 400
+        if dry_run:
+            return jsonify({"success": True, "dry_run": True, "results": results,
+                            "message": t("batch_validated", lang, n=len(results))})
+
+        # applied to the playlists themselves, keeping the instances the refresh task may be using
+        deleted_instances = []
+        for operation in operations:
+            BATCH_OPERATIONS[operation["op"]](device_config, playlist_manager, operation, deleted_instances, lang)
+        try:
+            device_config.write_config()
+        except Exception as e:
+            # nothing was persisted, the playlists go back to their state before the batch
+            logger.exception("EXCEPTION CAUGHT: " + str(e))
+            device_config.playlist_manager = PlaylistManager.from_dict(previous_playlists)
+            return jsonify({"success": False, "dry_run": False, "results": results,
+                            "error": t("error_occurred", lang, e=e)}), 500
+
+        # images of the deleted instances are removed once the change is committed
+        from blueprints.plugin import _delete_plugin_instance_images
+        for plugin_instance in deleted_instances:
+            if not playlist_manager.find_plugin(plugin_instance.plugin_id, plugin_instance.name):
+                _delete_plugin_instance_images(device_config, plugin_instance)
+
+    logger.info(f"Applied batch. | operations: {len(results)}")
+    return jsonify({"success": True, "dry_run": False, "results": results,
+                    "message": t("batch_applied", lang, n=len(results))})
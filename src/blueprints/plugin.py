@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, current_app, render_template, send_from_directory
 from plugins.plugin_registry import get_plugin_instance
 from utils.app_utils import resolve_path, handle_request_files, parse_form
+from utils.web_server import long_running
+from utils.page_cache import cached_page
 from refresh_task import ManualRefresh, PlaylistRefresh
 import json
 import os
@@ -29,16 +31,44 @@ def _delete_plugin_instance_images(device_config, plugin_instance_obj):
         plugin_config = device_config.get_plugin(plugin_instance_obj.plugin_id)
         if plugin_config:
             plugin = get_plugin_instance(plugin_config)
-            plugin.cleanup(plugin_instance_obj.settings)
+            plugin.cleanup(_exclude_shared_files(device_config, plugin_instance_obj))
     except Exception as e:
         logger.warning(t("error_during_plugin_instance", lang, plugin_id=plugin_instance_obj.plugin_id, e=e))
 
+def _exclude_shared_files(device_config, plugin_instance_obj):
+    """Returns a copy of the instance settings without file paths used by other instances.
+
+    Uploads are stored by content hash, so the same file can back several plugin instances.
+    """
+    shared_values = set()
+    for playlist in device_config.get_playlist_manager().playlists:
+        for other in playlist.plugins:
+            if other is plugin_instance_obj:
+                continue
+            for value in other.settings.values():
+                if isinstance(value, list):
+                    shared_values.update(v for v in value if isinstance(v, str))
+                elif isinstance(value, str):
+                    shared_values.add(value)
+
+    settings = {}
+    for key, value in plugin_instance_obj.settings.items():
+        if isinstance(value, list):
+            settings[key] = [v for v in value if not (v in shared_values and os.path.isfile(v))]
+        elif isinstance(value, str) and value in shared_values and os.path.isfile(value):
+            continue
+        else:
+            settings[key] = value
+    return settings
+
 # Removed module-level PLUGINS_DIR - will resolve dynamically in route handlers
 
 @plugin_bp.route('/plugin/<plugin_id>')
+@cached_page()
 def plugin_page(plugin_id):
     device_config = current_app.config['DEVICE_CONFIG']
-    playlist_manager = device_config.get_playlist_manager()
+    # read only, the snapshot never changes while the page renders
+    playlist_manager = device_config.get_snapshot().get_playlist_manager()
 
     lang = device_config.config.get("language", "pl")
 
@@ -106,7 +136,7 @@ def plugin_instance_image(playlist_name, plugin_id, instance_name):
 
     """Serve the generated image for a plugin instance."""
     device_config = current_app.config['DEVICE_CONFIG']
-    playlist_manager = device_config.get_playlist_manager()
+    playlist_manager = device_config.get_snapshot().get_playlist_manager()
 
     # Find the plugin instance
     playlist = playlist_manager.get_playlist(playlist_name)
@@ -129,6 +159,12 @@ def plugin_instance_image(playlist_name, plugin_id, instance_name):
     # Serve the image
     return send_from_directory(device_config.plugin_image_dir, image_filename)
 
+@plugin_bp.route('/upload_status')
+def upload_status():
+    """Report the progress of the background processing of uploaded images."""
+    upload_processor = current_app.config['UPLOAD_PROCESSOR']
+    return jsonify(upload_processor.get_progress())
+
 @plugin_bp.route('/delete_plugin_instance', methods=['POST'])
 def delete_plugin_instance():
     device_config = current_app.config['DEVICE_CONFIG']
@@ -142,24 +178,25 @@ def delete_plugin_instance():
     plugin_instance = data.get("plugin_instance")
 
     try:
-        playlist = playlist_manager.get_playlist(playlist_name)
-        if not playlist:
-            return jsonify({"success": False, "message": t("playlist_not_found", lang)}), 400
+        with device_config.lock:
+            playlist = playlist_manager.get_playlist(playlist_name)
+            if not playlist:
+                return jsonify({"success": False, "message": t("playlist_not_found", lang)}), 400
 
-        # Get the plugin instance to find associated images
-        plugin_instance_obj = playlist.find_plugin(plugin_id, plugin_instance)
-        if not plugin_instance_obj:
-            return jsonify({"success": False, "message": t("plugin_instance_not_found", lang)}), 400
+            # Get the plugin instance to find associated images
+            plugin_instance_obj = playlist.find_plugin(plugin_id, plugin_instance)
+            if not plugin_instance_obj:
+                return jsonify({"success": False, "message": t("plugin_instance_not_found", lang)}), 400
 
-        # Delete associated images before removing from playlist
-        _delete_plugin_instance_images(device_config, plugin_instance_obj)
+            # Delete associated images before removing from playlist
+            _delete_plugin_instance_images(device_config, plugin_instance_obj)
 
-        result = playlist.delete_plugin(plugin_id, plugin_instance)
-        if not result:
-            return jsonify({"success": False, "message": t("plugin_instance_not_found", lang)}), 400
+            result = playlist.delete_plugin(plugin_id, plugin_instance)
+            if not result:
+                return jsonify({"success": False, "message": t("plugin_instance_not_found", lang)}), 400
 
-        # save changes to device config file
-        device_config.write_config()
+            # save changes to device config file
+            device_config.write_config()
 
     except Exception as e:
         logger.exception("EXCEPTION CAUGHT: " + str(e))
@@ -183,17 +220,19 @@ def update_plugin_instance(instance_name):
         plugin_settings.update(handle_request_files(request.files, request.form))
 
         plugin_id = plugin_settings.pop("plugin_id")
-        plugin_instance = playlist_manager.find_plugin(plugin_id, instance_name)
-        if not plugin_instance:
-            return jsonify({"error": t("plugin_instance_doesnt_exist", lang, plugin_instance_name=instance_name)}), 500
+        with device_config.lock:
+            plugin_instance = playlist_manager.find_plugin(plugin_id, instance_name)
+            if not plugin_instance:
+                return jsonify({"error": t("plugin_instance_doesnt_exist", lang, plugin_instance_name=instance_name)}), 500
 
-        plugin_instance.settings = plugin_settings
-        device_config.write_config()
+            plugin_instance.settings = plugin_settings
+            device_config.write_config()
     except Exception as e:
         return jsonify({"error": t("error_occurred", lang, e=e)}), 500
     return jsonify({"success": True, "message": t("updated_plugin_instance", lang, instance_name=instance_name)})
 
 @plugin_bp.route('/display_plugin_instance', methods=['POST'])
+@long_running
 def display_plugin_instance():
     device_config = current_app.config['DEVICE_CONFIG']
     refresh_task = current_app.config['REFRESH_TASK']
@@ -207,11 +246,12 @@ def display_plugin_instance():
     plugin_instance_name = data.get("plugin_instance")
 
     try:
-        playlist = playlist_manager.get_playlist(playlist_name)
+        # the refresh updates the live instance, it is looked up under the lock but refreshed without it
+        with device_config.lock:
+            playlist = playlist_manager.get_playlist(playlist_name)
+            plugin_instance = playlist.find_plugin(plugin_id, plugin_instance_name) if playlist else None
         if not playlist:
             return jsonify({"success": False, "message": t("playlist_not_found_name", lang, playlist_name=playlist_name)}), 400
-
-        plugin_instance = playlist.find_plugin(plugin_id, plugin_instance_name)
         if not plugin_instance:
             return jsonify({"success": False, "message": t("plugin_instance_not_found_name", lang, plugin_instance_name=plugin_instance_name)}), 400
 
@@ -222,6 +262,7 @@ def display_plugin_instance():
     return jsonify({"success": True, "message": t("display_updated")}), 200
 
 @plugin_bp.route('/update_now', methods=['POST'])
+@long_running
 def update_now():
     device_config = current_app.config['DEVICE_CONFIG']
     refresh_task = current_app.config['REFRESH_TASK']
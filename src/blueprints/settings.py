@@ -1,12 +1,14 @@
-from flask import Blueprint, request, jsonify, current_app, render_template, Response
+from flask import Blueprint, request, jsonify, current_app, render_template, Response, stream_with_context
 from utils.time_utils import calculate_seconds
 from datetime import datetime, timedelta
 import os
+import re
+import zlib
 import pytz
 import logging
-import io
 
 from utils.locale_utils import t
+from utils.page_cache import cached_page
 
 # Try to import cysystemd for journal reading (Linux only)
 try:
@@ -27,11 +29,29 @@ except ImportError:
 logger = logging.getLogger(__name__)
 settings_bp = Blueprint("settings", __name__)
 
+# sorted once, the timezone database does not change while running
+TIMEZONES = sorted(pytz.all_timezones_set)
+
+# levels of the logging module, in increasing severity
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# "12:00:00 - INFO - refresh_task - message", as formatted by config/logging.conf
+LOG_LINE_PATTERN = re.compile(r"^\d{2}:\d{2}:\d{2} - (?P<level>[A-Z]+) - (?P<name>\S+) - ")
+
+# characters of log lines sent at once when streaming the download
+LOG_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_LOG_PAGE_SIZE = 200
+MAX_LOG_PAGE_SIZE = 1000
+
+# records read for one page at most, when the filters match few of them
+MAX_SCANNED_LOG_RECORDS = 20000
+
 @settings_bp.route('/settings')
+@cached_page()
 def settings_page():
     device_config = current_app.config['DEVICE_CONFIG']
-    timezones = sorted(pytz.all_timezones_set)
-    return render_template('settings.html', device_settings=device_config.get_config(), timezones = timezones)
+    return render_template('settings.html', device_settings=device_config.get_config(), timezones = TIMEZONES)
 
 @settings_bp.route('/save_settings', methods=['POST'])
 def save_settings():
@@ -95,55 +115,167 @@ def shutdown():
 
 @settings_bp.route('/download-logs')
 def download_logs():
-    try:
-        buffer = io.StringIO()
+    """Streams the service logs of the last hours as a file, gzipped with gzip=1.
 
-        # Get 'hours' from query parameters, default to 2 if not provided or invalid
-        hours_str = request.args.get('hours', '2')
-        try:
-            hours = int(hours_str)
-        except ValueError:
-            hours = 2
-        since = datetime.now() - timedelta(hours=hours)
+    Accepts the filters of LogFilter: level, the minimum level, and module, logger name prefixes
+    separated by commas.
+    """
+    # Get 'hours' from query parameters, default to 2 if not provided or invalid
+    hours_str = request.args.get('hours', '2')
+    try:
+        hours = int(hours_str)
+    except ValueError:
+        hours = 2
+    since = datetime.now() - timedelta(hours=hours)
+    log_filter = LogFilter.from_args(request.args)
+    compress = request.args.get('gzip') in ('1', 'true')
 
+    try:
         if not JOURNAL_AVAILABLE:
             # Return a message when running in development mode without systemd
-            buffer.write(f"Log download not available in development mode (cysystemd not installed).\n")
-            buffer.write(f"Logs would normally show InkyPi service logs from the last {hours} hours.\n")
-            buffer.write(f"\nTo see Flask development logs, check your terminal output.\n")
+            lines = iter([
+                f"Log download not available in development mode (cysystemd not installed).\n",
+                f"Logs would normally show InkyPi service logs from the last {hours} hours.\n",
+                f"\nTo see Flask development logs, check your terminal output.\n",
+            ])
         else:
-            reader = JournalReader()
-            reader.open(JournalOpenMode.SYSTEM)
-            reader.add_filter(Rule("_SYSTEMD_UNIT", "inkypi.service"))
-            reader.seek_realtime_usec(int(since.timestamp() * 1_000_000))
-
-            for record in reader:
-                try:
-                    ts = datetime.fromtimestamp(record.get_realtime_usec() / 1_000_000)
-                    formatted_ts = ts.strftime("%b %d %H:%M:%S")
-                except Exception:
-                    formatted_ts = "??? ?? ??:??:??"
-
-                data = record.data
-                hostname = data.get("_HOSTNAME", "unknown-host")
-                identifier = data.get("SYSLOG_IDENTIFIER") or data.get("_COMM", "?")
-                pid = data.get("_PID", "?")
-                msg = data.get("MESSAGE", "").rstrip()
-
-                # Format the log entry similar to the journalctl default output
-                buffer.write(f"{formatted_ts} {hostname} {identifier}[{pid}]: {msg}\n")
-
-        buffer.seek(0)
-        # Add date and time to the filename
-        now_str = datetime.now().strftime("%Y%m%d-%H%M%S")
-        filename = f"inkypi_{now_str}.log"
-        return Response(
-            buffer.read(),
-            mimetype="text/plain",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-
+            reader = _open_journal(since=since)
+            lines = (line for _, message, line in _read_journal(reader) if log_filter.matches(message))
     except Exception as e:
         logger.error(f"Error reading logs: {e}")
         return Response(f"Error reading logs: {e}", status=500, mimetype="text/plain")
 
+    chunks = _join_lines(lines)
+    # Add date and time to the filename
+    now_str = datetime.now().strftime("%Y%m%d-%H%M%S")
+    filename = f"inkypi_{now_str}.log"
+    mimetype = "text/plain"
+    if compress:
+        chunks = _gzip_chunks(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@settings_bp.route('/api/logs')
+def get_logs():
+    """Returns the log lines written after a cursor, for following the logs in the UI.
+
+        {"lines": ["..."], "cursor": "...", "more": false}
+
+    Without a cursor the lines start 'hours' ago, 1 by default. At most 'limit' lines are returned,
+    'more' tells whether the next page can be requested right away with the returned cursor.
+    Accepts the same level and module filters as the log download.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_LOG_PAGE_SIZE)), 1), MAX_LOG_PAGE_SIZE)
+        hours = int(request.args.get('hours', 1))
+    except ValueError:
+        return jsonify({"error": "limit and hours must be numbers"}), 400
+    cursor = request.args.get('cursor') or None
+    log_filter = LogFilter.from_args(request.args)
+
+    if not JOURNAL_AVAILABLE:
+        return jsonify({"lines": [], "cursor": cursor, "more": False, "available": False})
+
+    lines, more, scanned = [], False, 0
+    try:
+        reader = _open_journal(since=datetime.now() - timedelta(hours=hours), cursor=cursor)
+        for record_cursor, message, line in _read_journal(reader, cursor):
+            # filtered out records move the cursor too, so they are not read again
+            cursor = record_cursor
+            scanned += 1
+            if log_filter.matches(message):
+                lines.append(line)
+            if len(lines) >= limit or scanned >= MAX_SCANNED_LOG_RECORDS:
+                more = True
+                break
+    except Exception as e:
+        logger.error(f"Error reading logs: {e}")
+        return jsonify({"error": f"Error reading logs: {e}"}), 500
+
+    return jsonify({"lines": lines, "cursor": cursor, "more": more, "available": True})
+
+class LogFilter:
+    """Matches log lines by minimum level and logger name.
+
+    Levels and names are read from the lines formatted by config/logging.conf. Lines without them,
+    like the lines of a traceback, belong to the line before and are matched like it.
+    """
+
+    def __init__(self, level=None, modules=()):
+        self.min_level = LOG_LEVELS.index(level) if level in LOG_LEVELS else None
+        self.modules = tuple(modules)
+        self.level = None
+        self.name = None
+
+    @classmethod
+    def from_args(cls, args):
+        modules = [module.strip() for module in args.get('module', '').split(',') if module.strip()]
+        return cls(level=args.get('level', '').upper() or None, modules=modules)
+
+    def matches(self, message):
+        match = LOG_LINE_PATTERN.match(message)
+        if match:
+            self.level, self.name = match.group("level"), match.group("name")
+        if self.min_level is not None and (self.level not in LOG_LEVELS or LOG_LEVELS.index(self.level) < self.min_level):
+            return False
+        if self.modules and not (self.name and any(self.name == module or self.name.startswith(module + ".")
+                                                   for module in self.modules)):
+            return False
+        return True
+
+def _open_journal(since, cursor=None):
+    """Opens the journal of the InkyPi service at the cursor, or at the given time."""
+    reader = JournalReader()
+    reader.open(JournalOpenMode.SYSTEM)
+    reader.add_filter(Rule("_SYSTEMD_UNIT", "inkypi.service"))
+    if cursor:
+        reader.seek_cursor(cursor.encode("utf-8"))
+    else:
+        reader.seek_realtime_usec(int(since.timestamp() * 1_000_000))
+    return reader
+
+def _read_journal(reader, after_cursor=None):
+    """Yields the cursor, message and formatted line of the journal records, skipping the one at after_cursor."""
+    for record in reader:
+        record_cursor = record.cursor.decode("utf-8") if isinstance(record.cursor, bytes) else record.cursor
+        if record_cursor == after_cursor:
+            continue
+        try:
+            ts = datetime.fromtimestamp(record.get_realtime_usec() / 1_000_000)
+            formatted_ts = ts.strftime("%b %d %H:%M:%S")
+        except Exception:
+            formatted_ts = "??? ?? ??:??:??"
+
+        data = record.data
+        hostname = data.get("_HOSTNAME", "unknown-host")
+        identifier = data.get("SYSLOG_IDENTIFIER") or data.get("_COMM", "?")
+        pid = data.get("_PID", "?")
+        msg = data.get("MESSAGE", "").rstrip()
+
+        # Format the log entry similar to the journalctl default output
+        yield record_cursor, msg, f"{formatted_ts} {hostname} {identifier}[{pid}]: {msg}\n"
+
+def _join_lines(lines):
+    """Joins the lines into chunks of about LOG_CHUNK_SIZE characters, sent as they are read."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= LOG_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,11 +1,41 @@
 import os
+import copy
 import json
 import logging
+import threading
+from types import MappingProxyType
 from dotenv import load_dotenv
 from model import PlaylistManager, RefreshInfo
 
 logger = logging.getLogger(__name__)
 
+class ConfigSnapshot:
+    """A copy of the configuration as it was written at one version.
+
+    Snapshots are published by Config after each write and never change afterwards, so the refresh
+    thread can read the playlists and settings without taking the lock. They must not be modified,
+    changes go through Config while holding its lock.
+    """
+    __slots__ = ("version", "config", "playlist_manager", "refresh_info")
+
+    def __init__(self, version, config):
+        self.version = version
+        self.config = MappingProxyType(config)
+        self.playlist_manager = PlaylistManager.from_dict(config.get("playlist_config", {}))
+        self.refresh_info = RefreshInfo.from_dict(config.get("refresh_info", {}))
+
+    def get_config(self, key=None, default={}):
+        """Gets the value of a specific configuration key or returns the entire config if none provided."""
+        if key is not None:
+            return self.config.get(key, default)
+        return self.config
+
+    def get_playlist_manager(self):
+        return self.playlist_manager
+
+    def get_refresh_info(self):
+        return self.refresh_info
+
 class Config:
     # Base path for the project directory
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,10 +50,17 @@ class Config:
     plugin_image_dir = os.path.join(BASE_DIR, "static", "images", "plugins")
 
     def __init__(self):
+        # held by the single writer, while mutating the model objects and writing the config
+        self.lock = threading.RLock()
+        self.version = 0
+        self.snapshot = None
+
         self.config = self.read_config()
         self.plugins_list = self.read_plugins_list()
+        self.plugins_by_id = {plugin['id']: plugin for plugin in self.plugins_list}
         self.playlist_manager = self.load_playlist_manager()
         self.refresh_info = self.load_refresh_info()
+        self.publish_snapshot()
 
     def read_config(self):
         """Reads the device config JSON file and returns it as a dictionary."""
@@ -53,12 +90,59 @@ class Config:
         return plugins_list
 
     def write_config(self):
-        """Updates the cached config from the model objects and writes to the config file."""
-        logger.debug(f"Writing device config to {self.config_file}")
-        self.update_value("playlist_config", self.playlist_manager.to_dict())
-        self.update_value("refresh_info", self.refresh_info.to_dict())
-        with open(self.config_file, 'w') as outfile:
-            json.dump(self.config, outfile, indent=4)
+        """Writes the config with the model objects to the config file, then updates the cached config and publishes a new snapshot.
+
+        The file is replaced atomically, a crash while writing leaves the previous config in place.
+        If writing fails the cached config and snapshot are left unchanged and the error is raised.
+        Callers changing the model objects should hold the lock from the change until the write.
+        """
+        with self.lock:
+            logger.debug(f"Writing device config to {self.config_file}")
+            config = dict(self.config)
+            config["playlist_config"] = self.playlist_manager.to_dict()
+            config["refresh_info"] = self.refresh_info.to_dict()
+
+            tmp_file = f"{self.config_file}.tmp"
+            try:
+                with open(tmp_file, 'w') as outfile:
+                    json.dump(config, outfile, indent=4)
+                os.replace(tmp_file, self.config_file)
+            except Exception:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+                raise
+
+            self.update_value("playlist_config", config["playlist_config"])
+            self.update_value("refresh_info", config["refresh_info"])
+            self.publish_snapshot()
+
+    def publish_snapshot(self):
+        """Publishes a copy of the current configuration under the next version."""
+        with self.lock:
+            config = copy.deepcopy(self.config)
+            config["playlist_config"] = self.playlist_manager.to_dict()
+            config["refresh_info"] = self.refresh_info.to_dict()
+            self.version += 1
+            self.snapshot = ConfigSnapshot(self.version, config)
+
+    def __getstate__(self):
+        # the lock and the read-only snapshot cannot be pickled, e.g. when sending the config to the plugin sandbox
+        state = self.__dict__.copy()
+        del state["lock"]
+        del state["snapshot"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+        self.snapshot = None
+        # republish under the same version, the copy has the same configuration
+        self.version -= 1
+        self.publish_snapshot()
+
+    def get_snapshot(self):
+        """Returns the latest published snapshot of the configuration, without locking."""
+        return self.snapshot
 
     def get_config(self, key=None, default={}):
         """Gets the value of a specific configuration key or returns the entire config if none provided."""
@@ -72,7 +156,7 @@ class Config:
 
     def get_plugin(self, plugin_id):
         """Finds and returns a plugin config by its ID."""
-        return next((plugin for plugin in self.plugins_list if plugin['id'] == plugin_id), None)
+        return self.plugins_by_id.get(plugin_id)
 
     def get_resolution(self):
         """Returns the display resolution as a tuple (width, height) from the configuration."""
@@ -82,14 +166,16 @@ class Config:
 
     def update_config(self, config):
         """Updates the config with the new values provided and writes to the config file."""
-        self.config.update(config)
-        self.write_config()
+        with self.lock:
+            self.config.update(config)
+            self.write_config()
 
     def update_value(self, key, value, write=False):
         """Updates a specific key in the configuration with a new value and optionally writes it to the config file."""
-        self.config[key] = value
-        if write:
-            self.write_config()
+        with self.lock:
+            self.config[key] = value
+            if write:
+                self.write_config()
 
     def load_env_key(self, key):
         """Loads an environment variable using dotenv and returns its value."""
@@ -3,6 +3,8 @@ import json
 import logging
 
 from utils.image_utils import resize_image, change_orientation, apply_image_enhancement
+from utils.metrics import time_stage
+from utils.tracing import traced, annotate
 from display.mock_display import MockDisplay
 
 logger = logging.getLogger(__name__)
@@ -54,6 +56,7 @@ class DisplayManager:
         else:
             raise ValueError(f"Unsupported display type: {display_type}")
 
+    @traced("DisplayManager.display_image")
     def display_image(self, image, image_settings=[]):
         
         """
@@ -69,16 +72,20 @@ class DisplayManager:
 
         if not hasattr(self, "display"):
             raise ValueError("No valid display instance initialized.")
-        
-        # Save the image
-        logger.info(f"Saving image to {self.device_config.current_image_file}")
-        image.save(self.device_config.current_image_file)
+        annotate(image_size=list(image.size), display_type=self.device_config.get_config("display_type"))
+
+        with time_stage("post_process"):
+            # Save the image
+            logger.info(f"Saving image to {self.device_config.current_image_file}")
+            image.save(self.device_config.current_image_file)
 
-        # Resize and adjust orientation
-        image = change_orientation(image, self.device_config.get_config("orientation"))
-        image = resize_image(image, self.device_config.get_resolution(), image_settings)
-        if self.device_config.get_config("inverted_image"): image = image.rotate(180)
-        image = apply_image_enhancement(image, self.device_config.get_config("image_settings"))
+            # Resize and adjust orientation
+            image = change_orientation(image, self.device_config.get_config("orientation"))
+            image = resize_image(image, self.device_config.get_resolution(), image_settings)
+            if self.device_config.get_config("inverted_image"): image = image.rotate(180)
+            image = apply_image_enhancement(image, self.device_config.get_config("image_settings"))
+        annotate(panel_image_size=list(image.size))
 
         # Pass to the concrete instance to render to the device.
-        self.display.display_image(image, image_settings)
\ No newline at end of file
+        with time_stage("panel_transfer"):
+            self.display.display_image(image, image_settings)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import logging
 from inky.auto import auto
 from display.abstract_display import AbstractDisplay
+from utils.tracing import traced
 
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,7 @@ class InkyDisplay(AbstractDisplay):
                 [int(self.inky_display.width), int(self.inky_display.height)], 
                 write=True)
 
+    @traced("InkyDisplay.display_image")
     def display_image(self, image, image_settings=[]):
         
         """
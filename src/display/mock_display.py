@@ -2,6 +2,7 @@ import os
 import logging
 from datetime import datetime
 from .abstract_display import AbstractDisplay
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ class MockDisplay(AbstractDisplay):
         """Initialize mock display (no-op for development)."""
         logger.info(f"Mock display initialized: {self.width}x{self.height}")
         
+    @traced("MockDisplay.display_image")
     def display_image(self, image, image_settings=[]):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filepath = os.path.join(self.output_dir, f"display_{timestamp}.png")
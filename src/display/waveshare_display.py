@@ -4,6 +4,7 @@ import logging
 import sys
 
 from display.abstract_display import AbstractDisplay
+from utils.tracing import traced
 from PIL import Image
 from pathlib import Path
 from plugins.plugin_registry import get_plugin_instance
@@ -101,6 +102,7 @@ class WaveshareDisplay(AbstractDisplay):
                 write=True)
 
 
+    @traced("WaveshareDisplay.display_image")
     def display_image(self, image, image_settings=[]):
         
         """
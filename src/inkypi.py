@@ -1,5 +1,14 @@
 #!/usr/bin/env python3
 
+# profile module imports when requested, this has to happen before anything else is imported
+import sys
+if '--profile-startup' in sys.argv:
+    from utils.import_profiler import ImportProfiler
+    import_profiler = ImportProfiler()
+    import_profiler.start()
+else:
+    import_profiler = None
+
 # set up logging
 import os, logging.config
 
@@ -25,12 +34,19 @@ from werkzeug.serving import is_running_from_reloader
 from config import Config
 from display.display_manager import DisplayManager
 from refresh_task import RefreshTask
+from upload_processor import UploadProcessor
+from utils.metrics import SystemStatsSampler
+from utils.tracing import configure_tracing
+from utils.render_cache import configure_render_cache
+from utils.web_server import configure_web_server
+from utils.page_cache import configure_page_cache
 from blueprints.main import main_bp
 from blueprints.settings import settings_bp
 from blueprints.plugin import plugin_bp
 from blueprints.playlist import playlist_bp
 from jinja2 import ChoiceLoader, FileSystemLoader
-from plugins.plugin_registry import load_plugins
+from plugins.plugin_registry import load_plugins, warm_up_plugins, start_warm_up
+from plugins.base_plugin.base_plugin import configure_template_environment, configure_render_backends
 from waitress import serve
 
 import locale
@@ -41,6 +57,7 @@ logger = logging.getLogger(__name__)
 # Parse command line arguments
 parser = argparse.ArgumentParser(description='InkyPi Display Server')
 parser.add_argument('--dev', action='store_true', help='Run in development mode')
+parser.add_argument('--profile-startup', action='store_true', help='Log per-module import times during startup')
 args = parser.parse_args()
 
 # Set development mode settings
@@ -62,15 +79,37 @@ template_dirs = [
 app.jinja_loader = ChoiceLoader([FileSystemLoader(directory) for directory in template_dirs])
 
 device_config = Config()
+configure_tracing(device_config)
+configure_render_cache(device_config)
+configure_render_backends(device_config)
 display_manager = DisplayManager(device_config)
 refresh_task = RefreshTask(device_config, display_manager)
+upload_processor = UploadProcessor(device_config)
+stats_sampler = SystemStatsSampler()
 
+# only check plugin templates for changes on disk during development
+configure_template_environment(auto_reload=DEV_MODE)
+configure_page_cache(enabled=not DEV_MODE)
 load_plugins(device_config.get_plugins())
 
+# import the plugins used by playlists ahead of their first refresh
+playlist_plugin_ids = {
+    plugin_instance.plugin_id
+    for playlist in device_config.get_playlist_manager().playlists
+    for plugin_instance in playlist.plugins
+}
+if import_profiler:
+    warm_up_plugins(playlist_plugin_ids)
+    import_profiler.stop()
+    import_profiler.log_report()
+elif device_config.get_config("warm_up_plugins", default=True):
+    start_warm_up(playlist_plugin_ids)
+
 # Store dependencies
 app.config['DEVICE_CONFIG'] = device_config
 app.config['DISPLAY_MANAGER'] = display_manager
 app.config['REFRESH_TASK'] = refresh_task
+app.config['UPLOAD_PROCESSOR'] = upload_processor
 
 # Set additional parameters
 app.config['MAX_FORM_PARTS'] = 10_000
@@ -81,6 +120,9 @@ app.register_blueprint(settings_bp)
 app.register_blueprint(plugin_bp)
 app.register_blueprint(playlist_bp)
 
+# Serve static assets with versioned urls and keep a thread free for the UI
+server_threads = configure_web_server(app, device_config)
+
 # Register opener for HEIF/HEIC images
 register_heif_opener()
 
@@ -91,6 +133,12 @@ if __name__ == '__main__':
     # start the background refresh task
     refresh_task.start()
 
+    # start the background upload processing
+    upload_processor.start()
+
+    # sample system stats for the metrics endpoint
+    stats_sampler.start()
+
     # display default inkypi image on startup
     if device_config.get_config("startup") is True:
         logger.info("Startup flag is set, displaying startup image")
@@ -114,6 +162,8 @@ if __name__ == '__main__':
             except:
                 pass  # Ignore if we can't get the IP
 
-        serve(app, host="0.0.0.0", port=PORT, threads=1)
+        serve(app, host="0.0.0.0", port=PORT, threads=server_threads)
     finally:
         refresh_task.stop()
+        upload_processor.stop()
+        stats_sampler.stop()
@@ -16,6 +16,7 @@ class RefreshInfo:
         playlist (str): Playlist name if refresh_type is 'Playlist'.
         plugin_instance (str): Plugin instance name if refresh_type is 'Playlist'.
     """
+    __slots__ = ("refresh_time", "image_hash", "refresh_type", "plugin_id", "playlist", "plugin_instance")
 
     def __init__(self, refresh_type, plugin_id, refresh_time, image_hash, playlist=None, plugin_instance=None):
         """Initialize RefreshInfo instance."""
@@ -64,13 +65,72 @@ class PlaylistManager:
         playlists (list): A list of Playlist instances managed by the manager.
         active_playlist (str): Name of the currently active playlist.
     """
+    __slots__ = ("playlists", "active_playlist", "_playlists_by_name", "_timeline", "_next_transition")
+
     DEFAULT_PLAYLIST_START = "00:00"
     DEFAULT_PLAYLIST_END = "24:00"
+    MINUTES_PER_DAY = 24 * 60
 
-    def __init__(self, playlists=[], active_playlist=None):
+    def __init__(self, playlists=None, active_playlist=None):
         """Initialize PlaylistManager with a list of playlists."""
-        self.playlists = playlists
+        self.playlists = playlists if playlists is not None else []
         self.active_playlist = active_playlist
+        self._playlists_by_name = None
+        self._timeline = None
+        self._next_transition = None
+
+    def _get_playlists_by_name(self):
+        # rebuilt lazily, the first playlist with a given name wins like the previous linear scan
+        if self._playlists_by_name is None:
+            self._playlists_by_name = {}
+            for playlist in self.playlists:
+                self._playlists_by_name.setdefault(playlist.name, playlist)
+        return self._playlists_by_name
+
+    def invalidate_index(self):
+        """Discards the playlist name index, called whenever playlists are added, renamed or removed."""
+        self._playlists_by_name = None
+
+    def invalidate_timeline(self):
+        """Discards the compiled activation timeline, called whenever playlists or their times change."""
+        self._timeline = None
+        self._next_transition = None
+
+    def _compile_timeline(self):
+        """Maps every minute of the day to the winning playlist and the minutes until the next change.
+
+        A playlist is active from its start minute up to its end minute. When playlists overlap, the
+        shortest one wins, and playlists listed first win ties.
+        """
+        minutes = PlaylistManager.MINUTES_PER_DAY
+        timeline = [None] * minutes
+        winning_priority = [None] * minutes
+        for playlist in self.playlists:
+            priority = playlist.get_priority()
+            for minute in playlist.get_active_minutes():
+                if winning_priority[minute] is None or priority < winning_priority[minute]:
+                    timeline[minute] = playlist
+                    winning_priority[minute] = priority
+
+        # minutes until the winning playlist changes, walking the day backwards twice to wrap around midnight
+        next_transition = [None] * minutes
+        distance = None
+        for index in range(2 * minutes - 1, -1, -1):
+            minute = index % minutes
+            following = (minute + 1) % minutes
+            if timeline[following] is not timeline[minute]:
+                distance = 1
+            elif distance is not None:
+                distance += 1
+            next_transition[minute] = distance
+
+        self._timeline = timeline
+        self._next_transition = next_transition
+
+    def _get_minute(self, current_datetime):
+        if self._timeline is None:
+            self._compile_timeline()
+        return current_datetime.hour * 60 + current_datetime.minute
 
     def get_playlist_names(self):
         """Returns a list of all playlist names."""
@@ -78,6 +138,8 @@ class PlaylistManager:
 
     def add_default_playlist(self):
         """Add a default playlist to the manager, called when no playlists exist."""
+        self.invalidate_index()
+        self.invalidate_timeline()
         return self.playlists.append(
             Playlist("Default", PlaylistManager.DEFAULT_PLAYLIST_START, PlaylistManager.DEFAULT_PLAYLIST_END, []))
 
@@ -91,22 +153,20 @@ class PlaylistManager:
 
     def determine_active_playlist(self, current_datetime):
         """Determine the active playlist based on the current time."""
-        current_time = current_datetime.strftime("%H:%M")  # Get current time in "HH:MM" format
-
-        # get active playlists that have plugins
-        active_playlists = [p for p in self.playlists if p.is_active(current_time)]
-        if not active_playlists:
+        minute = self._get_minute(current_datetime)
+        return self._timeline[minute]
+
+    def get_next_transition(self, current_datetime):
+        """Returns the start of the next minute at which the active playlist changes, or None if it never changes."""
+        minute = self._get_minute(current_datetime)
+        minutes = self._next_transition[minute]
+        if minutes is None:
             return None
-
-        # Sort playlists by priority
-        active_playlists.sort(key=lambda p: p.get_priority())
-        playlist = active_playlists[0]
-
-        return playlist
+        return current_datetime.replace(second=0, microsecond=0) + timedelta(minutes=minutes)
 
     def get_playlist(self, playlist_name):
         """Returns the playlist with the specified name."""
-        return next((p for p in self.playlists if p.name == playlist_name), None)
+        return self._get_playlists_by_name().get(playlist_name)
 
     def add_plugin_to_playlist(self, playlist_name, plugin_data):
         """Adds a plugin to a playlist by the specified name. Returns true if successfully added,
@@ -126,6 +186,8 @@ class PlaylistManager:
         if not end_time:
             end_time = PlaylistManager.DEFAULT_PLAYLIST_END
         self.playlists.append(Playlist(name, start_time, end_time))
+        self.invalidate_index()
+        self.invalidate_timeline()
         return True
 
     def update_playlist(self, old_name, new_name, start_time, end_time):
@@ -135,6 +197,8 @@ class PlaylistManager:
             playlist.name = new_name
             playlist.start_time = start_time
             playlist.end_time = end_time
+            self.invalidate_index()
+            self.invalidate_timeline()
             return True
         logger.warning(f"Playlist '{old_name}' not found.")
         return False
@@ -142,6 +206,8 @@ class PlaylistManager:
     def delete_playlist(self, name):
         """Deletes the playlist with the specified name."""
         self.playlists = [p for p in self.playlists if p.name != name]
+        self.invalidate_index()
+        self.invalidate_timeline()
 
     def to_dict(self):
         return {
@@ -174,6 +240,7 @@ class Playlist:
         plugins (list): A list of PluginInstance objects within the playlist.
         current_plugin_index (int): Index of the currently active plugin in the playlist.
     """
+    __slots__ = ("name", "start_time", "end_time", "plugins", "current_plugin_index", "_plugins_by_key")
 
     def __init__(self, name, start_time, end_time, plugins=None, current_plugin_index=None):
         self.name = name
@@ -181,6 +248,32 @@ class Playlist:
         self.end_time = end_time
         self.plugins = [PluginInstance.from_dict(p) for p in (plugins or [])]
         self.current_plugin_index = current_plugin_index
+        self._plugins_by_key = None
+
+    def _get_plugins_by_key(self):
+        # keyed by (plugin_id, name), the first matching instance wins like the previous linear scan
+        if self._plugins_by_key is None:
+            self._plugins_by_key = {}
+            for plugin in self.plugins:
+                self._plugins_by_key.setdefault((plugin.plugin_id, plugin.name), plugin)
+        return self._plugins_by_key
+
+    def invalidate_index(self):
+        """Discards the plugin instance index, called whenever instances are added, renamed or removed."""
+        self._plugins_by_key = None
+
+    def get_minutes(self):
+        """Returns the start and end time as minutes of the day, '24:00' being 1440."""
+        return tuple(int(hours) * 60 + int(minutes) for hours, minutes in
+                     (value.split(":") for value in (self.start_time, self.end_time)))
+
+    def get_active_minutes(self):
+        """Returns the minutes of the day at which the playlist is active."""
+        start, end = self.get_minutes()
+        if start <= end:
+            return range(start, end)
+        # wrapping window across midnight
+        return [*range(start, PlaylistManager.MINUTES_PER_DAY), *range(0, end)]
 
     def is_active(self, current_time):
         """Check if the playlist is active at the given time."""
@@ -196,7 +289,9 @@ class Playlist:
         if self.find_plugin(plugin_data["plugin_id"], plugin_data["name"]):
             logger.warning(f"Plugin '{plugin_data['plugin_id']}' with instance '{plugin_data['name']}' already exists.")
             return False
-        self.plugins.append(PluginInstance.from_dict(plugin_data))
+        plugin = PluginInstance.from_dict(plugin_data)
+        self.plugins.append(plugin)
+        self._get_plugins_by_key()[(plugin.plugin_id, plugin.name)] = plugin
         return True
 
     def update_plugin(self, plugin_id, instance_name, updated_data):
@@ -204,6 +299,8 @@ class Playlist:
         plugin = self.find_plugin(plugin_id, instance_name)
         if plugin:
             plugin.update(updated_data)
+            if "plugin_id" in updated_data or "name" in updated_data:
+                self.invalidate_index()
             return True
         logger.warning(f"Plugin '{plugin_id}' with name '{instance_name}' not found.")
         return False
@@ -212,7 +309,8 @@ class Playlist:
         """Remove a specific plugin instance from the playlist."""
         initial_count = len(self.plugins)
         self.plugins = [p for p in self.plugins if not (p.plugin_id == plugin_id and p.name == name)]
-        
+        self.invalidate_index()
+
         if len(self.plugins) == initial_count:
             logger.warning(f"Plugin '{plugin_id}' with instance '{name}' not found.")
             return False
@@ -220,7 +318,7 @@ class Playlist:
 
     def find_plugin(self, plugin_id, name):
         """Find a plugin instance by its plugin_id and name."""
-        return next((p for p in self.plugins if p.plugin_id == plugin_id and p.name == name), None)
+        return self._get_plugins_by_key().get((plugin_id, name))
 
     def get_next_plugin(self):
         """Returns the next plugin instance in the playlist and update the current_plugin_index."""
@@ -231,25 +329,25 @@ class Playlist:
         
         return self.plugins[self.current_plugin_index]
 
+    def peek_next_plugin(self):
+        """Returns the plugin instance get_next_plugin would return, without advancing the playlist."""
+        if not self.plugins:
+            return None
+        if self.current_plugin_index is None:
+            return self.plugins[0]
+        return self.plugins[(self.current_plugin_index + 1) % len(self.plugins)]
+
     def get_priority(self):
         """Determine priority of a playlist, based on the time range"""
         return self.get_time_range_minutes()
 
     def get_time_range_minutes(self):
         """Calculate the time difference in minutes between start_time and end_time."""
-        start = datetime.strptime(self.start_time, "%H:%M")
-        # Handle '24:00' by converting it to '00:00' of the next day
-        if self.end_time != "24:00":
-            end = datetime.strptime(self.end_time, "%H:%M")
-        else:
-            end = datetime.strptime("00:00", "%H:%M")
-            end += timedelta(days=1)
-
+        start, end = self.get_minutes()
         # If the window wraps past midnight (EG: 21:00 -> 03:00), treat end as next day
         if end < start:
-            end += timedelta(days=1)
-            
-        return int((end - start).total_seconds() // 60)
+            end += PlaylistManager.MINUTES_PER_DAY
+        return end - start
 
     def to_dict(self):
         return {
@@ -277,16 +375,26 @@ class PluginInstance:
         plugin_id (str): Plugin id for this instance.
         name (str): Name of the plugin instance.
         settings (dict): Settings associated with the plugin.
-        refresh (dict): Refresh settings, such as interval and scheduled time.
+        refresh (dict): Refresh settings, such as interval and scheduled time. An interval refresh
+            with "adaptive": {"max_interval": seconds} backs off while the output is unchanged.
         latest_refresh (str): ISO-formatted string representing the last refresh time.
+        refresh_history (dict): Image hash, data digest and number of unchanged refreshes in a row,
+            tracked for adaptive refreshes.
     """
+    __slots__ = ("plugin_id", "name", "settings", "refresh", "latest_refresh_time", "refresh_history")
+
+    # the interval doubles with each unchanged refresh, up to the max interval
+    ADAPTIVE_BACKOFF_FACTOR = 2
+    # max interval, as a multiple of the interval, when none is configured
+    DEFAULT_ADAPTIVE_MAX_FACTOR = 16
 
-    def __init__(self, plugin_id, name, settings, refresh, latest_refresh_time=None):
+    def __init__(self, plugin_id, name, settings, refresh, latest_refresh_time=None, refresh_history=None):
         self.plugin_id = plugin_id
         self.name = name
         self.settings = settings
         self.refresh = refresh
         self.latest_refresh_time = latest_refresh_time
+        self.refresh_history = refresh_history
 
     def update(self, updated_data):
         """Update attributes of the class with the dictionary values."""
@@ -301,7 +409,7 @@ class PluginInstance:
 
         # Check for interval-based refresh
         if "interval" in self.refresh:
-            interval = self.refresh.get("interval")
+            interval = self.get_refresh_interval()
             if interval and (current_time - latest_refresh_dt) >= timedelta(seconds=interval):
                 return True
 
@@ -328,6 +436,39 @@ class PluginInstance:
 
         return False
 
+    def is_adaptive(self):
+        return bool(self.refresh.get("interval")) and "adaptive" in self.refresh
+
+    def get_refresh_interval(self):
+        """Returns the interval in seconds, lengthened by the unchanged refreshes in a row if adaptive."""
+        interval = self.refresh.get("interval")
+        if not interval or not self.is_adaptive() or not self.refresh_history:
+            return interval
+
+        max_interval = (self.refresh.get("adaptive") or {}).get("max_interval") or interval * PluginInstance.DEFAULT_ADAPTIVE_MAX_FACTOR
+        unchanged = self.refresh_history.get("unchanged", 0)
+        # once the cap is reached more doublings change nothing, stop before the numbers grow huge
+        backoff = PluginInstance.ADAPTIVE_BACKOFF_FACTOR ** min(unchanged, 32)
+        return max(interval, min(interval * backoff, max_interval))
+
+    def record_refresh(self, image_hash, data_digest=None):
+        """Tracks whether a refresh changed the image or the data behind it, for adaptive refreshes.
+
+        Returns True if the output changed, which resets the interval to its configured value.
+        """
+        if not self.is_adaptive():
+            return True
+
+        history = self.refresh_history or {}
+        changed = image_hash != history.get("image_hash") or \
+            (data_digest is not None and data_digest != history.get("data_digest"))
+        self.refresh_history = {
+            "image_hash": image_hash,
+            "data_digest": data_digest,
+            "unchanged": 0 if changed else history.get("unchanged", 0) + 1
+        }
+        return changed
+
     def get_image_path(self):
         """Formats the image path for this plugin instance."""
         return f"{self.plugin_id}_{self.name.replace(' ', '_')}.png"
@@ -340,13 +481,16 @@ class PluginInstance:
         return latest_refresh
     
     def to_dict(self):
-        return {
+        plugin_dict = {
             "plugin_id": self.plugin_id,
             "name": self.name,
             "plugin_settings": self.settings,
             "refresh": self.refresh,
             "latest_refresh_time": self.latest_refresh_time,
         }
+        if self.refresh_history:
+            plugin_dict["refresh_history"] = self.refresh_history
+        return plugin_dict
 
     @classmethod
     def from_dict(cls, data):
@@ -356,4 +500,5 @@ class PluginInstance:
             settings=data["plugin_settings"],
             refresh=data["refresh"],
             latest_refresh_time=data.get("latest_refresh_time"),
+            refresh_history=data.get("refresh_history"),
         )
\ No newline at end of file
@@ -0,0 +1,273 @@
+import logging
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import threading
+import time
+import requests
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from PIL import Image
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_LIMIT_MB = 512
+DEFAULT_TIMEOUT_SECONDS = 180
+DEFAULT_MAX_TASKS_PER_CHILD = 20
+
+PEAK_RSS = REGISTRY.gauge(
+    "inkypi_plugin_peak_rss_bytes",
+    "Highest RSS of the sandbox worker measured while generating a plugin, by plugin.",
+    ("plugin_id",))
+
+# time allowed for a new worker to import its dependencies and report ready
+WORKER_START_TIMEOUT_SECONDS = 60
+
+# image modes that can be copied through shared memory without losing information
+SHARED_IMAGE_MODES = ("1", "L", "RGB", "RGBA")
+
+class PluginSandbox:
+    """Runs plugin image generation in a separate, recycled worker process.
+
+    The worker runs with a soft address space limit, lifted for the browser it starts, each task has a wall-clock timeout after which
+    the worker is killed, and the worker is replaced after a number of tasks so leaks do not
+    accumulate. Images are returned through shared memory, and the peak RSS of each plugin is
+    exported as the inkypi_plugin_peak_rss_bytes gauge.
+
+    Configured by the 'plugin_sandbox' key of the device config:
+        {"enabled": true, "memory_limit_mb": 512, "timeout_seconds": 180, "max_tasks_per_child": 20}
+    """
+
+    def __init__(self, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, timeout_seconds=DEFAULT_TIMEOUT_SECONDS,
+                 max_tasks_per_child=DEFAULT_MAX_TASKS_PER_CHILD):
+        self.memory_limit_mb = memory_limit_mb
+        self.timeout_seconds = timeout_seconds
+        self.max_tasks_per_child = max_tasks_per_child
+
+        self.lock = threading.Lock()
+        self.process = None
+        self.connection = None
+        self.tasks_completed = 0
+
+    @staticmethod
+    def from_config(device_config):
+        """Returns a sandbox for the device config, or None if it is not enabled."""
+        sandbox_config = device_config.get_config("plugin_sandbox", default={}) or {}
+        if not sandbox_config.get("enabled", False):
+            return None
+        return PluginSandbox(
+            memory_limit_mb=sandbox_config.get("memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB),
+            timeout_seconds=sandbox_config.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS),
+            max_tasks_per_child=sandbox_config.get("max_tasks_per_child", DEFAULT_MAX_TASKS_PER_CHILD)
+        )
+
+    def generate_image(self, plugin_config, settings, device_config):
+        """Generates the plugin image in the worker process.
+
+        Changes the plugin makes to its settings are applied to the given settings dict.
+        Raises RuntimeError if the plugin fails, times out or the worker dies.
+        """
+        plugin_id = plugin_config.get("id")
+        with self.lock:
+            self._ensure_worker()
+            start = time.perf_counter()
+            try:
+                self.connection.send({
+                    "plugin_config": plugin_config,
+                    "settings": settings,
+                    "device_config": device_config
+                })
+                if not self.connection.poll(self.timeout_seconds):
+                    self._kill_worker()
+                    raise RuntimeError(f"Plugin '{plugin_id}' timed out after {self.timeout_seconds} seconds.")
+                result = self.connection.recv()
+            except (TypeError, pickle.PicklingError) as e:
+                # nothing was written, the task is pickled before it is sent
+                raise RuntimeError(f"Plugin '{plugin_id}' task cannot be sent to the sandbox worker: {e}") from e
+            except (EOFError, OSError) as e:
+                self._kill_worker()
+                raise RuntimeError(f"Plugin '{plugin_id}' worker exited unexpectedly, it may have exceeded its memory limit.") from e
+
+            self.tasks_completed += 1
+            if self.tasks_completed >= self.max_tasks_per_child:
+                self._stop_worker()
+
+            peak_rss = result.get("peak_rss")
+            if peak_rss:
+                PEAK_RSS.set(max(PEAK_RSS.get(plugin_id=plugin_id) or 0, peak_rss), plugin_id=plugin_id)
+
+        if result.get("error"):
+            # keeps connection failures recognisable to the caller, the original error stays in the worker
+            cause = requests.ConnectionError(result["error"]) if result.get("connection_error") else None
+            raise RuntimeError(result["error"]) from cause
+
+        image = _read_shared_image(result["image"])
+        settings.clear()
+        settings.update(result["settings"])
+
+        peak_rss_mb = f"{peak_rss / (1024 * 1024):.1f} MB" if peak_rss else "unknown"
+        logger.info(f"Generated image in sandbox. | plugin_id: {plugin_id} | time: {(time.perf_counter() - start) * 1000:.0f} ms | peak_rss: {peak_rss_mb}")
+        return image
+
+    def stop(self):
+        with self.lock:
+            self._stop_worker()
+
+    def _ensure_worker(self):
+        if self.process and self.process.poll() is None:
+            return
+
+        parent_socket, child_socket = socket.socketpair()
+        command = [sys.executable, os.path.abspath(__file__), str(child_socket.fileno()), str(self.memory_limit_mb)]
+        # numerical libraries reserve address space per thread, which counts against the memory limit
+        env = dict(os.environ, OPENBLAS_NUM_THREADS="1", OMP_NUM_THREADS="1")
+        self.process = subprocess.Popen(command, pass_fds=(child_socket.fileno(),), env=env,
+                                        cwd=os.path.dirname(os.path.abspath(__file__)))
+        child_socket.close()
+        self.connection = Connection(parent_socket.detach())
+        self.tasks_completed = 0
+
+        if not self.connection.poll(WORKER_START_TIMEOUT_SECONDS) or self.connection.recv() != "ready":
+            self._kill_worker()
+            raise RuntimeError("Plugin sandbox worker failed to start.")
+        logger.info(f"Started plugin sandbox worker. | pid: {self.process.pid} | memory_limit: {self.memory_limit_mb} MB")
+
+    def _stop_worker(self):
+        if not self.process:
+            return
+        try:
+            self.connection.send(None)
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._kill_worker()
+            return
+        self._close()
+
+    def _kill_worker(self):
+        if self.process and self.process.poll() is None:
+            logger.warning(f"Killing plugin sandbox worker. | pid: {self.process.pid}")
+            self.process.kill()
+            self.process.wait()
+        self._close()
+
+    def _close(self):
+        if self.connection:
+            self.connection.close()
+        self.connection = None
+        self.process = None
+
+class SandboxedPlugin:
+    """Exposes the plugin interface used by refresh actions, generating images in a PluginSandbox."""
+
+    def __init__(self, plugin_config, sandbox):
+        self.config = plugin_config
+        self.sandbox = sandbox
+
+    def generate_image(self, settings, device_config):
+        return self.sandbox.generate_image(self.config, settings, device_config)
+
+def _write_shared_image(image):
+    if image.mode not in SHARED_IMAGE_MODES:
+        image = image.convert("RGBA" if "transparency" in image.info or "A" in image.mode else "RGB")
+    data = image.tobytes()
+    shared_memory = SharedMemory(create=True, size=max(len(data), 1))
+    shared_memory.buf[:len(data)] = data
+    shared_memory.close()
+    # the parent process unlinks the segment once it has copied the image
+    resource_tracker.unregister(shared_memory._name, "shared_memory")
+    return {"name": shared_memory.name, "mode": image.mode, "size": image.size, "length": len(data)}
+
+def _read_shared_image(shared_image):
+    shared_memory = SharedMemory(name=shared_image["name"])
+    try:
+        image = Image.frombytes(shared_image["mode"], shared_image["size"], bytes(shared_memory.buf[:shared_image["length"]]))
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+    return image
+
+def _get_peak_rss():
+    """Returns the peak RSS of this process in bytes since the last reset."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def _limit_address_space(memory_limit_mb):
+    """Sets the soft address space limit of this process.
+
+    The hard limit is kept, so children like the Chromium started for screenshots can lift it,
+    the browser reserves far more address space than it uses.
+    """
+    import resource
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = memory_limit_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _worker_main(fd, memory_limit_mb):
+    import locale
+    import logging.config
+
+    logging.config.fileConfig(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'logging.conf'))
+    worker_logger = logging.getLogger("plugin_sandbox.worker")
+
+    _limit_address_space(memory_limit_mb)
+
+    from pi_heif import register_heif_opener
+    from plugins.plugin_registry import load_plugins, get_plugin_instance
+    from plugins.base_plugin.base_plugin import configure_render_backends
+    from utils.http_utils import is_connection_error
+    register_heif_opener()
+    try:
+        locale.setlocale(locale.LC_TIME, "pl_PL.UTF-8")
+    except locale.Error:
+        pass
+
+    connection = Connection(fd)
+    connection.send("ready")
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            # the parent process exited
+            break
+        if task is None:
+            break
+
+        plugin_config = task["plugin_config"]
+        settings = task["settings"]
+        _reset_peak_rss()
+        try:
+            # the worker has no config of its own, the backends follow the config sent with the task
+            configure_render_backends(task["device_config"])
+            load_plugins([plugin_config])
+            plugin = get_plugin_instance(plugin_config)
+            image = plugin.generate_image(settings, task["device_config"])
+            result = {"image": _write_shared_image(image), "settings": settings}
+        except Exception as e:
+            worker_logger.exception(f"Plugin failed in sandbox. | plugin_id: {plugin_config.get('id')}")
+            result = {"error": str(e) or e.__class__.__name__, "connection_error": is_connection_error(e)}
+        result["peak_rss"] = _get_peak_rss()
+        connection.send(result)
+    connection.close()
+
+if __name__ == "__main__":
+    _worker_main(int(sys.argv[1]), int(sys.argv[2]))
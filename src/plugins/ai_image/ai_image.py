@@ -1,4 +1,5 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from utils.http_utils import DEFAULT_TIMEOUT
 from openai import OpenAI
 from PIL import Image
 from io import BytesIO
@@ -81,7 +82,7 @@ class AIImage(BasePlugin):
         response = ai_client.images.generate(**args)
         if model in ["dall-e-3", "dall-e-2"]:
             image_url = response.data[0].url
-            response = requests.get(image_url)
+            response = requests.get(image_url, timeout=DEFAULT_TIMEOUT)
             img = Image.open(BytesIO(response.content))
         elif model == "gpt-image-1":
             image_base64 = response.data[0].b64_json
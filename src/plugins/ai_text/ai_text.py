@@ -1,4 +1,5 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.native_layout import NativeCanvas, TextBox
 from utils.app_utils import resolve_path
 from openai import OpenAI
 from PIL import Image, ImageDraw, ImageFont
@@ -59,6 +60,18 @@ class AIText(BasePlugin):
 
         return image
     
+    def render_native(self, dimensions, html_file, template_params):
+        canvas = NativeCanvas(dimensions, template_params.get("plugin_settings"))
+        # font sizes are relative to the content box, the text-content container
+        container_height = canvas.box_height
+        container_width = canvas.box_width
+        canvas.stack([
+            TextBox(template_params["title"], min(container_height * 0.1, container_width * 0.08), "bold"),
+            TextBox(template_params["content"], min(container_height * 0.06, container_width * 0.05),
+                    max_height=container_height * 0.8)
+        ], gap=canvas.vh(1))
+        return canvas.image
+
     @staticmethod
     def fetch_text_prompt(ai_client, model, text_prompt):
         logger.info(f"Getting random text prompt from input {text_prompt}, model: {model}")
@@ -6,6 +6,7 @@ For the API key, set `NASA_SECRET={API_KEY}` in your .env file.
 """
 
 from plugins.base_plugin.base_plugin import BasePlugin
+from utils.http_utils import DEFAULT_TIMEOUT
 from PIL import Image
 from io import BytesIO
 import requests
@@ -44,7 +45,7 @@ class Apod(BasePlugin):
         elif settings.get("customDate"):
             params["date"] = settings["customDate"]
 
-        response = requests.get("https://api.nasa.gov/planetary/apod", params=params)
+        response = requests.get("https://api.nasa.gov/planetary/apod", params=params, timeout=DEFAULT_TIMEOUT)
 
         if response.status_code != 200:
             logger.error(f"NASA API error: {response.text}")
@@ -58,7 +59,7 @@ class Apod(BasePlugin):
         image_url = data.get("hdurl") or data.get("url")
 
         try:
-            img_data = requests.get(image_url)
+            img_data = requests.get(image_url, timeout=DEFAULT_TIMEOUT)
             image = Image.open(BytesIO(img_data.content))
         except Exception as e:
             logger.error(f"Failed to load APOD image: {str(e)}")
@@ -1,8 +1,14 @@
 import logging
 import os
+import time
 from utils.app_utils import resolve_path, get_fonts
 from utils.image_utils import take_screenshot_html
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from utils.asset_bundle import get_style_bundle
+from utils.metrics import observe_stage
+from utils.data_cache import get_data_key, read_cached_data, write_cached_data, MAX_STALE_SECONDS
+from utils.render_cache import is_enabled as render_cache_enabled, compute_render_digest, get_cached_render, put_cached_render, get_hit_rates
+from utils.tracing import traced, span
+from jinja2 import Environment, FileSystemLoader, ChoiceLoader, FileSystemBytecodeCache, select_autoescape
 from pathlib import Path
 import asyncio
 import base64
@@ -13,6 +19,20 @@ STATIC_DIR = resolve_path("static")
 PLUGINS_DIR = resolve_path("plugins")
 BASE_PLUGIN_DIR =  os.path.join(PLUGINS_DIR, "base_plugin")
 BASE_PLUGIN_RENDER_DIR = os.path.join(BASE_PLUGIN_DIR, "render")
+TEMPLATE_CACHE_DIR = resolve_path(os.path.join("cache", "templates"))
+
+# static inputs shared by every rendered template
+BASE_STYLE_SHEET = os.path.join(BASE_PLUGIN_RENDER_DIR, "plugin.css")
+BASE_TEMPLATE = os.path.join(BASE_PLUGIN_RENDER_DIR, "plugin.html")
+FONT_FACES = get_fonts()
+STYLE_BUNDLE_PLACEHOLDER = "/* style bundle */"
+
+# jinja2 environment shared by all plugins, created on first use
+_template_env = None
+_template_auto_reload = False
+
+# render backends selected in the device config by plugin id, see configure_render_backends
+_render_backends = {}
 
 FRAME_STYLES = [
     {
@@ -33,22 +53,143 @@ FRAME_STYLES = [
     }
 ]
 
+def configure_template_environment(auto_reload=False):
+    """Sets whether templates are checked for changes on disk, should only be enabled in development."""
+    global _template_env, _template_auto_reload
+    _template_auto_reload = auto_reload
+    if _template_env is not None:
+        _template_env.auto_reload = auto_reload
+
+def configure_render_backends(device_config):
+    """Selects the render backend of plugins from the 'render_backends' key of the device config.
+
+        {"countdown": "native", "year_progress": "native"}
+
+    Plugins not listed use the 'render_backend' of their plugin-info.json, 'chromium' by default.
+    """
+    global _render_backends
+    _render_backends = dict(device_config.get_config("render_backends", default={}) or {})
+
+def get_template_environment():
+    """Returns the jinja2 environment used to render plugin templates.
+
+    Templates are addressed as '<plugin_id>/render/<file>', while 'plugin.html' resolves to the
+    base plugin template. Compiled templates are persisted so they survive restarts.
+    """
+    global _template_env
+    if _template_env is None:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        _template_env = Environment(
+            loader=ChoiceLoader([FileSystemLoader(PLUGINS_DIR), FileSystemLoader(BASE_PLUGIN_RENDER_DIR)]),
+            bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+            auto_reload=_template_auto_reload,
+            autoescape=select_autoescape(['html', 'xml'])
+        )
+    return _template_env
+
+# seconds fetched data stays fresh when a plugin does not set a ttl
+DEFAULT_DATA_TTL = 15 * 60
+
+class PluginData:
+    """Data fetched by a plugin, serializable to JSON, with the number of seconds it stays fresh."""
+    __slots__ = ("data", "ttl", "fetched_at")
+
+    def __init__(self, data, ttl=DEFAULT_DATA_TTL, fetched_at=None):
+        self.data = data
+        self.ttl = ttl
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    def get_age(self):
+        return time.time() - self.fetched_at
+
+    def is_fresh(self):
+        return self.get_age() < self.ttl
+
+    def to_dict(self):
+        return {"data": self.data, "ttl": self.ttl, "fetched_at": self.fetched_at}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data=data["data"], ttl=data.get("ttl", DEFAULT_DATA_TTL), fetched_at=data.get("fetched_at"))
+
 class BasePlugin:
     """Base class for all plugins."""
+
+    # template params that change on every refresh but are not drawn into the image, left out of the
+    # render cache digest so they don't prevent cache hits. A param the template renders, such as a
+    # displayed refresh time, must stay in the digest or a hit would show its old value
+    volatile_template_params = ()
+
     def __init__(self, config, **dependencies):
         self.config = config
 
         self.render_dir = self.get_plugin_dir("render")
         if os.path.exists(self.render_dir):
-            # instantiate jinja2 env with base plugin and current plugin render directories
-            loader = FileSystemLoader([self.render_dir, BASE_PLUGIN_RENDER_DIR])
-            self.env = Environment(
-                loader=loader,
-                autoescape=select_autoescape(['html', 'xml'])
-            )
+            self.env = get_template_environment()
 
     def generate_image(self, settings, device_config):
-        raise NotImplementedError("generate_image must be implemented by subclasses")
+        """Returns the image of the plugin, plugins either override this or implement fetch_data and render."""
+        if not self.is_two_phase():
+            raise NotImplementedError("generate_image must be implemented by subclasses")
+
+        data = self.get_data(settings, device_config)
+        return self.render(data.data, settings, device_config)
+
+    def fetch_data(self, settings, device_config):
+        """Optional first phase of generate_image, fetching everything the image needs over the network.
+
+        Returns a PluginData with JSON serializable data, which is cached for its ttl and passed to render.
+        """
+        raise NotImplementedError("fetch_data must be implemented by two phase plugins")
+
+    def render(self, data, settings, device_config):
+        """Second phase of generate_image, producing the image from the data returned by fetch_data."""
+        raise NotImplementedError("render must be implemented by two phase plugins")
+
+    def is_two_phase(self):
+        """Whether the plugin implements fetch_data and render instead of generate_image."""
+        return type(self).fetch_data is not BasePlugin.fetch_data
+
+    def get_data(self, settings, device_config):
+        """Returns the cached data while it is fresh, otherwise fetches it.
+
+        When fetching fails, data up to MAX_STALE_SECONDS old is used instead, so the plugin can still
+        render while offline.
+        """
+        key = get_data_key(self.get_plugin_id(), settings)
+        cached = read_cached_data(key)
+        cached = PluginData.from_dict(cached) if cached else None
+        if cached and cached.is_fresh():
+            logger.info(f"Using cached plugin data. | plugin_id: {self.get_plugin_id()} | age: {cached.get_age():.0f} s")
+            return cached
+
+        try:
+            with span("fetch_data"):
+                data = self.fetch_data(settings, device_config)
+        except Exception as e:
+            if not cached or cached.get_age() > MAX_STALE_SECONDS:
+                raise
+            logger.warning(f"Failed to fetch plugin data, using stale data. | plugin_id: {self.get_plugin_id()} | age: {cached.get_age():.0f} s | error: {e}")
+            return cached
+
+        write_cached_data(key, data.to_dict())
+        return data
+
+    def prefetch_data(self, settings, device_config):
+        """Fetches the data ahead of the refresh that renders it, unless the cached data is still fresh."""
+        if not self.is_two_phase():
+            return
+        try:
+            self.get_data(settings, device_config)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch plugin data. | plugin_id: {self.get_plugin_id()} | error: {e}")
+
+    def get_dimensions(self, device_config):
+        """Returns the dimensions of the image for the resolution and orientation of the device."""
+        dimensions = device_config.get_resolution()
+        if device_config.get_config("orientation") == "vertical":
+            dimensions = dimensions[::-1]
+        return dimensions
 
     def cleanup(self, settings):
         """Optional cleanup method that plugins can override to delete associated resources.
@@ -80,21 +221,87 @@ class BasePlugin:
         template_params['frame_styles'] = FRAME_STYLES
         return template_params
 
+    def get_render_backend(self):
+        """Returns the backend used by render_image, selected in the device config or the plugin-info.json."""
+        return _render_backends.get(self.get_plugin_id()) or self.config.get("render_backend", "chromium")
+
+    def render_native(self, dimensions, html_file, template_params):
+        """Optional Pillow implementation of a template, used by the 'native' render backend.
+
+        Plugins override this to draw the page described by html_file without a browser.
+        Returning None falls back to rendering the template with Chromium.
+        """
+        return None
+
+    def get_render_digest(self, dimensions, html_file, css_file=None, template_params={}):
+        """Returns the digest identifying the rendered image in the render cache."""
+        css_files = [BASE_STYLE_SHEET]
+        if css_file:
+            css_files.append(os.path.join(self.render_dir, css_file))
+        template_files = [BASE_TEMPLATE, os.path.join(self.render_dir, html_file)]
+        return compute_render_digest(self.get_plugin_id(), self.get_render_backend(), dimensions,
+                                     template_files, css_files, template_params, self.volatile_template_params)
+
+    @traced("BasePlugin.render_image")
     def render_image(self, dimensions, html_file, css_file=None, template_params={}):
+        """Renders the template, returning the cached image when it was rendered before with the same inputs."""
+        if not render_cache_enabled():
+            return self._render_image(dimensions, html_file, css_file, template_params)
+
+        digest = self.get_render_digest(dimensions, html_file, css_file, template_params)
+        image = get_cached_render(digest, self.get_plugin_id())
+        if image is not None:
+            hit_rate = get_hit_rates().get(self.get_plugin_id(), 0)
+            logger.info(f"Rendered image from cache. | plugin_id: {self.get_plugin_id()} | digest: {digest} | hit_rate: {hit_rate:.0%}")
+            return image
+
+        image = self._render_image(dimensions, html_file, css_file, template_params)
+        if image is not None:
+            put_cached_render(digest, image)
+        return image
+
+    def _render_image(self, dimensions, html_file, css_file=None, template_params={}):
+        if self.get_render_backend() == "native":
+            start = time.perf_counter()
+            try:
+                image = self.render_native(dimensions, html_file, template_params)
+            except Exception as e:
+                logger.warning(f"Native rendering failed, falling back to chromium. | plugin_id: {self.get_plugin_id()} | error: {e}")
+                image = None
+            if image is not None:
+                elapsed = time.perf_counter() - start
+                observe_stage("native", elapsed, self.get_plugin_id())
+                logger.info(f"Rendered image. | plugin_id: {self.get_plugin_id()} | native: {elapsed * 1000:.0f} ms")
+                return image
+
+        return self.render_html(dimensions, html_file, css_file, template_params)
+
+    def render_html(self, dimensions, html_file, css_file=None, template_params={}):
+        """Renders the html template with Chromium and returns the screenshot."""
         # load the base plugin and current plugin css files
-        css_files = [os.path.join(BASE_PLUGIN_RENDER_DIR, "plugin.css")]
+        css_files = [BASE_STYLE_SHEET]
         if css_file:
-            plugin_css = os.path.join(self.render_dir, css_file)
-            css_files.append(plugin_css)
+            css_files.append(os.path.join(self.render_dir, css_file))
 
         template_params["style_sheets"] = css_files
+        # the fonts are subsetted to the rendered text, the bundle is inserted once the template is rendered
+        template_params["style_bundle"] = STYLE_BUNDLE_PLACEHOLDER
         template_params["width"] = dimensions[0]
         template_params["height"] = dimensions[1]
-        template_params["font_faces"] = get_fonts()
+        template_params["font_faces"] = FONT_FACES
         template_params["static_dir"] = STATIC_DIR
 
         # load and render the given html template
-        template = self.env.get_template(html_file)
+        start = time.perf_counter()
+        template = self.env.get_template(f"{self.get_plugin_id()}/render/{html_file}")
         rendered_html = template.render(template_params)
+        rendered_html = rendered_html.replace(STYLE_BUNDLE_PLACEHOLDER, get_style_bundle(css_files, rendered_html), 1)
+        timings = {"template": time.perf_counter() - start}
+
+        image = take_screenshot_html(rendered_html, dimensions, timings=timings)
 
-        return take_screenshot_html(rendered_html, dimensions)
+        for stage, seconds in timings.items():
+            observe_stage(stage, seconds, self.get_plugin_id())
+        stages = " | ".join(f"{stage}: {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+        logger.info(f"Rendered image. | plugin_id: {self.get_plugin_id()} | {stages}")
+        return image
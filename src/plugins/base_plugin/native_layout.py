@@ -0,0 +1,254 @@
+import logging
+import os
+from PIL import Image, ImageColor, ImageDraw, ImageOps
+from utils.app_utils import get_font, get_text_length, wrap_text
+
+logger = logging.getLogger(__name__)
+
+# css defaults used by plugin.html and plugin.css
+BODY_PADDING_VW = 1.5
+FRAME_BORDER_VW = 0.7
+CORNER_SIZE_VW = 10
+CORNER_BOTTOM_BORDER_VW = 0.5
+DEFAULT_MARGIN = 5
+
+BOLD_WEIGHTS = ("bold", "600", "700", "800", "900")
+
+def get_layout_font(font_family, font_size, font_weight="normal"):
+    """Returns the cached font for a css font weight."""
+    weight = "bold" if str(font_weight) in BOLD_WEIGHTS else "normal"
+    return get_font(font_family, font_size, weight)
+
+class TextBox:
+    """A block of text laid out by a NativeCanvas, mirroring a css block with text content."""
+
+    def __init__(self, text, font_size, font_weight="normal", font_family="Jost", line_height=None,
+                 letter_spacing=0, align="center", margin_top=0, margin_bottom=0, max_height=None,
+                 uppercase=False):
+        text = "" if text is None else str(text)
+        self.text = text.upper() if uppercase else text
+        self.font = get_layout_font(font_family, font_size, font_weight)
+        self.font_size = font_size
+        self.line_height = line_height
+        self.letter_spacing = letter_spacing
+        self.align = align
+        self.margin_top = margin_top
+        self.margin_bottom = margin_bottom
+        self.max_height = max_height
+
+    def measure(self, canvas, width):
+        # empty elements collapse, like an empty div
+        if not self.text:
+            return [], 0
+        lines = canvas.wrap_text(self.text, self.font, width, self.letter_spacing)
+        line_box = canvas.get_line_box(self.font, self.font_size, self.line_height)
+        if self.max_height is not None:
+            lines = lines[:max(1, int(self.max_height // line_box))]
+        return lines, line_box * len(lines)
+
+    def get_height(self, canvas, width):
+        return self.margin_top + self.measure(canvas, width)[1] + self.margin_bottom
+
+    def draw(self, canvas, x, y, width):
+        lines, _ = self.measure(canvas, width)
+        y += self.margin_top
+        for line in lines:
+            y += canvas.draw_text_line(x, y, width, line, self.font, self.font_size,
+                                       self.align, self.line_height, self.letter_spacing)
+        return y + self.margin_bottom
+
+class Block:
+    """A fixed height element drawn by a callback, receiving the canvas and its (x, y, width, height) box."""
+
+    def __init__(self, height, draw_fn, margin_top=0, margin_bottom=0):
+        self.height = height
+        self.draw_fn = draw_fn
+        self.margin_top = margin_top
+        self.margin_bottom = margin_bottom
+
+    def get_height(self, canvas, width):
+        return self.margin_top + self.height + self.margin_bottom
+
+    def draw(self, canvas, x, y, width):
+        y += self.margin_top
+        self.draw_fn(canvas, (x, y, width, self.height))
+        return y + self.height + self.margin_bottom
+
+class NativeCanvas:
+    """Renders the base plugin page (background, margins, padding and frame) directly with Pillow.
+
+    Plugins with simple layouts use it to draw their content with ImageDraw instead of taking a
+    Chromium screenshot. Sizes follow the css of plugin.html, so viewport units are exposed through
+    vw, vh and vmin.
+    """
+
+    def __init__(self, dimensions, plugin_settings=None):
+        self.width, self.height = dimensions
+        self.settings = plugin_settings or {}
+        self.text_color = self.parse_color(self.settings.get("textColor"), (0, 0, 0))
+
+        self.image = self._create_background()
+        self.draw = ImageDraw.Draw(self.image)
+
+        # the body box, inside the margins
+        left = self._get_margin("leftMargin")
+        top = self._get_margin("topMargin")
+        right = self.width - self._get_margin("rightMargin")
+        bottom = self.height - self._get_margin("bottomMargin")
+        self._draw_frame(left, top, right, bottom)
+
+        frame = self.settings.get("selectedFrame")
+        border = self.vw(FRAME_BORDER_VW)
+        side_border = border if frame == "Rectangle" else 0
+        vertical_border = border if frame in ("Rectangle", "Top and Bottom") else 0
+        padding = self.vw(BODY_PADDING_VW)
+
+        # the content box of the page, which plugins lay out their elements in
+        self.box = (
+            left + side_border + padding,
+            top + vertical_border + padding,
+            right - side_border - padding,
+            bottom - vertical_border - padding
+        )
+
+    @staticmethod
+    def parse_color(value, default):
+        if not value:
+            return default
+        try:
+            return ImageColor.getrgb(value)[:3]
+        except ValueError:
+            return default
+
+    def vw(self, value):
+        return self.width * value / 100
+
+    def vh(self, value):
+        return self.height * value / 100
+
+    def vmin(self, value):
+        return min(self.vw(value), self.vh(value))
+
+    @property
+    def box_width(self):
+        return self.box[2] - self.box[0]
+
+    @property
+    def box_height(self):
+        return self.box[3] - self.box[1]
+
+    def _get_margin(self, key):
+        value = self.settings.get(key) or self.settings.get("margin") or DEFAULT_MARGIN
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return DEFAULT_MARGIN
+
+    def _create_background(self):
+        background = Image.new("RGB", (self.width, self.height), (255, 255, 255))
+        option = self.settings.get("backgroundOption")
+        if option == "color":
+            background.paste(self.parse_color(self.settings.get("backgroundColor"), (255, 255, 255)),
+                             (0, 0, self.width, self.height))
+        elif option == "image":
+            image_file = self.settings.get("backgroundImageFile")
+            if image_file and os.path.isfile(image_file):
+                try:
+                    with Image.open(image_file) as img:
+                        img = ImageOps.exif_transpose(img).convert("RGB")
+                        background = ImageOps.fit(img, (self.width, self.height))
+                except Exception as e:
+                    logger.warning(f"Failed to load background image {image_file}: {e}")
+        return background
+
+    def _draw_frame(self, left, top, right, bottom):
+        frame = self.settings.get("selectedFrame")
+        border = max(1, round(self.vw(FRAME_BORDER_VW)))
+        if frame == "Rectangle":
+            self.fill_rect(left, top, right, top + border)
+            self.fill_rect(left, bottom - border, right, bottom)
+            self.fill_rect(left, top, left + border, bottom)
+            self.fill_rect(right - border, top, right, bottom)
+        elif frame == "Top and Bottom":
+            self.fill_rect(left, top, right, top + border)
+            self.fill_rect(left, bottom - border, right, bottom)
+        elif frame == "Corner":
+            size = self.vw(CORNER_SIZE_VW)
+            self.fill_rect(left, top, left + size, top + border)
+            self.fill_rect(left, top, left + border, top + size)
+            bottom_border = max(1, round(self.vw(CORNER_BOTTOM_BORDER_VW)))
+            self.fill_rect(right - size, bottom - bottom_border, right, bottom)
+            self.fill_rect(right - bottom_border, bottom - size, right, bottom)
+
+    def fill_rect(self, x0, y0, x1, y1, fill=None):
+        if x1 > x0 and y1 > y0:
+            self.draw.rectangle((round(x0), round(y0), round(x1) - 1, round(y1) - 1), fill=fill or self.text_color)
+
+    def get_text_width(self, text, font, letter_spacing=0):
+        return get_text_length(font, text) + letter_spacing * len(text)
+
+    def get_line_box(self, font, font_size, line_height=None):
+        """Returns the height of a line box, line_height is a multiple of the font size or None for 'normal'."""
+        if line_height is None:
+            ascent, descent = font.getmetrics()
+            return ascent + descent
+        return font_size * line_height
+
+    def wrap_text(self, text, font, max_width, letter_spacing=0):
+        """Wraps text to the given width, keeping explicit line breaks like 'white-space: pre-line'."""
+        return wrap_text(text, font, max_width, letter_spacing, pre_line=True)
+
+    def draw_text_line(self, x, y, width, text, font, font_size, align="center", line_height=None,
+                       letter_spacing=0, fill=None):
+        """Draws a single line in a line box starting at y, returns the height of the line box."""
+        line_box = self.get_line_box(font, font_size, line_height)
+        ascent, descent = font.getmetrics()
+        baseline = y + (line_box - ascent - descent) / 2 + ascent
+
+        text_width = self.get_text_width(text, font, letter_spacing)
+        if align == "center":
+            x += (width - text_width) / 2
+        elif align == "right":
+            x += width - text_width
+
+        fill = fill or self.text_color
+        if letter_spacing:
+            for char in text:
+                self.draw.text((x, baseline), char, font=font, fill=fill, anchor="ls")
+                x += font.getlength(char) + letter_spacing
+        else:
+            self.draw.text((x, baseline), text, font=font, fill=fill, anchor="ls")
+        return line_box
+
+    def stack(self, elements, box=None, gap=0, valign="center"):
+        """Lays out the elements in a column within box, returns the bottom of the last element."""
+        x0, y0, x1, y1 = box or self.box
+        width = x1 - x0
+        heights = [element.get_height(self, width) for element in elements]
+        total = sum(heights) + gap * max(0, len(elements) - 1)
+
+        y = y0
+        if valign == "center":
+            y += (y1 - y0 - total) / 2
+        elif valign == "bottom":
+            y = y1 - total
+
+        for element in elements:
+            y = element.draw(self, x0, y, width) + gap
+        return y - gap
+
+    def paste_icon(self, icon_path, x, y, size, fill=None):
+        """Draws the alpha channel of an icon in the given colour, like an svg with 'fill: currentColor'."""
+        try:
+            with Image.open(icon_path) as icon:
+                mask = icon.convert("RGBA").getchannel("A").resize((round(size), round(size)), Image.LANCZOS)
+        except OSError as e:
+            logger.warning(f"Failed to load icon {icon_path}: {e}")
+            return
+        self.image.paste(fill or self.text_color, (round(x), round(y)), mask)
+
+    def center_box(self, width_percent=100):
+        """Returns the content box narrowed to the given width and centered horizontally."""
+        x0, y0, x1, y1 = self.box
+        inset = (x1 - x0) * (100 - width_percent) / 200
+        return (x0 + inset, y0, x1 - inset, y1)
@@ -1,18 +1,23 @@
 import os
 from utils.app_utils import resolve_path, get_font
-from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.base_plugin import BasePlugin, PluginData
 from plugins.calendar.constants import LOCALE_MAP, FONT_SIZES
 from PIL import Image, ImageColor, ImageDraw, ImageFont
 import icalendar
 import recurring_ical_events
 from io import BytesIO
 import logging
-import requests
+from utils import http_utils
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import pytz
 
 logger = logging.getLogger(__name__)
 
+# seconds the downloaded calendars are reused for, events are still placed at the time of each render
+CALENDAR_DATA_TTL = 15 * 60
+MAX_CONCURRENT_FETCHES = 4
+
 class Calendar(BasePlugin):
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
@@ -20,34 +25,29 @@ class Calendar(BasePlugin):
         template_params['locale_map'] = LOCALE_MAP
         return template_params
 
-    def generate_image(self, settings, device_config):
-        calendar_urls = settings.get('calendarURLs[]')
+    def fetch_data(self, settings, device_config):
+        calendar_urls = self.validate_settings(settings)
+
+        # the calendars are independent, so they are downloaded concurrently
+        with ThreadPoolExecutor(max_workers=min(len(calendar_urls), MAX_CONCURRENT_FETCHES)) as executor:
+            calendars = list(executor.map(self.fetch_calendar_text, calendar_urls))
+        return PluginData({"calendars": calendars}, ttl=CALENDAR_DATA_TTL)
+
+    def render(self, data, settings, device_config):
         calendar_colors = settings.get('calendarColors[]')
         view = settings.get("viewMode")
 
-        if not view:
-            raise RuntimeError("View is required")
-        elif view not in ["timeGridDay", "timeGridWeek", "dayGrid", "dayGridMonth", "listMonth"]:
-            raise RuntimeError("Invalid view")
+        dimensions = self.get_dimensions(device_config)
 
-        if not calendar_urls:
-            raise RuntimeError("At least one calendar URL is required")
-        for url in calendar_urls:
-            if not url.strip():
-                raise RuntimeError("Invalid calendar URL")
-
-        dimensions = device_config.get_resolution()
-        if device_config.get_config("orientation") == "vertical":
-            dimensions = dimensions[::-1]
-        
         timezone = device_config.get_config("timezone", default="America/New_York")
         time_format = device_config.get_config("time_format", default="12h")
         tz = pytz.timezone(timezone)
 
         current_dt = datetime.now(tz)
         start, end = self.get_view_range(view, current_dt, settings)
-        logger.debug(f"Fetching events for {start} --> [{current_dt}] --> {end}")
-        events = self.fetch_ics_events(calendar_urls, calendar_colors, tz, start, end)
+        logger.debug(f"Parsing events for {start} --> [{current_dt}] --> {end}")
+        calendars = [self.parse_calendar(text) for text in data["calendars"]]
+        events = self.get_events(calendars, calendar_colors, tz, start, end)
         if not events:
             logger.warn("No events found for ics url")
 
@@ -69,12 +69,28 @@ class Calendar(BasePlugin):
         if not image:
             raise RuntimeError("Failed to take screenshot, please check logs.")
         return image
-    
-    def fetch_ics_events(self, calendar_urls, colors, tz, start_range, end_range):
+
+    def validate_settings(self, settings):
+        """Validates the view and calendar urls, returns the urls."""
+        calendar_urls = settings.get('calendarURLs[]')
+        view = settings.get("viewMode")
+
+        if not view:
+            raise RuntimeError("View is required")
+        elif view not in ["timeGridDay", "timeGridWeek", "dayGrid", "dayGridMonth", "listMonth"]:
+            raise RuntimeError("Invalid view")
+
+        if not calendar_urls:
+            raise RuntimeError("At least one calendar URL is required")
+        for url in calendar_urls:
+            if not url.strip():
+                raise RuntimeError("Invalid calendar URL")
+        return calendar_urls
+
+    def get_events(self, calendars, colors, tz, start_range, end_range):
         parsed_events = []
 
-        for calendar_url, color in zip(calendar_urls, colors):
-            cal = self.fetch_calendar(calendar_url)
+        for cal, color in zip(calendars, colors):
             events = recurring_ical_events.of(cal).between(start_range, end_range)
             contrast_color = self.get_contrast_color(color)
 
@@ -137,14 +153,20 @@ class Calendar(BasePlugin):
             end = (dtstart + duration).isoformat()
         return start, end, all_day
 
-    def fetch_calendar(self, calendar_url):
+    def fetch_calendar_text(self, calendar_url):
         try:
-            response = requests.get(calendar_url)
+            response = http_utils.get(calendar_url)
             response.raise_for_status()
-            return icalendar.Calendar.from_ical(response.text)
+            return response.text
         except Exception as e:
             raise RuntimeError(f"Failed to fetch iCalendar url: {str(e)}")
 
+    def parse_calendar(self, calendar_text):
+        try:
+            return icalendar.Calendar.from_ical(calendar_text)
+        except Exception as e:
+            raise RuntimeError(f"Failed to parse iCalendar: {str(e)}")
+
     def get_contrast_color(self, color):
         """
         Returns '#000000' (black) or '#ffffff' (white) depending on the contrast
@@ -6,7 +6,12 @@ from io import BytesIO
 import logging
 import numpy as np
 import math
+import threading
+import zlib
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from PIL import ImageChops
 import pytz
 
 logger = logging.getLogger(__name__)
@@ -41,6 +46,61 @@ CLOCK_FACES = [
 DEFAULT_TIMEZONE = "US/Eastern"
 DEFAULT_CLOCK_FACE = "Gradientowy Zegar"
 
+# resolution of the quantized polar angle used by the gradients, a power of two
+ANGLE_STEPS = 8192
+
+# cached dynamic frames of the word and digital faces, stored as compressed patches
+DEFAULT_FRAME_CACHE_MAX_MB = 32
+
+WORD_GRID = [
+    ['I','T','L','I','S','A','S','A','M','P','M'],
+    ['A','C','Q','U','A','R','T','E','R','D','C'],
+    ['T','W','E','N','T','Y','F','I','V','E','X'],
+    ['H','A','L','F','S','T','E','N','F','T','O'],
+    ['P','A','S','T','E','R','U','N','I','N','E'],
+    ['O','N','E','S','I','X','T','H','R','E','E'],
+    ['F','O','U','R','F','I','V','E','T','W','O'],
+    ['E','I','G','H','T','E','L','E','V','E','N'],
+    ['S','E','V','E','N','T','W','E','L','V','E'],
+    ['T','E','N','S','E','O','C','L','O','C','K'],
+]
+
+_frame_cache = OrderedDict()
+_frame_cache_bytes = 0
+_frame_cache_max_bytes = DEFAULT_FRAME_CACHE_MAX_MB * 1024 * 1024
+_frame_cache_lock = threading.Lock()
+
+def configure_frame_cache(device_config):
+    """Sizes the frame cache from the 'clock_frame_cache' key of the device config, a disabled cache keeps nothing.
+
+        {"enabled": true, "max_mb": 32}
+    """
+    global _frame_cache_max_bytes
+    cache_config = device_config.get_config("clock_frame_cache", default={}) or {}
+    max_mb = cache_config.get("max_mb", DEFAULT_FRAME_CACHE_MAX_MB) if cache_config.get("enabled", True) else 0
+    with _frame_cache_lock:
+        _frame_cache_max_bytes = max(int(max_mb * 1024 * 1024), 0)
+        _evict_frames()
+
+def _evict_frames():
+    # called with the lock held, drops the least recently used frames beyond the limit
+    global _frame_cache_bytes
+    while _frame_cache_bytes > _frame_cache_max_bytes and _frame_cache:
+        _, evicted = _frame_cache.popitem(last=False)
+        _frame_cache_bytes -= len(evicted[3])
+
+@lru_cache(maxsize=4)
+def get_polar_angle_field(w, h):
+    """Returns the quantized polar angle of every pixel around the center, in [0, ANGLE_STEPS).
+
+    The field only depends on the resolution, so it is computed once and shared by every render.
+    """
+    x, y = np.ogrid[:h, :w]
+    theta = np.arctan2(x - h/2, y - w/2) % (2*np.pi)
+    field = (np.rint(theta * (ANGLE_STEPS / (2*np.pi))).astype(np.uint16)) & (ANGLE_STEPS - 1)
+    field.flags.writeable = False
+    return field
+
 class Clock(BasePlugin):
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
@@ -48,6 +108,7 @@ class Clock(BasePlugin):
         return template_params
 
     def generate_image(self, settings, device_config):
+        configure_frame_cache(device_config)
         clock_face = settings.get('selectedClockFace')
         primary_color = ImageColor.getcolor(settings.get('primaryColor') or (255,255,255), "RGB")
         secondary_color = ImageColor.getcolor(settings.get('secondaryColor') or (0,0,0), "RGB")
@@ -81,36 +142,25 @@ class Clock(BasePlugin):
         w,h = dimensions
         time_str = Clock.format_time(time.hour, time.minute, zero_pad = True)
 
-        image = Image.new("RGBA", dimensions, secondary_color+(255,))
-        text = Image.new("RGBA", dimensions, (0, 0, 0, 0))
-
-        font_size = w * 0.36
-        fnt = get_font("DS-Digital", font_size)
-        text_draw = ImageDraw.Draw(text)
-
-        # time text
-        text_draw.text((w/2, h/2), "00:00", font=fnt, anchor="mm", fill=primary_color +(30,))
-        text_draw.text((w/2, h/2), time_str, font=fnt, anchor="mm", fill=primary_color +(255,))
-
-        combined = Image.alpha_composite(image, text)
+        def draw_time(image):
+            fnt = get_font("DS-Digital", w * 0.36)
+            ImageDraw.Draw(image).text((w/2, h/2), time_str, font=fnt, anchor="mm", fill=primary_color +(255,))
+            return image
 
-        return combined
+        return Clock.render_frame("digital", dimensions, primary_color, secondary_color, draw_time, frame_key=time_str)
 
     def draw_conic_clock(self, dimensions, time, primary_color=(219, 50, 70, 255), secondary_color=(0, 0, 0, 255) ):
         width, height = dimensions
         hour_angle, minute_angle = Clock.calculate_clock_angles(time)
 
-        # Draw the hour hand gradient
-        image_hour = Clock.draw_gradient_image(
+        # Draw the hour and minute hand gradients, the minute layer is composited over the hour layer
+        image_hour = Clock.draw_gradient_array(
             width, height, hour_angle, minute_angle, secondary_color, primary_color
         )
-        # Draw the minute hand gradient
-        image_minute = Clock.draw_gradient_image(
+        image_minute = Clock.draw_gradient_array(
             width, height, minute_angle, hour_angle, secondary_color, primary_color
         )
-
-        # Combine the images using alpha blending
-        final_image = Image.alpha_composite(image_hour, image_minute)
+        final_image = Image.fromarray(Clock.composite_arrays(image_hour, image_minute), mode="RGBA")
 
         dim = min(width, height)
         minute_length = dim * 0.35
@@ -129,90 +179,150 @@ class Clock(BasePlugin):
         return final_image
 
     def draw_divided_clock(self, dimensions, time, primary_color=(32,183,174), secondary_color=(255,255,255)):
-        w,h = dimensions
-        bg = Image.new("RGBA", dimensions, primary_color+(255,))
-        bg_draw = ImageDraw.Draw(bg)
-
         # used to calculate percentages of sizes
-        dim = min(w,h)
-
-        corners = [(0, h/2), (w,h)]
-        bg_draw.rectangle(corners, fill=secondary_color +(255,))
+        dim = min(dimensions)
 
-        canvas = Image.new("RGBA", dimensions, (0, 0, 0, 0))
-        image_draw = ImageDraw.Draw(canvas)
+        def draw_hands(image):
+            hour_angle, minute_angle = Clock.calculate_clock_angles(time)
+            hand_width = max(int(dim * 0.009), 1)
+            Clock.draw_clock_hand(image, int(dim*0.3), minute_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
+            Clock.draw_clock_hand(image, int(dim*0.2), hour_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
 
-        shadow_offset = max(int(dim * 0.0075), 1)
-        face_size = int(dim * 0.45)
+            Clock.drew_clock_center(image, max(int(dim*0.014), 1), primary_color, secondary_color, width=max(int(dim* 0.007), 1))
+            return image
 
-        # clock shadow
-        image_draw.circle((w/2,h/2 + shadow_offset), face_size+2, fill=(0,0,0,50))
+        # the hands move with the seconds, so these frames are not cached
+        return Clock.render_frame("divided", dimensions, primary_color, secondary_color, draw_hands)
 
-        # clock outline
-        image_draw.circle((w/2,h/2), face_size, fill=primary_color, outline=secondary_color, width=int(dim * 0.03125))
+    def draw_word_clock(self, dimensions, time, primary_color=(0,0,0), secondary_color=(255,255,255)):
+        letter_positions = Clock.translate_word_grid_positions(time.hour % 12, time.minute)
 
-        Clock.draw_hour_marks(image_draw._image, face_size - int(w*0.04375))
+        def draw_words(image):
+            fnt, positions = Clock.get_word_grid_layout(tuple(dimensions))
+            canvas = Image.new("RGBA", image.size, (0, 0, 0, 0))
+            image_draw = ImageDraw.Draw(canvas)
+            for y, row in enumerate(WORD_GRID):
+                for x, letter in enumerate(row):
+                    if [y,x] in letter_positions:
+                        x_pos, y_pos = positions[y][x]
+                        image_draw.text((x_pos+2, y_pos+2), letter, anchor="mm", fill=secondary_color+(80,), font=fnt)
+                        image_draw.text((x_pos, y_pos), letter, anchor="mm", fill=secondary_color+(255,), font=fnt)
+            return Image.alpha_composite(image, canvas)
+
+        # many minutes light up the same words, so the frames are cached by the highlighted letters
+        frame_key = tuple(sorted({tuple(position) for position in letter_positions}))
+        return Clock.render_frame("word", dimensions, primary_color, secondary_color, draw_words, frame_key=frame_key)
 
-        hour_angle, minute_angle = Clock.calculate_clock_angles(time)
-        hand_width = max(int(dim * 0.009), 1)
-        Clock.draw_clock_hand(image_draw._image, int(dim*0.3), minute_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
-        Clock.draw_clock_hand(image_draw._image, int(dim*0.2), hour_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def get_word_grid_layout(dimensions):
+        """Returns the font and the center of every letter of the word grid."""
+        w,h = dimensions
+        fnt = get_font("Napoli", min(w,h)*0.05)
 
-        Clock.drew_clock_center(image_draw._image, max(int(dim*0.014), 1), primary_color, secondary_color, width=max(int(dim* 0.007), 1))
+        border = [40, 40]
+        if w > h:
+            border[0] += (w-h)/2
+        elif h > w:
+            border[1] += (h-w)/2
 
-        combined = Image.alpha_composite(bg, canvas)
+        canvas_size = min(w,h) - min(border)*2
+        positions = []
+        for y, row in enumerate(WORD_GRID):
+            positions.append([
+                (x*(canvas_size/(len(row)-1)) + border[0], y*(canvas_size/(len(WORD_GRID)-1)) + border[1])
+                for x in range(len(row))
+            ])
+        return fnt, positions
 
-        return combined
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def get_static_layer(face, dimensions, primary_color, secondary_color):
+        """Returns the parts of a clock face that do not change with the time.
 
-    def draw_word_clock(self, dimensions, time, primary_color=(0,0,0), secondary_color=(255,255,255)):
+        Layers are cached per face, resolution and colours; callers must copy them before drawing.
+        """
         w,h = dimensions
+        dim = min(w,h)
 
-        bg = Image.new("RGBA", dimensions, primary_color+(255,))
+        if face == "digital":
+            image = Image.new("RGBA", dimensions, secondary_color+(255,))
+            text = Image.new("RGBA", dimensions, (0, 0, 0, 0))
+            fnt = get_font("DS-Digital", w * 0.36)
+            ImageDraw.Draw(text).text((w/2, h/2), "00:00", font=fnt, anchor="mm", fill=primary_color +(30,))
+            return Image.alpha_composite(image, text)
 
-        dim = min(w,h)
+        if face == "divided":
+            bg = Image.new("RGBA", dimensions, primary_color+(255,))
+            bg_draw = ImageDraw.Draw(bg)
+            corners = [(0, h/2), (w,h)]
+            bg_draw.rectangle(corners, fill=secondary_color +(255,))
 
-        font_size = dim*0.05
-        fnt = get_font("Napoli", font_size)
+            canvas = Image.new("RGBA", dimensions, (0, 0, 0, 0))
+            image_draw = ImageDraw.Draw(canvas)
 
-        canvas = Image.new("RGBA", dimensions, (0, 0, 0, 0))
-        image_draw = ImageDraw.Draw(canvas)
+            shadow_offset = max(int(dim * 0.0075), 1)
+            face_size = int(dim * 0.45)
 
-        border = [40, 40]
-        if w > h:
-            border[0] += (w-h)/2
-        elif h > w:
-            border[1] += (h-w)/2
+            # clock shadow
+            image_draw.circle((w/2,h/2 + shadow_offset), face_size+2, fill=(0,0,0,50))
 
-        letter_positions = Clock.translate_word_grid_positions(time.hour % 12, time.minute)
+            # clock outline
+            image_draw.circle((w/2,h/2), face_size, fill=primary_color, outline=secondary_color, width=int(dim * 0.03125))
 
-        letter_grid = [
-            ['I','T','L','I','S','A','S','A','M','P','M'],
-            ['A','C','Q','U','A','R','T','E','R','D','C'],
-            ['T','W','E','N','T','Y','F','I','V','E','X'],
-            ['H','A','L','F','S','T','E','N','F','T','O'],
-            ['P','A','S','T','E','R','U','N','I','N','E'],
-            ['O','N','E','S','I','X','T','H','R','E','E'],
-            ['F','O','U','R','F','I','V','E','T','W','O'],
-            ['E','I','G','H','T','E','L','E','V','E','N'],
-            ['S','E','V','E','N','T','W','E','L','V','E'],
-            ['T','E','N','S','E','O','C','L','O','C','K'],
-        ]
+            Clock.draw_hour_marks(canvas, face_size - int(w*0.04375))
+            return Image.alpha_composite(bg, canvas)
 
-        canvas_size = min(w,h) - min(border)*2
-        for y, row in enumerate(letter_grid):
-            for x, letter in enumerate(row):
-                x_pos = x*(canvas_size/(len(row)-1)) + border[0]
-                y_pos = y*(canvas_size/(len(letter_grid)-1)) + border[1]
+        if face == "word":
+            bg = Image.new("RGBA", dimensions, primary_color+(255,))
+            fnt, positions = Clock.get_word_grid_layout(dimensions)
+            canvas = Image.new("RGBA", dimensions, (0, 0, 0, 0))
+            image_draw = ImageDraw.Draw(canvas)
+            for y, row in enumerate(WORD_GRID):
+                for x, letter in enumerate(row):
+                    image_draw.text(positions[y][x], letter, anchor="mm", fill=secondary_color+(50,), font=fnt)
+            return Image.alpha_composite(bg, canvas)
 
-                fill=secondary_color+(50,)
-                if [y,x] in letter_positions:
-                    fill=secondary_color+(255,)
-                    image_draw.text((x_pos+2, y_pos+2), letter, anchor="mm", fill=secondary_color+(80,), font=fnt)
+        raise ValueError(f"Unknown clock face: {face}")
 
-                image_draw.text((x_pos, y_pos), letter, anchor="mm", fill=fill, font=fnt)
+    @staticmethod
+    def render_frame(face, dimensions, primary_color, secondary_color, draw_dynamic, frame_key=None):
+        """Draws the dynamic layer of a face onto a copy of its static layer.
 
-        combined = Image.alpha_composite(bg, canvas)
-        return combined
+        If a frame_key is given and the frame cache is enabled, the changed area is cached, so the next
+        frame with the same key is a lookup and a single paste.
+        """
+        global _frame_cache_bytes
+        dimensions = tuple(dimensions)
+        static_layer = Clock.get_static_layer(face, dimensions, primary_color, secondary_color)
+        key = (face, dimensions, primary_color, secondary_color, frame_key)
+        use_cache = frame_key is not None and _frame_cache_max_bytes > 0
+
+        cached = None
+        if use_cache:
+            with _frame_cache_lock:
+                cached = _frame_cache.get(key)
+                if cached:
+                    _frame_cache.move_to_end(key)
+
+        if cached:
+            box, mode, size, data = cached
+            image = static_layer.copy()
+            if box:
+                image.paste(Image.frombytes(mode, size, zlib.decompress(data)), box[:2])
+        else:
+            image = draw_dynamic(static_layer.copy())
+
+            if use_cache:
+                box = ImageChops.difference(image, static_layer).getbbox(alpha_only=False)
+                patch = image.crop(box) if box else None
+                data = zlib.compress(patch.tobytes(), 1) if patch else b""
+                with _frame_cache_lock:
+                    _frame_cache[key] = (box, image.mode, patch.size if patch else None, data)
+                    _frame_cache_bytes += len(data)
+                    _evict_frames()
+
+        return image
 
     @staticmethod
     def format_time(hour, minute, zero_pad=False):
@@ -230,33 +340,45 @@ class Clock(BasePlugin):
         Draw a gradient that starts at start_angle and ends at end_angle, using RGBA colors.
         Angles are interpreted for a clock face (0 at 12 o'clock, increasing clockwise).
         """
-        x,y = np.ogrid[:h,:w]
-        cx,cy = h/2, w/2
-
-        start_angle = -start_angle
-        end_angle = -end_angle
+        return Image.fromarray(Clock.draw_gradient_array(w, h, start_angle, end_angle, start_color, end_color), mode="RGBA")
 
-        theta = (np.arctan2(x-cx,y-cy) - start_angle)  % (2*np.pi)
-
-        angle_range = ((end_angle-start_angle) % (2 * np.pi))
-        if angle_range == 0:
-            angle_range = 2*np.pi  # Special case: full circle gradient
-
-        anglemask = theta <= angle_range
-        theta = theta / angle_range  # Normalize to [0, 1] within range
+    @staticmethod
+    def draw_gradient_array(w, h, start_angle, end_angle, start_color, end_color):
+        """Returns the gradient of draw_gradient_image as an RGBA array.
 
-        # Interpolate colors between start and end within the mask
-        gradient = np.zeros((h, w, 4), dtype=np.uint8)
-        start_color = Clock.pad_color(start_color)
-        end_color = Clock.pad_color(end_color)
-        for c in range(4):  # Iterate through RGBA channels
-            gradient[..., c] = (
-                start_color[c] * (1 - theta) + end_color[c] * (theta)
-            ).astype(np.uint8)
+        The colours are looked up in a table indexed by the quantized angle relative to start_angle,
+        so a render is a single indexing operation on the cached polar angle field.
+        """
+        steps_per_radian = ANGLE_STEPS / (2*np.pi)
+        start_step = int(round(start_angle * steps_per_radian))
+        range_steps = int(round(((start_angle - end_angle) % (2*np.pi)) * steps_per_radian))
+        if range_steps == 0 or range_steps >= ANGLE_STEPS:
+            range_steps = ANGLE_STEPS  # Special case: full circle gradient
+
+        # Interpolate colors between start and end within the range, transparent outside of it
+        t = np.arange(ANGLE_STEPS, dtype=np.float32)[:, None] / range_steps
+        start_color = np.array(Clock.pad_color(start_color), dtype=np.float32)
+        end_color = np.array(Clock.pad_color(end_color), dtype=np.float32)
+        lut = (start_color + (end_color - start_color) * t).astype(np.uint8)
+        lut[range_steps + 1:] = 0
+
+        field = get_polar_angle_field(w, h)
+        relative = (field + np.uint16(start_step % ANGLE_STEPS)) & np.uint16(ANGLE_STEPS - 1)
+        return lut[relative]
 
-        # Fill with the specified solid color
-        gradient[~anglemask] = (0, 0, 0, 0)
-        return Image.fromarray(gradient, mode="RGBA")
+    @staticmethod
+    def composite_arrays(background, foreground):
+        """Alpha composites two RGBA arrays, like Image.alpha_composite."""
+        alpha = foreground[..., 3]
+        if np.all((alpha == 0) | (alpha == 255)):
+            return np.where((alpha == 255)[..., None], foreground, background)
+
+        fg_alpha = alpha[..., None].astype(np.float32) / 255
+        bg_alpha = background[..., 3:4].astype(np.float32) / 255
+        out_alpha = fg_alpha + bg_alpha * (1 - fg_alpha)
+        safe_alpha = np.where(out_alpha == 0, 1, out_alpha)
+        rgb = (foreground[..., :3] * fg_alpha + background[..., :3] * bg_alpha * (1 - fg_alpha)) / safe_alpha
+        return np.dstack([rgb, out_alpha * 255]).round().astype(np.uint8)
 
     @staticmethod
     def pad_color(color):
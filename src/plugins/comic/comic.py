@@ -1,10 +1,15 @@
-from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.base_plugin import BasePlugin, PluginData
 from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
 
-import requests
+import base64
+from utils import http_utils
 
 from .comic_parser import COMICS, get_panel
-from utils.app_utils import get_font
+from utils.app_utils import get_font, get_text_bbox, wrap_text
+
+# seconds the latest panel is reused for, most comics publish at most once a day
+COMIC_DATA_TTL = 60 * 60
 
 class Comic(BasePlugin):
     def generate_settings_template(self):
@@ -12,28 +17,29 @@ class Comic(BasePlugin):
         template_params['comics'] = list(COMICS)
         return template_params
 
-    def generate_image(self, settings, device_config):
+    def fetch_data(self, settings, device_config):
         comic = settings.get("comic")
         if not comic or comic not in COMICS:
             raise RuntimeError("Invalid comic provided.")
 
+        comic_panel = get_panel(comic)
+
+        response = http_utils.get(comic_panel["image_url"])
+        response.raise_for_status()
+        # the panel image is kept with the data, so it can be rendered again without downloading it
+        comic_panel["image"] = base64.b64encode(response.content).decode("ascii")
+        return PluginData(comic_panel, ttl=COMIC_DATA_TTL)
+
+    def render(self, data, settings, device_config):
         is_caption = settings.get("titleCaption") == "true"
         caption_font_size = settings.get("fontSize")
 
-        comic_panel = get_panel(comic)
+        width, height = self.get_dimensions(device_config)
 
-        dimensions = device_config.get_resolution()
-        if device_config.get_config("orientation") == "vertical":
-            dimensions = dimensions[::-1]
-        width, height = dimensions
-
-        return self._compose_image(comic_panel, is_caption, caption_font_size, width, height)
+        return self._compose_image(data, is_caption, caption_font_size, width, height)
 
     def _compose_image(self, comic_panel, is_caption, caption_font_size, width, height):
-        response = requests.get(comic_panel["image_url"], stream=True)
-        response.raise_for_status()
-
-        with Image.open(response.raw) as img:
+        with Image.open(BytesIO(base64.b64decode(comic_panel["image"]))) as img:
             background = Image.new("RGB", (width, height), "white")
             font = get_font("Jost", font_size=int(caption_font_size))
             draw = ImageDraw.Draw(background)
@@ -43,12 +49,12 @@ class Comic(BasePlugin):
                 if comic_panel["title"]:
                     lines, wrapped_text = self._wrap_text(comic_panel["title"], font, width)
                     draw.multiline_text((width // 2, 0), wrapped_text, font=font, fill="black", anchor="ma")
-                    top_padding = font.getbbox(wrapped_text)[3] * lines + 1
+                    top_padding = get_text_bbox(font, wrapped_text)[3] * lines + 1
 
                 if comic_panel["caption"]:
                     lines, wrapped_text = self._wrap_text(comic_panel["caption"], font, width)
                     draw.multiline_text((width // 2, height), wrapped_text, font=font, fill="black", anchor="md")
-                    bottom_padding = font.getbbox(wrapped_text)[3] * lines + 1
+                    bottom_padding = get_text_bbox(font, wrapped_text)[3] * lines + 1
 
             scale = min(width / img.width, (height - top_padding - bottom_padding) / img.height)
             new_size = (int(img.width * scale), int(img.height * scale))
@@ -66,13 +72,5 @@ class Comic(BasePlugin):
             return background
 
     def _wrap_text(self, text, font, width):
-        lines = []
-        words = text.split()[::-1]
-
-        while words:
-            line = words.pop()
-            while words and font.getbbox(line + ' ' + words[-1])[2] < width:
-                line += ' ' + words.pop()
-            lines.append(line)
-
+        lines = wrap_text(text, font, width)
         return len(lines), '\n'.join(lines)
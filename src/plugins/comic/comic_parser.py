@@ -2,6 +2,8 @@ import feedparser
 import html
 import re
 
+from utils import http_utils
+
 
 COMICS = {
     "XKCD": {
@@ -64,7 +66,9 @@ COMICS = {
 
 
 def get_panel(comic_name):
-    feed = feedparser.parse(COMICS[comic_name]["feed"])
+    response = http_utils.get(COMICS[comic_name]["feed"], headers={"User-Agent": "Mozilla/5.0"})
+    response.raise_for_status()
+    feed = feedparser.parse(response.content)
     try:
         element = COMICS[comic_name]["element"](feed)
     except IndexError:
@@ -1,4 +1,5 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.native_layout import NativeCanvas, TextBox
 from PIL import Image
 from datetime import datetime, timezone
 import logging
@@ -45,3 +46,14 @@ class Countdown(BasePlugin):
 
         image = self.render_image(dimensions, "countdown.html", "countdown.css", template_params)
         return image
+
+    def render_native(self, dimensions, html_file, template_params):
+        canvas = NativeCanvas(dimensions, template_params.get("plugin_settings"))
+        label_size = canvas.vmin(8)
+        canvas.stack([
+            TextBox(template_params["title"], canvas.vmin(11), "bold", line_height=1, letter_spacing=0.3),
+            TextBox(template_params["date"], canvas.vmin(5), margin_bottom=canvas.vh(4)),
+            TextBox(template_params["day_count"], canvas.vmin(32), line_height=1),
+            TextBox(template_params["label"], label_size, letter_spacing=label_size * 0.1, uppercase=True)
+        ], box=canvas.center_box(90))
+        return canvas.image
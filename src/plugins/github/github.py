@@ -1,11 +1,27 @@
-from ..base_plugin.base_plugin import BasePlugin
-from .github_contributions import contributions_generate_image
-from .github_sponsors import sponsors_generate_image
-from .github_stars import stars_generate_image
+from ..base_plugin.base_plugin import BasePlugin, PluginData
+from .github_contributions import contributions_fetch_data, contributions_render
+from .github_sponsors import sponsors_fetch_data, sponsors_render
+from .github_stars import stars_fetch_data, stars_render
+from ..base_plugin.native_layout import NativeCanvas, Block, get_layout_font
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
+# the star icon of github_stars.html is a fixed 140px svg, drawn in black
+STAR_ICON_SIZE = 140
+STARS_FONT_SIZE = 80
+
+# fetch and render functions of each github type
+GITHUB_TYPES = {
+    "contributions": (contributions_fetch_data, contributions_render),
+    "sponsors": (sponsors_fetch_data, sponsors_render),
+    "stars": (stars_fetch_data, stars_render),
+}
+
+# seconds the fetched statistics are reused for
+GITHUB_DATA_TTL = 60 * 60
+
 
 class GitHub(BasePlugin):
     def generate_settings_template(self):
@@ -18,19 +34,88 @@ class GitHub(BasePlugin):
         template_params['style_settings'] = True
         return template_params
 
-    def generate_image(self, settings, device_config):
+    def get_github_type(self, settings):
+        github_type = settings.get('githubType', 'contributions')
+        if github_type not in GITHUB_TYPES:
+            logger.error(f"Unknown GitHub type: {github_type}")
+            raise ValueError(f"Unknown GitHub type: {github_type}")
+        return GITHUB_TYPES[github_type]
+
+    def fetch_data(self, settings, device_config):
         try:
-            github_type = settings.get('githubType', 'contributions')
-
-            if github_type == 'contributions':
-                return contributions_generate_image(self, settings, device_config)
-            elif github_type == 'sponsors':
-                return sponsors_generate_image(self, settings, device_config)
-            elif github_type == 'stars':
-                return stars_generate_image(self, settings, device_config)
-            else:
-                logger.error(f"Unknown GitHub type: {github_type}")
-                raise ValueError(f"Unknown GitHub type: {github_type}")
+            fetch_data, _ = self.get_github_type(settings)
+            return PluginData(fetch_data(settings, device_config), ttl=GITHUB_DATA_TTL)
+        except Exception as e:
+            logger.error(f"GitHub data fetch failed: {str(e)}")
+            raise
+
+    def render(self, data, settings, device_config):
+        try:
+            _, render = self.get_github_type(settings)
+            return render(self, data, settings, self.get_dimensions(device_config))
         except Exception as e:
             logger.error(f"GitHub image generation failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def render_native(self, dimensions, html_file, template_params):
+        if html_file == "github_stars.html":
+            title = f"GitHub/{template_params['repository']}"
+            second_row = self._native_stars_row(template_params["stars"])
+        elif html_file == "github_sponsors.html":
+            title = f"GitHub/{template_params['username']}"
+            second_row = None
+        else:
+            return None
+
+        canvas = NativeCanvas(dimensions, template_params.get("plugin_settings"))
+        title_size = canvas.vmin(8)
+        title_font = get_layout_font("Jost", title_size)
+        line_box = canvas.get_line_box(title_font, title_size)
+        icon_path = self.get_plugin_dir("icon.png")
+
+        def draw_title(canvas, box):
+            x, y, width, height = box
+            icon_size = title_size * 1.1
+            gap = title_size * 0.2
+            row_width = icon_size + gap + canvas.get_text_width(title, title_font)
+            row_x = x + (width - row_width) / 2
+            canvas.paste_icon(icon_path, row_x, y + (height - icon_size) / 2, icon_size)
+            canvas.draw_text_line(row_x + icon_size + gap, y, row_width, title, title_font, title_size, "left")
+
+        elements = [Block(line_box, draw_title)]
+        if second_row:
+            elements.append(second_row)
+        else:
+            def draw_total(canvas, box):
+                x, y, width, height = box
+                text = f"Zarobki w tym miesiącu ${template_params['total_per_month']}"
+                canvas.draw_text_line(x, y, width, text, title_font, title_size)
+            elements.append(Block(line_box, draw_total))
+
+        canvas.stack(elements, gap=canvas.vh(5))
+        return canvas.image
+
+    @staticmethod
+    def _native_stars_row(stars):
+        font = get_layout_font("Jost", STARS_FONT_SIZE)
+        text = str(stars)
+
+        def draw_stars(canvas, box):
+            x, y, width, height = box
+            gap = STARS_FONT_SIZE * 0.2
+            row_width = STAR_ICON_SIZE + gap + canvas.get_text_width(text, font)
+            row_x = x + (width - row_width) / 2
+
+            # five pointed star filling the svg viewbox like the original path
+            center_x, center_y = row_x + STAR_ICON_SIZE / 2, y + height / 2 + STAR_ICON_SIZE * 0.03
+            outer, inner = STAR_ICON_SIZE * 0.37, STAR_ICON_SIZE * 0.17
+            points = []
+            for i in range(10):
+                radius = outer if i % 2 == 0 else inner
+                angle = math.pi / 5 * i - math.pi / 2
+                points.append((center_x + radius * math.cos(angle), center_y + radius * math.sin(angle)))
+            canvas.draw.polygon(points, fill=(0, 0, 0))
+
+            canvas.draw_text_line(row_x + STAR_ICON_SIZE + gap, y, row_width, text, font, STARS_FONT_SIZE, "left")
+
+        return Block(STAR_ICON_SIZE, draw_stars)
@@ -1,4 +1,4 @@
-import requests
+from utils import http_utils
 import logging
 from datetime import datetime, date, timedelta
 
@@ -22,26 +22,24 @@ query($username: String!) {
 }
 """
 
-def contributions_generate_image(plugin_instance, settings, device_config):
-    dimensions = device_config.get_resolution()
-    if device_config.get_config("orientation") == "vertical":
-        dimensions = dimensions[::-1]
-
+def contributions_fetch_data(settings, device_config):
     api_key = device_config.load_env_key("GITHUB_SECRET")
     if not api_key:
         raise RuntimeError("GitHub API Key not configured.")
 
-    colors = settings.get("contributionColor[]")
     github_username = settings.get("githubUsername")
     if not github_username:
         raise RuntimeError("GitHub username is required.")
 
-    data = fetch_contributions(github_username, api_key)
+    return fetch_contributions(github_username, api_key)
+
+def contributions_render(plugin_instance, data, settings, dimensions):
+    colors = settings.get("contributionColor[]")
     grid, month_positions = parse_contributions(data, colors)
     metrics = calculate_metrics(data)
 
     template_params = {
-        "username": github_username,
+        "username": settings.get("githubUsername"),
         "grid": grid,
         "month_positions": month_positions,
         "metrics": metrics,
@@ -63,7 +61,7 @@ def fetch_contributions(username, api_key):
     url = "https://api.github.com/graphql"
     headers = {"Authorization": f"Bearer {api_key}"}
     variables = {"username": username}
-    resp = requests.post(url, json={"query": GRAPHQL_QUERY, "variables": variables}, headers=headers)
+    resp = http_utils.post(url, json={"query": GRAPHQL_QUERY, "variables": variables}, headers=headers)
     resp.raise_for_status()
     return resp.json()
 
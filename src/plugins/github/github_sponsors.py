@@ -1,4 +1,4 @@
-import requests
+from utils import http_utils
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,11 +31,7 @@ query($username: String!) {
 }
 """
 
-def sponsors_generate_image(plugin_instance, settings, device_config):
-    dimensions = device_config.get_resolution()
-    if device_config.get_config("orientation") == "vertical":
-        dimensions = dimensions[::-1]
-
+def sponsors_fetch_data(settings, device_config):
     api_key = device_config.load_env_key("GITHUB_SECRET")
     if not api_key:
         raise RuntimeError("GitHub API Key not configured.")
@@ -44,11 +40,13 @@ def sponsors_generate_image(plugin_instance, settings, device_config):
     if not github_username:
         raise RuntimeError("GitHub username is required.")
 
-    data = fetch_sponsorships(github_username, api_key)
+    return fetch_sponsorships(github_username, api_key)
+
+def sponsors_render(plugin_instance, data, settings, dimensions):
     total_per_month = calculate_monthly_total(data)
 
     template_params = {
-        "username": github_username,
+        "username": settings.get("githubUsername"),
         "total_per_month": total_per_month,
         "plugin_settings": settings
     }
@@ -69,7 +67,7 @@ def fetch_sponsorships(username, api_key):
     headers = {"Authorization": f"Bearer {api_key}"}
     variables = {"username": username}
 
-    resp = requests.post(url, json={"query": GRAPHQL_QUERY, "variables": variables}, headers=headers)
+    resp = http_utils.post(url, json={"query": GRAPHQL_QUERY, "variables": variables}, headers=headers)
     resp.raise_for_status()
     data = resp.json()
 
@@ -1,19 +1,17 @@
 import logging
-import requests
+from utils import http_utils
 
 logger = logging.getLogger(__name__)
 
-def stars_generate_image(plugin_instance, settings, device_config):
+def get_repository(settings):
     username = settings.get('githubUsername')
     repository = settings.get('githubRepository')
-
-    dimensions = device_config.get_resolution()
-    if device_config.get_config("orientation") == "vertical":
-        dimensions = dimensions[::-1]
-
-    github_repository = username + "/" + repository
-    if not github_repository:
+    if not username or not repository:
         raise RuntimeError("GitHub repository is required.")
+    return username + "/" + repository
+
+def stars_fetch_data(settings, device_config):
+    github_repository = get_repository(settings)
 
     try:
         stars = fetch_stars(github_repository)
@@ -21,9 +19,12 @@ def stars_generate_image(plugin_instance, settings, device_config):
         logger.error(f"GitHub graphql request failed: {str(e)}")
         raise RuntimeError(f"GitHub request failure, please check logs")
 
+    return {"stars": stars}
+
+def stars_render(plugin_instance, data, settings, dimensions):
     template_params = {
-        "repository": github_repository,
-        "stars": stars,
+        "repository": get_repository(settings),
+        "stars": data["stars"],
         "plugin_settings": settings
     }
 
@@ -35,15 +36,13 @@ def stars_generate_image(plugin_instance, settings, device_config):
     )
 
 def fetch_stars(github_repository):
-    global data
     url = f"https://api.github.com/repos/{github_repository}"
     headers = {"Accept": "application/json"}
 
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
-    else:
+    response = http_utils.get(url, headers=headers)
+    if response.status_code != 200:
         logger.error(f"GitHub Stars Plugin: Error: {response.status_code} - {response.text}")
+        raise RuntimeError(f"GitHub returned status {response.status_code}")
 
-    return data['stargazers_count']
+    return response.json()['stargazers_count']
 
@@ -9,6 +9,7 @@ from PIL.ImageFile import ImageFile
 from plugins.base_plugin.base_plugin import BasePlugin
 
 from utils.image_utils import pad_image_blur
+from utils.http_utils import DEFAULT_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ class ImmichProvider:
         self.headers = {"x-api-key": self.key}
 
     def get_album_id(self, album: str) -> str:
-        r = requests.get(f"{self.base_url}/api/albums", headers=self.headers)
+        r = requests.get(f"{self.base_url}/api/albums", headers=self.headers, timeout=DEFAULT_TIMEOUT)
         r.raise_for_status()
         albums = r.json()
         album = [a for a in albums if a["albumName"] == album][0]
@@ -42,7 +43,7 @@ class ImmichProvider:
                 "size": 1000,
                 "page": page
             }
-            r2 = requests.post(f"{self.base_url}/api/search/metadata", json=body, headers=self.headers)
+            r2 = requests.post(f"{self.base_url}/api/search/metadata", json=body, headers=self.headers, timeout=DEFAULT_TIMEOUT)
             r2.raise_for_status()
             assets_data = r2.json()
 
@@ -65,7 +66,7 @@ class ImmichProvider:
         asset_id = choice(asset_ids)
 
         logger.info(f"Downloading image {asset_id}")
-        r = requests.get(f"{self.base_url}/api/assets/{asset_id}/original", headers=self.headers)
+        r = requests.get(f"{self.base_url}/api/assets/{asset_id}/original", headers=self.headers, timeout=DEFAULT_TIMEOUT)
         r.raise_for_status()
         img = Image.open(BytesIO(r.content))
         img = ImageOps.exif_transpose(img)
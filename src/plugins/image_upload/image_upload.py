@@ -4,7 +4,7 @@ import logging
 import random
 import os
 
-from utils.image_utils import pad_image_blur
+from utils.image_utils import pad_image_blur, get_derivative_path
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +13,18 @@ class ImageUpload(BasePlugin):
     def open_image(self, img_index: int, image_locations: list) -> Image:
         if not image_locations:
             raise RuntimeError("No images provided.")
+        image_path = image_locations[img_index]
+        # Prefer the panel-sized derivative written by the upload processor
+        derivative_path = get_derivative_path(image_path)
+        if os.path.exists(derivative_path):
+            image_path = derivative_path
+
         # Open the image using Pillow
         try:
-            image = Image.open(image_locations[img_index])
+            image = Image.open(image_path)
+            if image_path != derivative_path:
+                # derivatives are stored upright, the original may still carry an EXIF rotation
+                image = ImageOps.exif_transpose(image)
         except Exception as e:
             logger.error(f"Failed to read image file: {str(e)}")
             raise RuntimeError("Failed to read image file.")
@@ -61,9 +70,10 @@ class ImageUpload(BasePlugin):
             return
 
         for image_path in image_locations:
-            if os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                    logger.info(f"Deleted uploaded image: {image_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete uploaded image {image_path}: {e}")
+            for path in (image_path, get_derivative_path(image_path)):
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                        logger.info(f"Deleted uploaded image: {path}")
+                    except Exception as e:
+                        logger.warning(f"Failed to delete uploaded image {path}: {e}")
@@ -8,6 +8,10 @@ from plugins.newspaper.constants import NEWSPAPERS
 logger = logging.getLogger(__name__)
 
 FREEDOM_FORUM_URL = "https://cdn.freedomforum.org/dfp/jpg{}/lg/{}.jpg"
+
+# sorted once for the settings page
+NEWSPAPERS_BY_NAME = sorted(NEWSPAPERS, key=lambda n: n['name'])
+
 class Newspaper(BasePlugin):
     def generate_image(self, settings, device_config):
         newspaper_slug = settings.get('newspaperSlug')
@@ -55,5 +59,5 @@ class Newspaper(BasePlugin):
     
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
-        template_params['newspapers'] = sorted(NEWSPAPERS, key=lambda n: n['name'])
+        template_params['newspapers'] = NEWSPAPERS_BY_NAME
         return template_params
\ No newline at end of file
@@ -1,16 +1,23 @@
 # app_registry.py
 
 import os
+import time
 import importlib
 import logging
+import threading
 from utils.app_utils import resolve_path
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 PLUGINS_DIR = 'plugins'
+PLUGIN_CONFIGS = {}
 PLUGIN_CLASSES = {}
 
+# guards the lazy import and instantiation of plugins
+_registry_lock = threading.RLock()
+
 def load_plugins(plugins_config):
+    """Registers the available plugins. Plugin modules are only imported on first use."""
     plugins_module_path = Path(resolve_path(PLUGINS_DIR))
     for plugin in plugins_config:
         plugin_id = plugin.get('id')
@@ -28,25 +35,61 @@ def load_plugins(plugins_config):
             logging.error(f"Could not find module path {module_path} for '{plugin_id}', skipping.")
             continue
 
-        module_name = f"plugins.{plugin_id}.{plugin_id}"
-        try:
-            module = importlib.import_module(module_name)
-            plugin_class = getattr(module, plugin.get("class"), None)
+        PLUGIN_CONFIGS[plugin_id] = plugin
+
+def _import_plugin(plugin_config):
+    """Imports the plugin module and creates the plugin instance."""
+    plugin_id = plugin_config.get("id")
+    module_name = f"plugins.{plugin_id}.{plugin_id}"
+
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        logging.error(f"Failed to import plugin module {module_name}: {e}")
+        return None
 
-            if plugin_class:
-                # Create an instance of the plugin class and add it to the plugin_classes dictionary
-                PLUGIN_CLASSES[plugin_id] = plugin_class(plugin)
+    plugin_class = getattr(module, plugin_config.get("class"), None)
+    if not plugin_class:
+        logging.error(f"Plugin class '{plugin_config.get('class')}' not found in {module_name}")
+        return None
 
-        except ImportError as e:
-            logging.error(f"Failed to import plugin module {module_name}: {e}")
+    plugin = plugin_class(plugin_config)
+    logger.info(f"Loaded plugin. | plugin_id: {plugin_id} | load_time: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return plugin
 
 def get_plugin_instance(plugin_config):
     plugin_id = plugin_config.get("id")
-    # Retrieve the plugin class factory function
-    plugin_class = PLUGIN_CLASSES.get(plugin_id)
-    
-    if plugin_class:
-        # Initialize the plugin with its configuration
-        return plugin_class
-    else:
-        raise ValueError(f"Plugin '{plugin_id}' is not registered.")
\ No newline at end of file
+    plugin = PLUGIN_CLASSES.get(plugin_id)
+    if plugin:
+        return plugin
+
+    if plugin_id not in PLUGIN_CONFIGS:
+        raise ValueError(f"Plugin '{plugin_id}' is not registered.")
+
+    with _registry_lock:
+        # another thread may have loaded the plugin while waiting for the lock
+        plugin = PLUGIN_CLASSES.get(plugin_id)
+        if not plugin:
+            plugin = _import_plugin(PLUGIN_CONFIGS[plugin_id])
+            if not plugin:
+                raise ValueError(f"Plugin '{plugin_id}' failed to load.")
+            PLUGIN_CLASSES[plugin_id] = plugin
+    return plugin
+
+def warm_up_plugins(plugin_ids):
+    """Imports the given plugins ahead of their first use."""
+    for plugin_id in plugin_ids:
+        plugin_config = PLUGIN_CONFIGS.get(plugin_id)
+        if not plugin_config:
+            continue
+        try:
+            get_plugin_instance(plugin_config)
+        except Exception as e:
+            logger.warning(f"Failed to warm up plugin '{plugin_id}': {e}")
+
+def start_warm_up(plugin_ids):
+    """Warms up the given plugins on a background thread."""
+    thread = threading.Thread(target=warm_up_plugins, args=(list(plugin_ids),), daemon=True)
+    thread.start()
+    return thread
@@ -1,8 +1,8 @@
-from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.base_plugin import BasePlugin, PluginData
 from PIL import Image
 from io import BytesIO
 import feedparser
-import requests
+from utils import http_utils
 import logging
 import html
 
@@ -16,28 +16,31 @@ FONT_SIZES = {
     "x-large": 1.3
 }
 
+# seconds a fetched feed is reused for
+RSS_DATA_TTL = 30 * 60
+
 class Rss(BasePlugin):
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
         template_params['style_settings'] = True
         return template_params
 
-    def generate_image(self, settings, device_config):
-        title = settings.get("title")
+    def fetch_data(self, settings, device_config):
         feed_url = settings.get("feedUrl")
         if not feed_url:
             raise RuntimeError("RSS Feed Url is required.")
-        
+
         items = self.parse_rss_feed(feed_url)
+        return PluginData({"items": items[:10]}, ttl=RSS_DATA_TTL)
 
-        dimensions = device_config.get_resolution()
-        if device_config.get_config("orientation") == "vertical":
-            dimensions = dimensions[::-1]
+    def render(self, data, settings, device_config):
+        title = settings.get("title")
+        dimensions = self.get_dimensions(device_config)
 
         template_params = {
             "title": title,
             "include_images": settings.get("includeImages") == "true",
-            "items": items[:10],
+            "items": data["items"],
             "font_scale": FONT_SIZES.get(settings.get('fontSize', 'normal'), 1),
             "plugin_settings": settings
         }
@@ -46,7 +49,7 @@ class Rss(BasePlugin):
         return image
     
     def parse_rss_feed(self, url, timeout=10):
-        resp = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+        resp = http_utils.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
         resp.raise_for_status()
         
         # Parse the feed content
@@ -1,8 +1,10 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.native_layout import NativeCanvas, TextBox, get_layout_font
 from PIL import Image
 from io import BytesIO
 import requests
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,31 @@ FONT_SIZES = {
     "x-large": 1.3
 }
 
+CSS_ESCAPE_PATTERN = re.compile(r"\\([0-9a-fA-F]{1,6}) ?")
+ROMAN_NUMERALS = [(10, "x"), (9, "ix"), (5, "v"), (4, "iv"), (1, "i")]
+
+def get_list_marker(list_style, index):
+    """Returns the text of an inside list marker, like the css list-style-type."""
+    if list_style == "disc":
+        return "• "
+    if list_style == "square":
+        return "▪ "
+    if list_style == "decimal":
+        return f"{index}. "
+    if list_style == "lower-alpha":
+        return f"{chr(ord('a') + (index - 1) % 26)}. "
+    if list_style == "lower-roman":
+        numeral = ""
+        for value, symbol in ROMAN_NUMERALS:
+            while index >= value:
+                numeral += symbol
+                index -= value
+        return f"{numeral}. "
+    if list_style.startswith("'"):
+        # css string, with escaped code points such as '\25C6  '
+        return CSS_ESCAPE_PATTERN.sub(lambda match: chr(int(match.group(1), 16)), list_style.strip("'"))
+    return ""
+
 class TodoList(BasePlugin):
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
@@ -42,4 +69,80 @@ class TodoList(BasePlugin):
         }
         
         image = self.render_image(dimensions, "todo_list.html", "todo_list.css", template_params)
-        return image
\ No newline at end of file
+        return image
+
+    def render_native(self, dimensions, html_file, template_params):
+        canvas = NativeCanvas(dimensions, template_params.get("plugin_settings"))
+        font_scale = template_params["font_scale"]
+        x0, y0, x1, y1 = canvas.box
+
+        if template_params.get("title"):
+            y0 = canvas.stack([
+                TextBox(template_params["title"], canvas.vmin(7.5) * font_scale, "bold", margin_bottom=8)
+            ], box=(x0, y0, x1, y1), valign="top")
+
+        lists = template_params["lists"]
+        if not lists:
+            return canvas.image
+
+        # lists are laid out in a row unless the display is portrait, with a 1rem gap
+        gap = 16
+        horizontal = canvas.width / canvas.height >= 4 / 5
+        count = len(lists)
+        if horizontal:
+            list_width = (x1 - x0 - gap * (count - 1)) / count
+            boxes = [(x0 + i * (list_width + gap), y0, x0 + i * (list_width + gap) + list_width, y1) for i in range(count)]
+        else:
+            list_height = (y1 - y0 - gap * (count - 1)) / count
+            boxes = [(x0, y0 + i * (list_height + gap), x1, y0 + i * (list_height + gap) + list_height) for i in range(count)]
+
+        for todo_list, box in zip(lists, boxes):
+            self._draw_native_list(canvas, box, todo_list, template_params["list_style"], font_scale)
+        return canvas.image
+
+    def _draw_native_list(self, canvas, box, todo_list, list_style, font_scale):
+        bx0, by0, bx1, by1 = box
+        canvas.draw.rounded_rectangle((round(bx0), round(by0), round(bx1) - 1, round(by1) - 1),
+                                      radius=10, outline=canvas.text_color, width=2)
+
+        # content box of the list, inside the 1.5px border and 1rem padding (0.5rem at the bottom)
+        cx0, cy0, cx1, cy1 = bx0 + 17.5, by0 + 17.5, bx1 - 17.5, by1 - 9.5
+        width, height = cx1 - cx0, cy1 - cy0
+        title = TextBox(todo_list["title"], min(height * 0.1, width * 0.085) * font_scale, "bold",
+                        line_height=1.2, align="left", margin_bottom=6.4)
+        cy0 = canvas.stack([title], box=(cx0, cy0, cx1, cy1), valign="top")
+
+        # list items are sized relative to the list container
+        list_height = cy1 - cy0
+        item_size = min(list_height * 0.08, width * 0.07) * font_scale
+        item_padding = list_height * 0.02
+        item_font = get_layout_font("Jost", item_size)
+        line_box = canvas.get_line_box(item_font, item_size, 1.2)
+
+        items = []
+        for index, element in enumerate(todo_list["elements"], start=1):
+            lines = canvas.wrap_text(get_list_marker(list_style, index) + element, item_font, width)
+            items.append((lines, line_box * len(lines) + item_padding * 2 + 1))
+
+        # hide the items that overflow, replacing the last visible one with a summary
+        visible, total_height = 0, 0
+        for _, item_height in items:
+            if total_height + item_height > list_height:
+                break
+            total_height += item_height
+            visible += 1
+        if visible < len(items):
+            visible = max(0, visible - 1)
+            items = items[:visible] + [([f"And {len(items) - visible} more..."], line_box + item_padding * 2 + 1)]
+
+        y = cy0
+        for index, (lines, item_height) in enumerate(items):
+            if y + item_height > cy1 + 1:
+                break
+            canvas.fill_rect(cx0, y, cx1, y + 1)
+            line_y = y + 1 + item_padding
+            is_summary = index >= visible
+            for line in lines:
+                line_y += canvas.draw_text_line(cx0, line_y, width, line, item_font, item_size,
+                                                "center" if is_summary else "left", 1.2)
+            y += item_height
@@ -1,4 +1,5 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from utils.http_utils import DEFAULT_TIMEOUT
 from PIL import Image
 from io import BytesIO
 import requests
@@ -51,7 +52,7 @@ class Unsplash(BasePlugin):
             params['orientation'] = orientation
 
         try:
-            response = requests.get(url, params=params)
+            response = requests.get(url, params=params, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             if search_query:
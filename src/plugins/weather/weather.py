@@ -1,7 +1,7 @@
-from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.base_plugin import BasePlugin, PluginData
 from PIL import Image
 import os
-import requests
+from utils import http_utils
 import logging
 from datetime import datetime, timedelta, timezone, date
 from astral import moon
@@ -57,6 +57,9 @@ OPEN_METEO_UNIT_PARAMS = {
     "imperial": "temperature_unit=fahrenheit&wind_speed_unit=mph&precipitation_unit=inch"
 }
 
+# forecasts change slowly, refreshes within this many seconds reuse the fetched data
+WEATHER_DATA_TTL = 15 * 60
+
 class Weather(BasePlugin):
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
@@ -68,7 +71,7 @@ class Weather(BasePlugin):
         template_params['style_settings'] = True
         return template_params
 
-    def generate_image(self, settings, device_config):
+    def fetch_data(self, settings, device_config):
         lat = float(settings.get('latitude'))
         long = float(settings.get('longitude'))
         if not lat or not long:
@@ -81,10 +84,6 @@ class Weather(BasePlugin):
         weather_provider = settings.get('weatherProvider', 'OpenWeatherMap')
         title = settings.get('customTitle', '')
 
-        timezone = device_config.get_config("timezone", default="America/New_York")
-        time_format = device_config.get_config("time_format", default="24h")
-        tz = pytz.timezone(timezone)
-
         try:
             if weather_provider == "OpenWeatherMap":
                 api_key = device_config.load_env_key("OPEN_WEATHER_MAP_SECRET")
@@ -94,6 +93,30 @@ class Weather(BasePlugin):
                 aqi_data = self.get_air_quality(api_key, lat, long)
                 if settings.get('titleSelection', 'location') == 'location':
                     title = self.get_location(api_key, lat, long)
+            elif weather_provider == "OpenMeteo":
+                forecast_days = 7
+                weather_data = self.get_open_meteo_data(lat, long, units, forecast_days + 1)
+                aqi_data = self.get_open_meteo_air_quality(lat, long)
+            else:
+                raise RuntimeError(f"Nieznany dostawca pogody: {weather_provider}")
+        except Exception as e:
+            logger.error(f"{weather_provider} request failed: {str(e)}")
+            raise RuntimeError(f"{weather_provider} request failure, please check logs.")
+
+        return PluginData({"weather": weather_data, "aqi": aqi_data, "title": title}, ttl=WEATHER_DATA_TTL)
+
+    def render(self, data, settings, device_config):
+        lat = float(settings.get('latitude'))
+        units = settings.get('units')
+        weather_provider = settings.get('weatherProvider', 'OpenWeatherMap')
+        weather_data, aqi_data = data["weather"], data["aqi"]
+
+        timezone = device_config.get_config("timezone", default="America/New_York")
+        time_format = device_config.get_config("time_format", default="24h")
+        tz = pytz.timezone(timezone)
+
+        try:
+            if weather_provider == "OpenWeatherMap":
                 if settings.get('weatherTimeZone', 'locationTimeZone') == 'locationTimeZone':
                     logger.info("Using location timezone for OpenWeatherMap data.")
                     wtz = self.parse_timezone(weather_data)
@@ -101,22 +124,15 @@ class Weather(BasePlugin):
                 else:
                     logger.info("Using configured timezone for OpenWeatherMap data.")
                     template_params = self.parse_weather_data(weather_data, aqi_data, tz, units, time_format, lat)
-            elif weather_provider == "OpenMeteo":
-                forecast_days = 7
-                weather_data = self.get_open_meteo_data(lat, long, units, forecast_days + 1)
-                aqi_data = self.get_open_meteo_air_quality(lat, long)
-                template_params = self.parse_open_meteo_data(weather_data, aqi_data, tz, units, time_format, lat)
             else:
-                raise RuntimeError(f"Nieznany dostawca pogody: {weather_provider}")
+                template_params = self.parse_open_meteo_data(weather_data, aqi_data, tz, units, time_format, lat)
 
-            template_params['title'] = title
+            template_params['title'] = data["title"]
         except Exception as e:
             logger.error(f"{weather_provider} request failed: {str(e)}")
             raise RuntimeError(f"{weather_provider} request failure, please check logs.")
 
-        dimensions = device_config.get_resolution()
-        if device_config.get_config("orientation") == "vertical":
-            dimensions = dimensions[::-1]
+        dimensions = self.get_dimensions(device_config)
 
         template_params["plugin_settings"] = settings
 
@@ -662,7 +678,7 @@ class Weather(BasePlugin):
 
     def get_weather_data(self, api_key, units, lat, long):
         url = WEATHER_URL.format(lat=lat, long=long, units=units, api_key=api_key)
-        response = requests.get(url)
+        response = http_utils.get(url)
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to retrieve weather data: {response.content}")
             raise RuntimeError("Nie udało się pobrać danych pogodowych.")
@@ -671,7 +687,7 @@ class Weather(BasePlugin):
 
     def get_air_quality(self, api_key, lat, long):
         url = AIR_QUALITY_URL.format(lat=lat, long=long, api_key=api_key)
-        response = requests.get(url)
+        response = http_utils.get(url)
 
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to get air quality data: {response.content}")
@@ -681,7 +697,7 @@ class Weather(BasePlugin):
 
     def get_location(self, api_key, lat, long):
         url = GEOCODING_URL.format(lat=lat, long=long, api_key=api_key)
-        response = requests.get(url)
+        response = http_utils.get(url)
 
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to get location: {response.content}")
@@ -695,7 +711,7 @@ class Weather(BasePlugin):
     def get_open_meteo_data(self, lat, long, units, forecast_days):
         unit_params = OPEN_METEO_UNIT_PARAMS[units]
         url = OPEN_METEO_FORECAST_URL.format(lat=lat, long=long, forecast_days=forecast_days) + f"&{unit_params}"
-        response = requests.get(url)
+        response = http_utils.get(url)
 
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to retrieve Open-Meteo weather data: {response.content}")
@@ -705,7 +721,7 @@ class Weather(BasePlugin):
 
     def get_open_meteo_air_quality(self, lat, long):
         url = OPEN_METEO_AIR_QUALITY_URL.format(lat=lat, long=long)
-        response = requests.get(url)
+        response = http_utils.get(url)
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to retrieve Open-Meteo air quality data: {response.content}")
             raise RuntimeError("Nie udało się pobrać danych o jakości powietrza Open-Meteo.")
@@ -1,4 +1,5 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.base_plugin.native_layout import NativeCanvas, TextBox, Block, get_layout_font
 from PIL import Image
 from datetime import datetime, timezone
 import logging
@@ -35,4 +36,32 @@ class YearProgress(BasePlugin):
         }
         
         image = self.render_image(dimensions, "year_progress.html", "year_progress.css", template_params)
-        return image
\ No newline at end of file
+        return image
+
+    def render_native(self, dimensions, html_file, template_params):
+        canvas = NativeCanvas(dimensions, template_params.get("plugin_settings"))
+        year_percent = template_params["year_percent"]
+        label_size = min(canvas.vh(5), canvas.vw(4))
+        label_font = get_layout_font("Jost", label_size)
+
+        def draw_progress_bar(canvas, box):
+            x, y, width, height = box
+            fill_width = width * year_percent / 100
+            canvas.fill_rect(x, y, x + fill_width, y + height)
+            # dotted pattern of the remaining part, a 1px dot every 5px
+            for dot_y in range(round(y) + 2, round(y + height), 5):
+                for dot_x in range(round(x + fill_width) + 2, round(x + width), 5):
+                    canvas.draw.point((dot_x, dot_y), fill=canvas.text_color)
+
+        def draw_labels(canvas, box):
+            x, y, width, height = box
+            canvas.draw_text_line(x, y, width, f"{year_percent}% UPŁYNĘŁO", label_font, label_size, "left")
+            canvas.draw_text_line(x, y, width, f"POZOSTAŁO DNI {template_params['days_left']}", label_font, label_size, "right")
+
+        canvas.stack([
+            TextBox(template_params["year"], min(canvas.vh(20), canvas.vw(16)), "bold", line_height=1),
+            TextBox("POSTĘP", min(canvas.vh(10), canvas.vw(8)), line_height=1, margin_bottom=canvas.vh(10)),
+            Block(canvas.vh(10), draw_progress_bar),
+            Block(canvas.get_line_box(label_font, label_size), draw_labels, margin_top=8)
+        ], box=canvas.center_box(90))
+        return canvas.image
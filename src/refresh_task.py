@@ -1,17 +1,30 @@
 import threading
 import time
 import os
+import copy
 import logging
-import psutil
 import pytz
-from datetime import datetime, timezone
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from plugins.plugin_registry import get_plugin_instance
+from plugin_sandbox import PluginSandbox, SandboxedPlugin
 from utils.image_utils import compute_image_hash
+from utils.tracing import trace, traced
+from utils.data_cache import get_data_digest
+from utils.connectivity import ConnectivityMonitor
+from utils.http_utils import configure_connectivity, is_connection_error
+from utils.metrics import time_stage, observe_stage, collect_stages, get_system_stats, RENDER_STAGES, REFRESHES, REFRESH_SKIPS, PLUGIN_ERRORS
 from model import RefreshInfo, PlaylistManager
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# seconds before a refresh that the data of its plugin is fetched
+PREFETCH_LEAD_SECONDS = 60
+
+# minimum seconds between two catch-up refreshes once the network is back
+CATCH_UP_INTERVAL_SECONDS = 30
+
 class RefreshTask:
     """Handles the logic for refreshing the display using a backgroud thread."""
 
@@ -24,11 +37,26 @@ class RefreshTask:
         self.condition = threading.Condition(self.lock)
         self.running = False
         self.manual_update_request = ()
+        # serializes manual updates requested by concurrent web threads
+        self.manual_update_lock = threading.Lock()
 
         self.refresh_event = threading.Event()
         self.refresh_event.set()
         self.refresh_result = {}
 
+        # optional worker process that plugins are generated in, see PluginSandbox
+        self.sandbox = None
+        self.sandbox_config = None
+
+        # timer fetching the data of the next plugin ahead of its refresh
+        self.prefetch_timer = None
+
+        # plugin instances skipped while offline, refreshed one at a time once the network is back
+        self.connectivity = ConnectivityMonitor.from_config(device_config)
+        configure_connectivity(self.connectivity)
+        self.catch_up_queue = OrderedDict()
+        self.last_catch_up = None
+
     def start(self):
         """Starts the background thread for refreshing the display."""
         if not self.thread or not self.thread.is_alive():
@@ -42,9 +70,12 @@ class RefreshTask:
         with self.condition:
             self.running = False
             self.condition.notify_all()  # Wake the thread to let it exit
+        self._cancel_prefetch()
         if self.thread:
             logger.info("Stopping refresh task")
             self.thread.join()
+        if self.sandbox:
+            self.sandbox.stop()
 
     def _run(self):
         """Background task that manages the periodic refresh of the display.
@@ -71,9 +102,11 @@ class RefreshTask:
         - Captures and logs any unexpected errors during execution to prevent the thread from exiting.
         """
         while True:
+            refresh_action = None
             try:
                 with self.condition:
-                    sleep_time = self.device_config.get_config("plugin_cycle_interval_seconds", default=60*60)
+                    sleep_time = self._get_sleep_time()
+                    self._schedule_prefetch(sleep_time)
 
                     # Wait for sleep_time or until notified
                     self.condition.wait(timeout=sleep_time)
@@ -84,51 +117,82 @@ class RefreshTask:
                     if not self.running:
                         break
 
-                    playlist_manager = self.device_config.get_playlist_manager()
-                    latest_refresh = self.device_config.get_refresh_info()
-                    current_dt = self._get_current_datetime()
-
-                    refresh_action = None
-                    if self.manual_update_request:
-                        # handle immediate update request
-                        logger.info("Manual update requested")
-                        refresh_action = self.manual_update_request
-                        self.manual_update_request = ()
-                    else:
-
-                        if self.device_config.get_config("log_system_stats"):
-                            self.log_system_stats()
-
-                        # handle refresh based on playlists
-                        logger.info(f"Running interval refresh check. | current_time: {current_dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                        playlist, plugin_instance = self._determine_next_plugin(playlist_manager, latest_refresh, current_dt)
-                        if plugin_instance:
-                            refresh_action = PlaylistRefresh(playlist, plugin_instance)
-
-                    if refresh_action:
-                        plugin_config = self.device_config.get_plugin(refresh_action.get_plugin_id())
-                        if plugin_config is None:
-                            logger.error(f"Plugin config not found for '{refresh_action.get_plugin_id()}'.")
-                            continue
-                        plugin = get_plugin_instance(plugin_config)
-                        image = refresh_action.execute(plugin, self.device_config, current_dt)
-                        image_hash = compute_image_hash(image)
-
-                        refresh_info = refresh_action.get_refresh_info()
-                        refresh_info.update({"refresh_time": current_dt.isoformat(), "image_hash": image_hash})
-                        # check if image is the same as current image
-                        if image_hash != latest_refresh.image_hash:
-                            logger.info(f"Updating display. | refresh_info: {refresh_info}")
-                            self.display_manager.display_image(image, image_settings=plugin.config.get("image_settings", []))
+                    with trace("refresh") as refresh_span:
+                        playlist_manager = self.device_config.get_playlist_manager()
+                        latest_refresh = self.device_config.get_refresh_info()
+                        current_dt = self._get_current_datetime()
+
+                        refresh_action = None
+                        if self.manual_update_request:
+                            # handle immediate update request
+                            logger.info("Manual update requested")
+                            refresh_action = self.manual_update_request
+                            self.manual_update_request = ()
                         else:
-                            logger.info(f"Image already displayed, skipping refresh. | refresh_info: {refresh_info}")
 
-                        # update latest refresh data in the device config
-                        self.device_config.refresh_info = RefreshInfo(**refresh_info)
-                        self.device_config.write_config()
+                            if self.device_config.get_config("log_system_stats"):
+                                self.log_system_stats()
+
+                            # handle refresh based on playlists
+                            logger.info(f"Running interval refresh check. | current_time: {current_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+                            with time_stage("schedule"):
+                                online = self.connectivity.is_online()
+                                if online and self._is_catch_up_due():
+                                    refresh_action = self._catch_up(playlist_manager, latest_refresh, current_dt)
+                                if not refresh_action:
+                                    # advancing the playlist rotation changes the config, like the web threads do
+                                    with self.device_config.lock:
+                                        playlist, plugin_instance, use_latest_image = self._determine_next_plugin(playlist_manager, latest_refresh, current_dt, online)
+                                    if plugin_instance:
+                                        refresh_action = PlaylistRefresh(playlist, plugin_instance, use_latest_image=use_latest_image)
+
+                        if refresh_action:
+                            plugin_config = self.device_config.get_plugin(refresh_action.get_plugin_id())
+                            if plugin_config is None:
+                                logger.error(f"Plugin config not found for '{refresh_action.get_plugin_id()}'.")
+                                continue
+                            plugin_id = refresh_action.get_plugin_id()
+                            refresh_span.set(plugin_id=plugin_id, refresh_type=refresh_action.get_refresh_info()["refresh_type"])
+                            plugin = self._get_plugin(plugin_config)
+                            with collect_stages() as stages:
+                                start = time.perf_counter()
+                                image = refresh_action.execute(plugin, self.device_config, current_dt)
+                                # time spent by the plugin outside of rendering, mostly fetching its data
+                                render_time = sum(stages.get(stage, 0) for stage in RENDER_STAGES)
+                                observe_stage("fetch", max(time.perf_counter() - start - render_time, 0), plugin_id)
+                            REFRESHES.inc(plugin_id=plugin_id)
+
+                            with time_stage("hash", plugin_id):
+                                image_hash = compute_image_hash(image)
+
+                            with self.device_config.lock:
+                                refresh_action.record_result(image_hash)
+
+                            refresh_info = refresh_action.get_refresh_info()
+                            refresh_info.update({"refresh_time": current_dt.isoformat(), "image_hash": image_hash})
+                            # check if image is the same as current image
+                            if image_hash != latest_refresh.image_hash:
+                                logger.info(f"Updating display. | refresh_info: {refresh_info}")
+                                self.display_manager.display_image(image, image_settings=plugin.config.get("image_settings", []))
+                            else:
+                                logger.info(f"Image already displayed, skipping refresh. | refresh_info: {refresh_info}")
+                                REFRESH_SKIPS.inc(plugin_id=plugin_id)
+                                refresh_span.set(skipped=True)
+
+                            # update latest refresh data in the device config
+                            with self.device_config.lock:
+                                self.device_config.refresh_info = RefreshInfo(**refresh_info)
+                                with time_stage("config_write"):
+                                    self.device_config.write_config()
 
             except Exception as e:
                 logger.exception('Exception during refresh')
+                if refresh_action:
+                    PLUGIN_ERRORS.inc(plugin_id=refresh_action.get_plugin_id())
+                if is_connection_error(e):
+                    self.connectivity.mark_offline()
+                    if isinstance(refresh_action, PlaylistRefresh):
+                        self._queue_catch_up(refresh_action.playlist, refresh_action.plugin_instance)
                 self.refresh_result["exception"] = e  # Capture exception
             finally:
                 self.refresh_event.set()
@@ -136,16 +200,17 @@ class RefreshTask:
     def manual_update(self, refresh_action):
         """Manually triggers an update for the specified plugin id and plugin settings by notifying the background process."""
         if self.running:
-            with self.condition:
-                self.manual_update_request = refresh_action
-                self.refresh_result = {}
-                self.refresh_event.clear()
+            with self.manual_update_lock:
+                with self.condition:
+                    self.manual_update_request = refresh_action
+                    self.refresh_result = {}
+                    self.refresh_event.clear()
 
-                self.condition.notify_all()  # Wake the thread to process manual update
+                    self.condition.notify_all()  # Wake the thread to process manual update
 
-            self.refresh_event.wait()
-            if self.refresh_result.get("exception"):
-                raise self.refresh_result.get("exception")
+                self.refresh_event.wait()
+                if self.refresh_result.get("exception"):
+                    raise self.refresh_result.get("exception")
         else:
             logger.warn("Background refresh task is not running, unable to do a manual update")
 
@@ -155,52 +220,202 @@ class RefreshTask:
             with self.condition:
                 self.condition.notify_all()
 
+    def _get_plugin(self, plugin_config):
+        """Returns the plugin, generating its images in the sandbox when 'plugin_sandbox' is enabled."""
+        sandbox_config = self.device_config.get_config("plugin_sandbox", default={}) or {}
+        if sandbox_config != self.sandbox_config:
+            if self.sandbox:
+                self.sandbox.stop()
+            self.sandbox = PluginSandbox.from_config(self.device_config)
+            self.sandbox_config = dict(sandbox_config)
+
+        if self.sandbox:
+            return SandboxedPlugin(plugin_config, self.sandbox)
+        return get_plugin_instance(plugin_config)
+
     def _get_current_datetime(self):
         """Retrieves the current datetime based on the device's configured timezone."""
-        tz_str = self.device_config.get_config("timezone", default="UTC")
+        tz_str = self.device_config.get_snapshot().get_config("timezone", default="UTC")
         return datetime.now(pytz.timezone(tz_str))
 
-    def _determine_next_plugin(self, playlist_manager, latest_refresh_info, current_dt):
-        """Determines the next plugin to refresh based on the active playlist, plugin cycle interval, and current time."""
+    def _get_sleep_time(self):
+        """Returns the seconds until the next refresh check.
+
+        This is the plugin cycle interval, shortened to wake up when the current plugin is due,
+        when the active playlist changes or when plugin instances wait for a catch-up refresh. It is
+        computed from the latest config snapshot, without waiting for the web threads.
+        """
+        snapshot = self.device_config.get_snapshot()
+        plugin_cycle_interval = snapshot.get_config("plugin_cycle_interval_seconds", default=60*60)
+        current_dt = self._get_current_datetime()
+        wake_times = []
+
+        latest_refresh_dt = snapshot.get_refresh_info().get_refresh_datetime()
+        if latest_refresh_dt and latest_refresh_dt.tzinfo:
+            wake_times.append(latest_refresh_dt + timedelta(seconds=plugin_cycle_interval))
+
+        next_transition = snapshot.get_playlist_manager().get_next_transition(current_dt)
+        if next_transition:
+            wake_times.append(next_transition)
+
+        sleep_time = plugin_cycle_interval
+        if self.catch_up_queue:
+            sleep_time = min(sleep_time, CATCH_UP_INTERVAL_SECONDS)
+        for wake_time in wake_times:
+            sleep_time = min(sleep_time, max((wake_time - current_dt).total_seconds(), 1))
+        return sleep_time
+
+    def _cancel_prefetch(self):
+        if self.prefetch_timer:
+            self.prefetch_timer.cancel()
+            self.prefetch_timer = None
+
+    def _schedule_prefetch(self, sleep_time):
+        """Fetches the data of the plugin instance expected at the next wake up, shortly before it.
+
+        Only plugins implementing fetch_data are prefetched, their render then uses the fresh data
+        instead of waiting for the network. Nothing is prefetched while plugins run in the sandbox,
+        which keeps plugin code out of this process. The plugin instance is read from the latest
+        config snapshot, so the prefetch never waits for the web threads.
+        """
+        self._cancel_prefetch()
+        snapshot = self.device_config.get_snapshot()
+        sandbox_config = snapshot.get_config("plugin_sandbox", default={}) or {}
+        if sleep_time <= PREFETCH_LEAD_SECONDS or sandbox_config.get("enabled", False) or not self.connectivity.online:
+            return
+        try:
+            wake_dt = self._get_current_datetime() + timedelta(seconds=sleep_time)
+            playlist = snapshot.get_playlist_manager().determine_active_playlist(wake_dt)
+            plugin_instance = playlist.peek_next_plugin() if playlist else None
+            if not plugin_instance or not plugin_instance.should_refresh(wake_dt):
+                return
+            plugin_config = self.device_config.get_plugin(plugin_instance.plugin_id)
+            if plugin_config is None:
+                return
+            plugin = get_plugin_instance(plugin_config)
+            if not plugin.is_two_phase():
+                return
+        except Exception as e:
+            logger.warning(f"Failed to schedule prefetch: {e}")
+            return
+
+        logger.debug(f"Scheduled prefetch. | plugin_instance: {plugin_instance.name} | in: {sleep_time - PREFETCH_LEAD_SECONDS:.0f} s")
+        self.prefetch_timer = threading.Timer(sleep_time - PREFETCH_LEAD_SECONDS, plugin.prefetch_data,
+                                              args=(dict(plugin_instance.settings), self.device_config))
+        self.prefetch_timer.daemon = True
+        self.prefetch_timer.start()
+
+    def _determine_next_plugin(self, playlist_manager, latest_refresh_info, current_dt, online=True):
+        """Determines the next plugin to refresh based on the active playlist, plugin cycle interval, and current time.
+
+        Returns the playlist, the plugin instance and whether the latest image of the instance should
+        be shown instead of generating a new one, which is the case for network plugins while offline.
+        """
         playlist = playlist_manager.determine_active_playlist(current_dt)
         if not playlist:
             playlist_manager.active_playlist = None
             logger.info(f"No active playlist determined.")
-            return None, None
+            return None, None, False
 
+        playlist_changed = playlist.name != playlist_manager.active_playlist
         playlist_manager.active_playlist = playlist.name
         if not playlist.plugins:
             logger.info(f"Active playlist '{playlist.name}' has no plugins.")
-            return None, None
+            return None, None, False
 
         latest_refresh_dt = latest_refresh_info.get_refresh_datetime()
         plugin_cycle_interval = self.device_config.get_config("plugin_cycle_interval_seconds", default=3600)
-        should_refresh = PlaylistManager.should_refresh(latest_refresh_dt, plugin_cycle_interval, current_dt)
+        # a playlist that just became active is shown right away, instead of after the interval
+        should_refresh = playlist_changed or PlaylistManager.should_refresh(latest_refresh_dt, plugin_cycle_interval, current_dt)
 
         if not should_refresh:
             latest_refresh_str = latest_refresh_dt.strftime('%Y-%m-%d %H:%M:%S') if latest_refresh_dt else "None"
             logger.info(f"Not time to update display. | latest_update: {latest_refresh_str} | plugin_cycle_interval: {plugin_cycle_interval}")
-            return None, None
+            return None, None, False
 
         plugin = playlist.get_next_plugin()
-        logger.info(f"Determined next plugin. | active_playlist: {playlist.name} | plugin_instance: {plugin.name}")
-
-        return playlist, plugin
+        use_latest_image = False
+        if not online:
+            plugin, use_latest_image = self._determine_offline_plugin(playlist, plugin, current_dt)
+            if not plugin:
+                logger.info(f"Offline and no plugin of the active playlist can be shown. | active_playlist: {playlist.name}")
+                return None, None, False
+        logger.info(f"Determined next plugin. | active_playlist: {playlist.name} | plugin_instance: {plugin.name} | "
+                    f"online: {online}")
+
+        return playlist, plugin, use_latest_image
+
+    def _is_offline_capable(self, plugin_instance):
+        plugin_config = self.device_config.get_plugin(plugin_instance.plugin_id)
+        return bool(plugin_config and plugin_config.get("offline_capable", False))
+
+    def _determine_offline_plugin(self, playlist, plugin, current_dt):
+        """Rotates from the given plugin instance to one that can be shown without the network.
+
+        Plugins marked offline_capable in their plugin-info.json are generated as usual. Other
+        instances are shown with their latest image if they have one, and are queued for a
+        catch-up refresh if they are due. Instances without an image are skipped.
+        """
+        for _ in range(len(playlist.plugins)):
+            if self._is_offline_capable(plugin):
+                return plugin, False
+            has_image = os.path.isfile(os.path.join(self.device_config.plugin_image_dir, plugin.get_image_path()))
+            if not has_image or plugin.should_refresh(current_dt):
+                self._queue_catch_up(playlist, plugin)
+            if has_image:
+                return plugin, True
+            logger.info(f"Offline, skipping plugin instance without an image. | plugin_instance: {plugin.name}")
+            plugin = playlist.get_next_plugin()
+        return None, False
+
+    def _queue_catch_up(self, playlist, plugin_instance):
+        key = (playlist.name, plugin_instance.plugin_id, plugin_instance.name)
+        if key not in self.catch_up_queue:
+            logger.info(f"Queued catch-up refresh. | playlist: {playlist.name} | plugin_instance: {plugin_instance.name}")
+            self.catch_up_queue[key] = None
+
+    def _is_catch_up_due(self):
+        if not self.catch_up_queue:
+            return False
+        return self.last_catch_up is None or time.monotonic() - self.last_catch_up >= CATCH_UP_INTERVAL_SECONDS
+
+    def _catch_up(self, playlist_manager, latest_refresh_info, current_dt):
+        """Refreshes the oldest plugin instance queued while offline.
+
+        The refresh is returned to be displayed if the instance is the one on the display, otherwise
+        its image is regenerated in place and None is returned. Instances deleted in the meantime are
+        dropped from the queue.
+        """
+        (playlist_name, plugin_id, instance_name), _ = self.catch_up_queue.popitem(last=False)
+        self.last_catch_up = time.monotonic()
+        with self.device_config.lock:
+            playlist = playlist_manager.get_playlist(playlist_name)
+            plugin_instance = playlist.find_plugin(plugin_id, instance_name) if playlist else None
+        plugin_config = self.device_config.get_plugin(plugin_id)
+        if not plugin_instance or plugin_config is None:
+            return None
+
+        logger.info(f"Running catch-up refresh. | playlist: {playlist_name} | plugin_instance: {instance_name} | "
+                    f"queued: {len(self.catch_up_queue)}")
+        refresh_action = PlaylistRefresh(playlist, plugin_instance, force=True)
+        if latest_refresh_info.playlist == playlist_name and latest_refresh_info.plugin_instance == instance_name:
+            return refresh_action
+
+        try:
+            refresh_action.execute(self._get_plugin(plugin_config), self.device_config, current_dt)
+        except Exception as e:
+            logger.warning(f"Catch-up refresh failed. | plugin_instance: {instance_name} | error: {e}")
+            PLUGIN_ERRORS.inc(plugin_id=plugin_id)
+            if is_connection_error(e):
+                self.connectivity.mark_offline()
+                self._queue_catch_up(playlist, plugin_instance)
+            return None
+        self.device_config.write_config()
+        return None
     
     def log_system_stats(self):
-        metrics = {
-            'cpu_percent': psutil.cpu_percent(interval=1),
-            'memory_percent': psutil.virtual_memory().percent,
-            'disk_percent': psutil.disk_usage('/').percent,
-            'load_avg_1_5_15': os.getloadavg(),
-            'swap_percent': psutil.swap_memory().percent,
-            'net_io': {
-                'bytes_sent': psutil.net_io_counters().bytes_sent,
-                'bytes_recv': psutil.net_io_counters().bytes_recv
-            }
-        }
-
-        logger.info(f"System Stats: {metrics}")
+        """Logs the latest system stats collected by the background sampler."""
+        logger.info(f"System Stats: {get_system_stats()}")
 
 class RefreshAction:
     """Base class for a refresh action. Subclasses should override the methods below."""
@@ -217,6 +432,10 @@ class RefreshAction:
         """Return the plugin ID associated with this refresh."""
         raise NotImplementedError("Subclasses must implement the get_plugin_id method.")
 
+    def record_result(self, image_hash):
+        """Optionally tracks the hash of the generated image."""
+        pass
+
 class ManualRefresh(RefreshAction):
     """Performs a manual refresh based on a plugin's ID and its associated settings.
     
@@ -229,6 +448,7 @@ class ManualRefresh(RefreshAction):
         self.plugin_id = plugin_id
         self.plugin_settings = plugin_settings
 
+    @traced("ManualRefresh.execute")
     def execute(self, plugin, device_config, current_dt: datetime):
         """Performs a manual refresh using the stored plugin ID and settings."""
         return plugin.generate_image(self.plugin_settings, device_config)
@@ -249,10 +469,13 @@ class PlaylistRefresh(RefreshAction):
         plugin_instance: The plugin instance to refresh.
     """
 
-    def __init__(self, playlist, plugin_instance, force=False):
+    def __init__(self, playlist, plugin_instance, force=False, use_latest_image=False):
         self.playlist = playlist
         self.plugin_instance = plugin_instance
         self.force = force
+        # shows the image generated earlier, used for network plugins while offline
+        self.use_latest_image = use_latest_image
+        self.generated = False
 
     def get_refresh_info(self):
         """Return refresh metadata as a dictionary."""
@@ -267,22 +490,46 @@ class PlaylistRefresh(RefreshAction):
         """Return the plugin ID associated with this refresh."""
         return self.plugin_instance.plugin_id
 
+    def record_result(self, image_hash):
+        """Tracks whether the generated image or its data changed, adapting the refresh interval."""
+        if not self.generated or not self.plugin_instance.is_adaptive():
+            return
+        data_digest = get_data_digest(self.plugin_instance.plugin_id, self.plugin_instance.settings)
+        changed = self.plugin_instance.record_refresh(image_hash, data_digest)
+        logger.info(f"Adaptive refresh interval. | plugin_instance: {self.plugin_instance.name} | changed: {changed} | "
+                    f"interval: {self.plugin_instance.get_refresh_interval()} s")
+
+    @traced("PlaylistRefresh.execute")
     def execute(self, plugin, device_config, current_dt: datetime):
-        """Performs a refresh for the specified plugin instance within its playlist context."""
-        # Determine the file path for the plugin's image
-        plugin_image_path = os.path.join(device_config.plugin_image_dir, self.plugin_instance.get_image_path())
+        """Performs a refresh for the specified plugin instance within its playlist context.
 
-        # Check if a refresh is needed based on the plugin instance's criteria
-        if self.plugin_instance.should_refresh(current_dt) or self.force:
+        The plugin works on a copy of the instance settings taken under the config lock, so the web
+        threads can replace them meanwhile. Changes the plugin makes to the copy, like the index of
+        the next image, are applied with the refresh time under the lock, unless the settings were
+        replaced while the image was generated.
+        """
+        with device_config.lock:
+            # Determine the file path for the plugin's image
+            plugin_image_path = os.path.join(device_config.plugin_image_dir, self.plugin_instance.get_image_path())
+            # Check if a refresh is needed based on the plugin instance's criteria
+            refresh = not self.use_latest_image and (self.plugin_instance.should_refresh(current_dt) or self.force)
+            original_settings = self.plugin_instance.settings
+            settings = copy.deepcopy(original_settings)
+
+        if refresh:
             logger.info(f"Refreshing plugin instance. | plugin_instance: '{self.plugin_instance.name}'") 
             # Generate a new image
-            image = plugin.generate_image(self.plugin_instance.settings, device_config)
+            image = plugin.generate_image(settings, device_config)
             image.save(plugin_image_path)
-            self.plugin_instance.latest_refresh_time = current_dt.isoformat()
+            with device_config.lock:
+                if self.plugin_instance.settings is original_settings:
+                    self.plugin_instance.settings = settings
+                self.plugin_instance.latest_refresh_time = current_dt.isoformat()
+            self.generated = True
         else:
             logger.info(f"Not time to refresh plugin instance, using latest image. | plugin_instance: {self.plugin_instance.name}.")
             # Load the existing image from disk
             with Image.open(plugin_image_path) as img:
                 image = img.copy()
 
-        return image
\ No newline at end of file
+        return image
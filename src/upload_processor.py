@@ -0,0 +1,98 @@
+import threading
+import queue
+import os
+import logging
+from utils.image_utils import normalize_orientation, create_panel_derivative
+
+logger = logging.getLogger(__name__)
+
+class UploadProcessor:
+    """Post-processes uploaded images on a background thread.
+
+    Uploads are written to disk as-is by the request thread. This worker then normalizes the
+    EXIF orientation of JPEGs and writes panel-sized derivatives, so large batches of uploads
+    do not block the web server.
+    """
+
+    def __init__(self, device_config):
+        self.device_config = device_config
+
+        self.thread = None
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.running = False
+
+        # progress counters, reset whenever the queue drains
+        self.total = 0
+        self.processed = 0
+        self.failed = 0
+        self.current_file = None
+
+    def start(self):
+        """Starts the background thread for processing uploads."""
+        if not self.thread or not self.thread.is_alive():
+            logger.info("Starting upload processor")
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.running = True
+            self.thread.start()
+
+    def stop(self):
+        """Stops the processor once the queued uploads have been handled."""
+        if self.thread:
+            logger.info("Stopping upload processor")
+            self.running = False
+            self.queue.put(None)
+            self.thread.join()
+
+    def submit(self, file_path):
+        """Queues an uploaded file for processing. Runs inline if the worker isn't started."""
+        with self.lock:
+            if self.total == self.processed + self.failed:
+                self.total = self.processed = self.failed = 0
+            self.total += 1
+
+        if self.running:
+            self.queue.put(file_path)
+        else:
+            self._process(file_path)
+
+    def get_progress(self):
+        """Returns the progress of the current batch of uploads."""
+        with self.lock:
+            return {
+                "total": self.total,
+                "processed": self.processed,
+                "failed": self.failed,
+                "pending": self.total - self.processed - self.failed,
+                "current_file": self.current_file
+            }
+
+    def _run(self):
+        while True:
+            file_path = self.queue.get()
+            if file_path is None:
+                break
+            self._process(file_path)
+
+    def _process(self, file_path):
+        file_name = os.path.basename(file_path)
+        with self.lock:
+            self.current_file = file_name
+
+        success = True
+        try:
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension in ('.jpg', '.jpeg') and normalize_orientation(file_path):
+                logger.info(f"Applied EXIF orientation. | file: {file_name}")
+            if extension != '.pdf':
+                create_panel_derivative(file_path, self.device_config.get_resolution())
+        except Exception as e:
+            success = False
+            logger.warning(f"Failed to process upload {file_name}: {e}")
+        finally:
+            with self.lock:
+                self.current_file = None
+                if success:
+                    self.processed += 1
+                else:
+                    self.failed += 1
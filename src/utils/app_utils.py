@@ -1,10 +1,13 @@
+import hashlib
 import logging
 import os
 import socket
 import subprocess
+import tempfile
 
+from functools import lru_cache
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFont
 from flask import current_app
 
 from utils.locale_utils import t
@@ -36,6 +39,9 @@ FONT_FAMILIES = {
     }]
 }
 
+# read size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 FONTS = {
     "ds-gigi": "DS-DIGI.TTF",
     "napoli": "Napoli.ttf",
@@ -65,16 +71,17 @@ def get_wifi_name():
     except subprocess.CalledProcessError:
         return None
 
-def is_connected():
+def is_connected(address=("8.8.8.8", 53), timeout=2):
     """Check if the Raspberry Pi has an internet connection."""
     try:
         # Try to connect to Google's public DNS server
-        socket.create_connection(("8.8.8.8", 53), timeout=2)
-        return True
+        with socket.create_connection(address, timeout=timeout):
+            return True
     except OSError:
         return False
 
 def get_font(font_name, font_size=50, font_weight="normal"):
+    """Returns the font, cached by family, weight and size rounded to whole pixels."""
     if font_name in FONT_FAMILIES:
         font_variants = FONT_FAMILIES[font_name]
 
@@ -84,7 +91,7 @@ def get_font(font_name, font_size=50, font_weight="normal"):
 
         if font_entry:
             font_path = resolve_path(os.path.join("static", "fonts", font_entry["file"]))
-            return ImageFont.truetype(font_path, font_size)
+            return _load_font(font_path, max(1, int(round(font_size))))
         else:
             logger.warn(f"Requested font weight not found: font_name={font_name}, font_weight={font_weight}")
     else:
@@ -92,6 +99,65 @@ def get_font(font_name, font_size=50, font_weight="normal"):
 
     return None
 
+@lru_cache(maxsize=64)
+def _load_font(font_path, font_size):
+    return ImageFont.truetype(font_path, font_size)
+
+@lru_cache(maxsize=4096)
+def get_text_length(font, text):
+    """Returns the advance width of the text, cached per font object."""
+    return font.getlength(text)
+
+@lru_cache(maxsize=1024)
+def get_text_bbox(font, text):
+    """Returns the bounding box of the text drawn at the origin, cached per font object."""
+    return font.getbbox(text)
+
+def wrap_text(text, font, max_width, letter_spacing=0, pre_line=False):
+    """Wraps text into lines no wider than max_width, keeping explicit line breaks.
+
+    The number of words on each line is found with a binary search, so long texts need few
+    measurements. letter_spacing is added after every character. A word wider than max_width is
+    kept on its own line, or with pre_line broken like 'overflow-wrap: break-word', which also keeps
+    empty lines like 'white-space: pre-line'.
+    """
+    def fits(words):
+        line = " ".join(words)
+        return get_text_length(font, line) + letter_spacing * len(line) <= max_width
+
+    lines = []
+    for paragraph in text.split("\n"):
+        words = paragraph.split()
+        if not words and pre_line:
+            lines.append("")
+        start = 0
+        while start < len(words):
+            low, high = start + 1, len(words)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if fits(words[start:middle]):
+                    low = middle
+                else:
+                    high = middle - 1
+
+            word = words[start]
+            if pre_line and low == start + 1 and len(word) > 1 and not fits([word]):
+                # the longest prefix that fits, the rest starts the next line
+                split, high = 1, len(word) - 1
+                while split < high:
+                    middle = (split + high + 1) // 2
+                    if fits([word[:middle]]):
+                        split = middle
+                    else:
+                        high = middle - 1
+                lines.append(word[:split])
+                words[start] = word[split:]
+                continue
+
+            lines.append(" ".join(words[start:low]))
+            start = low
+    return lines
+
 def get_fonts():
     fonts_list = []
     for font_family, variants in FONT_FAMILIES.items():
@@ -148,9 +214,42 @@ def parse_form(request_form):
             request_dict[key] = request_form.getlist(key)
     return request_dict
 
+def save_uploaded_file(file, save_dir, extension):
+    """Streams an uploaded file to disk, naming it by the SHA-256 of its content.
+
+    Identical uploads resolve to the same file, so re-uploading a photo does not store a copy.
+    """
+    hasher = hashlib.sha256()
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=save_dir, suffix=".part", delete=False) as tmp_file:
+            tmp_path = tmp_file.name
+            while True:
+                chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                tmp_file.write(chunk)
+
+        file_path = os.path.join(save_dir, f"{hasher.hexdigest()[:32]}.{extension}")
+        if os.path.exists(file_path):
+            os.remove(tmp_path)
+            return file_path, False
+
+        os.replace(tmp_path, file_path)
+        return file_path, True
+    except Exception:
+        # e.g. the client disconnected, the partial file is not kept
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 def handle_request_files(request_files, form_data={}):
     allowed_file_extensions = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'webp', 'heif', 'heic'}
     file_location_map = {}
+    upload_processor = current_app.config.get('UPLOAD_PROCESSOR')
+    file_save_dir = resolve_path(os.path.join("static", "images", "saved"))
+
     # handle existing file locations being provided as part of the form data
     for key in set(request_files.keys()):
         is_list = key.endswith('[]')
@@ -163,31 +262,21 @@ def handle_request_files(request_files, form_data={}):
         if not file_name:
             continue
 
-        extension = os.path.splitext(file_name)[1].replace('.', '')
-        if not extension or extension.lower() not in allowed_file_extensions:
+        extension = os.path.splitext(file_name)[1].replace('.', '').lower()
+        if not extension or extension not in allowed_file_extensions:
             continue
 
-        file_name = os.path.basename(file_name)
+        file_path, is_new = save_uploaded_file(file, file_save_dir, extension)
+        logger.info(f"Saved upload. | file: {os.path.basename(file_name)} | path: {file_path} | new: {is_new}")
 
-        file_save_dir = resolve_path(os.path.join("static", "images", "saved"))
-        file_path = os.path.join(file_save_dir, file_name)
-
-        # Open the image and apply EXIF transformation before saving
-        if extension in {'jpg', 'jpeg'}:
-            try:
-                with Image.open(file) as img:
-                    img = ImageOps.exif_transpose(img)
-                    img.save(file_path)
-            except Exception as e:
-                logger.warn(f"EXIF processing error for {file_name}: {e}")
-                file.save(file_path)
-        else:
-            # Directly save non-JPEG files
-            file.save(file_path)
+        # orientation and panel derivatives are handled in the background
+        if is_new and upload_processor:
+            upload_processor.submit(file_path)
 
         if is_list:
             file_location_map.setdefault(key, [])
-            file_location_map[key].append(file_path)
+            if file_path not in file_location_map[key]:
+                file_location_map[key].append(file_path)
         else:
             file_location_map[key] = file_path
     return file_location_map
@@ -0,0 +1,182 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from utils.app_utils import resolve_path, FONT_FAMILIES
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_CACHE_DIR = resolve_path(os.path.join("cache", "bundles"))
+FONTS_DIR = resolve_path(os.path.join("static", "fonts"))
+
+# unicode ranges kept when subsetting fonts: Basic Latin, Latin-1, Latin Extended-A (Polish),
+# general punctuation, currency symbols, arrows and the degree/ellipsis style symbols
+SUBSET_UNICODES = [
+    *range(0x0020, 0x007F),
+    *range(0x00A0, 0x0180),
+    *range(0x2010, 0x2070),
+    *range(0x20A0, 0x20C1),
+    *range(0x2190, 0x2200),
+    0x2122, 0x2212,
+]
+_SUBSET_UNICODE_SET = frozenset(SUBSET_UNICODES)
+
+# characters outside SUBSET_UNICODES keep their whole block of this many code points, e.g. Greek or
+# Cyrillic text keeps its alphabet, so pages with similar text share a bundle
+UNICODE_BLOCK_SIZE = 128
+
+FONT_FAMILY_PATTERN = re.compile(r"font-family\s*:\s*([^;}]+)", re.IGNORECASE)
+
+# built bundles, keyed by the css files and their modification times
+_bundles = {}
+_bundles_lock = threading.Lock()
+
+def get_style_bundle(css_files, text=""):
+    """Returns a single stylesheet with the given css files and the fonts they use inlined.
+
+    Fonts are embedded as data URIs, subsetted to WOFF2 when fontTools is installed, so the
+    rendered page loads without any further filesystem requests. The subset keeps SUBSET_UNICODES
+    and the unicode blocks of any other character in text, the content being rendered. Bundles are
+    cached in memory and on disk, keyed by the hash of their inputs.
+    """
+    blocks = get_unicode_blocks(text)
+    key = (tuple((path, _get_mtime(path)) for path in css_files), blocks)
+    bundle = _bundles.get(key)
+    if bundle is not None:
+        return bundle
+
+    with _bundles_lock:
+        bundle = _bundles.get(key)
+        if bundle is None:
+            bundle = _build_bundle(css_files, blocks)
+            _bundles[key] = bundle
+    return bundle
+
+def get_unicode_blocks(text):
+    """Returns the sorted blocks of the characters in text that SUBSET_UNICODES does not cover."""
+    return tuple(sorted({ord(char) // UNICODE_BLOCK_SIZE for char in set(text) if ord(char) not in _SUBSET_UNICODE_SET}))
+
+def _get_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def _read_css(css_files):
+    sources = []
+    for path in css_files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                sources.append(f.read())
+        except OSError as e:
+            logger.warning(f"Failed to read stylesheet {path}: {e}")
+    return "\n".join(sources)
+
+def _get_font_files(css):
+    """Returns the font variants of the families referenced by the css."""
+    referenced = set()
+    for declaration in FONT_FAMILY_PATTERN.findall(css):
+        referenced.update(name.strip().strip("'\"") for name in declaration.split(","))
+
+    font_files = []
+    for font_family, variants in FONT_FAMILIES.items():
+        if font_family not in referenced:
+            continue
+        for variant in variants:
+            font_files.append({
+                "font_family": font_family,
+                "path": os.path.join(FONTS_DIR, variant["file"]),
+                "font_weight": variant.get("font-weight", "normal"),
+                "font_style": variant.get("font-style", "normal"),
+            })
+    return font_files
+
+def _build_bundle(css_files, blocks):
+    css = _read_css(css_files)
+    font_files = _get_font_files(css)
+
+    digest = hashlib.sha256(css.encode("utf-8"))
+    for font in font_files:
+        digest.update(f"{font['path']}:{_get_mtime(font['path'])}".encode("utf-8"))
+    digest.update(b"woff2" if _can_subset() else b"truetype")
+    digest.update(",".join(str(block) for block in blocks).encode("ascii"))
+    bundle_path = os.path.join(BUNDLE_CACHE_DIR, f"{digest.hexdigest()[:32]}.css")
+
+    if os.path.isfile(bundle_path):
+        with open(bundle_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    unicodes = SUBSET_UNICODES + [code for block in blocks
+                                  for code in range(block * UNICODE_BLOCK_SIZE, (block + 1) * UNICODE_BLOCK_SIZE)]
+    font_faces = []
+    for font in font_files:
+        data, font_format, mime_type = _encode_font(font["path"], unicodes)
+        if data is None:
+            continue
+        font_faces.append(
+            "@font-face {"
+            f"font-family: \"{font['font_family']}\";"
+            f"font-weight: {font['font_weight']};"
+            f"font-style: {font['font_style']};"
+            f"src: url(data:{mime_type};base64,{data}) format(\"{font_format}\");"
+            "}"
+        )
+    bundle = "\n".join(font_faces + [css])
+
+    try:
+        os.makedirs(BUNDLE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{bundle_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(bundle)
+        os.replace(tmp_path, bundle_path)
+    except OSError as e:
+        logger.warning(f"Failed to write style bundle {bundle_path}: {e}")
+
+    logger.info(f"Built style bundle. | fonts: {len(font_faces)} | size: {len(bundle) // 1024} KB | file: {os.path.basename(bundle_path)}")
+    return bundle
+
+def _encode_font(path, unicodes):
+    """Returns the font subsetted to the unicodes as base64 data with its css format and mime type."""
+    try:
+        with open(path, "rb") as f:
+            font_bytes = f.read()
+    except OSError as e:
+        logger.warning(f"Failed to read font {path}: {e}")
+        return None, None, None
+
+    subset = _subset_font(font_bytes, unicodes)
+    if subset is not None:
+        return base64.b64encode(subset).decode("ascii"), "woff2", "font/woff2"
+    return base64.b64encode(font_bytes).decode("ascii"), "truetype", "font/ttf"
+
+def _can_subset():
+    try:
+        import fontTools.subset  # noqa: F401
+        import brotli  # noqa: F401, required by fontTools for woff2
+    except ImportError:
+        return False
+    return True
+
+def _subset_font(font_bytes, unicodes):
+    """Subsets the font to the unicodes as WOFF2, None if fontTools or brotli is missing."""
+    if not _can_subset():
+        return None
+
+    from fontTools import subset
+    try:
+        options = subset.Options()
+        options.flavor = "woff2"
+        options.layout_features = ["*"]
+        font = subset.load_font(io.BytesIO(font_bytes), options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=unicodes)
+        subsetter.subset(font)
+        output = io.BytesIO()
+        subset.save_font(font, output, options)
+        return output.getvalue()
+    except Exception as e:
+        logger.warning(f"Failed to subset font: {e}")
+        return None
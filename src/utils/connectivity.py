@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from utils.app_utils import is_connected
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_HOST = "8.8.8.8"
+DEFAULT_PROBE_PORT = 53
+PROBE_TIMEOUT = 2
+
+# seconds a probe result is trusted, an offline result is checked again sooner
+ONLINE_CACHE_SECONDS = 60
+OFFLINE_CACHE_SECONDS = 15
+
+ONLINE = REGISTRY.gauge(
+    "inkypi_online",
+    "1 if the last connectivity probe reached the network, 0 otherwise.")
+
+class ConnectivityMonitor:
+    """Tells whether the device is online, probing the network at most once per cache period.
+
+    The probe opens a TCP connection to probe_host:probe_port. Its result is cached for
+    online_cache_seconds, or offline_cache_seconds while offline, so the scheduler can ask before
+    every refresh. Failures seen elsewhere, like a plugin request that could not connect, are
+    reported with mark_offline and are trusted the same way.
+    """
+
+    def __init__(self, probe_host=DEFAULT_PROBE_HOST, probe_port=DEFAULT_PROBE_PORT, enabled=True,
+                 online_cache_seconds=ONLINE_CACHE_SECONDS, offline_cache_seconds=OFFLINE_CACHE_SECONDS):
+        self.probe_address = (probe_host, probe_port)
+        self.enabled = enabled
+        self.online_cache_seconds = online_cache_seconds
+        self.offline_cache_seconds = offline_cache_seconds
+
+        self.online = True
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, device_config):
+        """Creates the monitor from the 'connectivity' key of the device config.
+
+            {"enabled": true, "probe_host": "8.8.8.8", "probe_port": 53,
+             "online_cache_seconds": 60, "offline_cache_seconds": 15}
+        """
+        connectivity_config = device_config.get_config("connectivity", default={}) or {}
+        return cls(probe_host=connectivity_config.get("probe_host", DEFAULT_PROBE_HOST),
+                   probe_port=int(connectivity_config.get("probe_port", DEFAULT_PROBE_PORT)),
+                   enabled=connectivity_config.get("enabled", True),
+                   online_cache_seconds=int(connectivity_config.get("online_cache_seconds", ONLINE_CACHE_SECONDS)),
+                   offline_cache_seconds=int(connectivity_config.get("offline_cache_seconds", OFFLINE_CACHE_SECONDS)))
+
+    def is_online(self):
+        """Returns whether the network is reachable, probing it when the cached result expired."""
+        if not self.enabled:
+            return True
+        with self.lock:
+            cache_seconds = self.online_cache_seconds if self.online else self.offline_cache_seconds
+            if self.checked_at is None or time.monotonic() - self.checked_at >= cache_seconds:
+                self._set_online(is_connected(self.probe_address, timeout=PROBE_TIMEOUT))
+            return self.online
+
+    def mark_offline(self):
+        """Records that the network could not be reached, without waiting for the next probe."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self._set_online(False)
+
+    def _set_online(self, online):
+        if online != self.online:
+            logger.info(f"Connectivity changed. | online: {online}")
+        self.online = online
+        self.checked_at = time.monotonic()
+        ONLINE.set(1 if online else 0)
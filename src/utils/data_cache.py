@@ -0,0 +1,75 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+DATA_CACHE_DIR = resolve_path(os.path.join("cache", "data"))
+
+# data older than this is neither used as a fallback nor kept on disk
+MAX_STALE_SECONDS = 24 * 60 * 60
+
+_lock = threading.Lock()
+
+def get_data_key(plugin_id, settings):
+    """Returns the cache key of the data fetched by a plugin for its settings."""
+    encoded = json.dumps(settings, sort_keys=True, default=str)
+    return f"{plugin_id}-{hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:24]}"
+
+def _get_path(key):
+    return os.path.join(DATA_CACHE_DIR, f"{key}.json")
+
+def read_cached_data(key):
+    """Returns the cached data dict for the key, or None."""
+    try:
+        with open(_get_path(key), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to read cached plugin data. | key: {key} | error: {e}")
+        return None
+
+def get_data_digest(plugin_id, settings):
+    """Returns a digest of the data last fetched by a plugin for its settings, or None."""
+    cached = read_cached_data(get_data_key(plugin_id, settings))
+    if not cached:
+        return None
+    encoded = json.dumps(cached.get("data"), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:24]
+
+def write_cached_data(key, data):
+    """Writes the data dict for the key and removes entries older than MAX_STALE_SECONDS."""
+    path = _get_path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(DATA_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to write cached plugin data. | key: {key} | error: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+    _remove_expired()
+
+def _remove_expired():
+    cutoff = time.time() - MAX_STALE_SECONDS
+    with _lock:
+        try:
+            entries = list(os.scandir(DATA_CACHE_DIR))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
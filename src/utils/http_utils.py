@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+
+from utils.metrics import REGISTRY
+from utils.tracing import annotate
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeout in seconds, used when the caller does not pass one
+DEFAULT_TIMEOUT = (10, 30)
+
+# seconds a successful response is shared with identical requests made after it
+DEFAULT_MAX_AGE = 5 * 60
+
+# responses kept for sharing, the oldest are dropped beyond this
+MAX_SHARED_RESPONSES = 64
+
+# headers identifying who is asking, responses are only shared between requests with the same values
+AUTH_HEADERS = ("authorization", "cookie", "x-api-key", "accept")
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "inkypi_http_requests_total",
+    "Requests sent by plugins through the shared http client, by host.",
+    ("host",))
+COALESCED_REQUESTS = REGISTRY.counter(
+    "inkypi_http_coalesced_requests_total",
+    "Requests answered with the response of an identical request instead of being sent, by host.",
+    ("host", "reason"))
+
+class _Flight:
+    """A request in progress or completed, shared by every identical request."""
+    __slots__ = ("done", "response", "error", "completed_at", "max_age")
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.completed_at = None
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+# told about requests that could not reach their host, see configure_connectivity
+_connectivity = None
+
+def configure_connectivity(monitor):
+    """Reports the requests failing to connect or timing out to the monitor, None stops reporting."""
+    global _connectivity
+    _connectivity = monitor
+
+def is_connection_error(error):
+    """Returns whether the error, or an error it was raised from or while handling, is a connection failure or timeout.
+
+    Plugins often wrap request errors in their own, so the whole chain is checked.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+def get_request_key(method, url, params=None, headers=None, body=None):
+    """Returns the canonical identity of a request: method, url with sorted query, auth scope and body."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(key), str(value)) for key, value in (params.items() if isinstance(params, dict) else params))
+    canonical_url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(sorted(query)), ""))
+
+    scope = sorted((key.lower(), str(value)) for key, value in (headers or {}).items() if key.lower() in AUTH_HEADERS)
+    digest = hashlib.sha256(json.dumps([scope, body], sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    return f"{method.upper()} {canonical_url} {digest}"
+
+def request(method, url, params=None, headers=None, json_body=None, timeout=DEFAULT_TIMEOUT, max_age=None):
+    """Sends the request, unless an identical one is in flight or completed within max_age seconds.
+
+    Identical requests wait for the one in flight and get its response. Successful responses are
+    shared for max_age seconds, DEFAULT_MAX_AGE if not given, failures only with the requests that
+    waited for them. The returned response may be shared between threads, so only its status,
+    headers and content should be read.
+    """
+    if max_age is None:
+        max_age = DEFAULT_MAX_AGE
+    key = get_request_key(method, url, params, headers, json_body)
+    host = urlsplit(url).netloc.lower()
+
+    with _flights_lock:
+        _remove_expired()
+        flight = _flights.get(key)
+        if flight is not None and flight.done.is_set() and not _is_fresh(flight, max_age):
+            flight = None
+        owner = flight is None
+        if owner:
+            flight = _Flight(max_age)
+            _flights[key] = flight
+
+    if not owner:
+        reason = "fresh" if flight.done.is_set() else "in_flight"
+        flight.done.wait()
+        COALESCED_REQUESTS.inc(host=host, reason=reason)
+        annotate(coalesced=True)
+        logger.debug(f"Coalesced request. | url: {urlsplit(url)._replace(query='').geturl()} | reason: {reason}")
+        if flight.error is not None:
+            if not isinstance(flight.error, Exception):
+                raise requests.RequestException("The shared request was interrupted.") from flight.error
+            raise flight.error
+        return flight.response
+
+    HTTP_REQUESTS.inc(host=host)
+    try:
+        flight.response = requests.request(method, url, params=params, headers=headers, json=json_body, timeout=timeout)
+    except BaseException as e:
+        # also interrupts, so the waiters are released with the error instead of a missing response
+        flight.error = e
+        if _connectivity is not None and isinstance(e, (requests.ConnectionError, requests.Timeout)):
+            _connectivity.mark_offline()
+        raise
+    finally:
+        flight.completed_at = time.monotonic()
+        if flight.error is not None or flight.response is None or not flight.response.ok:
+            # failures are not shared with later requests, they retry
+            with _flights_lock:
+                if _flights.get(key) is flight:
+                    del _flights[key]
+        flight.done.set()
+    return flight.response
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, max_age=None):
+    return request("GET", url, params=params, headers=headers, timeout=timeout, max_age=max_age)
+
+def post(url, json=None, headers=None, timeout=DEFAULT_TIMEOUT, max_age=None):
+    return request("POST", url, headers=headers, json_body=json, timeout=timeout, max_age=max_age)
+
+def clear():
+    """Forgets the shared responses, requests in flight are not affected."""
+    with _flights_lock:
+        for key in [key for key, flight in _flights.items() if flight.done.is_set()]:
+            del _flights[key]
+
+def _is_fresh(flight, max_age):
+    return flight.completed_at is not None and time.monotonic() - flight.completed_at < max_age
+
+def _remove_expired():
+    # called with the lock held, drops the responses older than the max_age they were requested with
+    completed = [(flight.completed_at, key) for key, flight in _flights.items() if flight.done.is_set()]
+    for completed_at, key in completed:
+        if not _is_fresh(_flights[key], _flights[key].max_age):
+            del _flights[key]
+    completed = [(completed_at, key) for completed_at, key in completed if key in _flights]
+    if len(completed) > MAX_SHARED_RESPONSES:
+        for _, key in sorted(completed)[:len(completed) - MAX_SHARED_RESPONSES]:
+            del _flights[key]
@@ -6,11 +6,21 @@ import logging
 import hashlib
 import tempfile
 import subprocess
+import time
+import resource
+from utils.tracing import traced
+from utils.http_utils import DEFAULT_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+# EXIF tag id for image orientation
+ORIENTATION_TAG = 0x0112
+
+# uploads stored as photos, their derivatives are written as JPEG
+PHOTO_EXTENSIONS = {'.jpg', '.jpeg', '.heif', '.heic'}
+
 def get_image(image_url):
-    response = requests.get(image_url)
+    response = requests.get(image_url, timeout=DEFAULT_TIMEOUT)
     img = None
     if 200 <= response.status_code < 300 or response.status_code == 304:
         img = Image.open(BytesIO(response.content))
@@ -87,7 +97,7 @@ def compute_image_hash(image):
     img_bytes = image.tobytes()
     return hashlib.sha256(img_bytes).hexdigest()
 
-def take_screenshot_html(html_str, dimensions, timeout_ms=None):
+def take_screenshot_html(html_str, dimensions, timeout_ms=None, timings=None):
     image = None
     try:
         # Create a temporary HTML file
@@ -95,7 +105,7 @@ def take_screenshot_html(html_str, dimensions, timeout_ms=None):
             html_file.write(html_str.encode("utf-8"))
             html_file_path = html_file.name
 
-        image = take_screenshot(html_file_path, dimensions, timeout_ms)
+        image = take_screenshot(html_file_path, dimensions, timeout_ms, timings)
 
         # Remove html file
         os.remove(html_file_path)
@@ -105,8 +115,21 @@ def take_screenshot_html(html_str, dimensions, timeout_ms=None):
 
     return image
 
-def take_screenshot(target, dimensions, timeout_ms=None):
+def lift_address_space_limit():
+    """Raises the soft address space limit to the hard limit, e.g. in the browser started by the plugin sandbox."""
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (hard, hard))
+
+@traced("take_screenshot")
+def take_screenshot(target, dimensions, timeout_ms=None, timings=None):
+    """Renders the target with headless chromium and returns it as an image.
+
+    If a timings dict is provided, the seconds spent in the browser and decoding the
+    screenshot are stored under the 'browser' and 'decode' keys.
+    """
     image = None
+    if timings is None:
+        timings = {}
     try:
         # Create a temporary output file for the screenshot
         with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as img_file:
@@ -133,7 +156,10 @@ def take_screenshot(target, dimensions, timeout_ms=None):
         ]
         if timeout_ms:
             command.append(f"--timeout={timeout_ms}")
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        start = time.perf_counter()
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                preexec_fn=lift_address_space_limit)
+        timings["browser"] = time.perf_counter() - start
 
         # Check if the process failed or the output file is missing
         if result.returncode != 0 or not os.path.exists(img_file_path):
@@ -142,8 +168,10 @@ def take_screenshot(target, dimensions, timeout_ms=None):
             return None
 
         # Load the image using PIL
+        start = time.perf_counter()
         with Image.open(img_file_path) as img:
             image = img.copy()
+        timings["decode"] = time.perf_counter() - start
 
         # Remove image files
         os.remove(img_file_path)
@@ -153,6 +181,57 @@ def take_screenshot(target, dimensions, timeout_ms=None):
 
     return image
 
+def get_derivative_path(image_path):
+    """Returns the path of the panel-sized derivative generated for an uploaded image."""
+    root, extension = os.path.splitext(image_path)
+    if extension.lower() in PHOTO_EXTENSIONS:
+        return f"{root}_panel.jpg"
+    return f"{root}_panel.png"
+
+def normalize_orientation(image_path):
+    """Applies the EXIF orientation of a JPEG in place. Returns True if the file was rewritten.
+
+    Files without a rotation tag are left untouched so they are not needlessly re-encoded.
+    """
+    with Image.open(image_path) as img:
+        if img.getexif().get(ORIENTATION_TAG, 1) == 1:
+            return False
+        transposed = ImageOps.exif_transpose(img)
+        save_kwargs = {
+            "quality": 95,
+            "exif": transposed.info.get("exif", b""),
+            "icc_profile": img.info.get("icc_profile"),
+        }
+
+    tmp_path = f"{image_path}.tmp"
+    transposed.save(tmp_path, format="JPEG", **save_kwargs)
+    os.replace(tmp_path, image_path)
+    return True
+
+def create_panel_derivative(image_path, resolution):
+    """Writes a downscaled copy of an image that still covers the panel in either orientation.
+
+    Returns the derivative path, or None if the original is already small enough.
+    """
+    target = max(resolution)
+    with Image.open(image_path) as img:
+        img = ImageOps.exif_transpose(img)
+        scale = target / min(img.size)
+        if scale >= 1:
+            return None
+
+        new_size = (max(int(img.width * scale), 1), max(int(img.height * scale), 1))
+        derivative = img.resize(new_size, Image.LANCZOS)
+
+    derivative_path = get_derivative_path(image_path)
+    tmp_path = f"{derivative_path}.tmp"
+    if derivative_path.endswith(".jpg"):
+        derivative.convert("RGB").save(tmp_path, format="JPEG", quality=90)
+    else:
+        derivative.save(tmp_path, format="PNG")
+    os.replace(tmp_path, derivative_path)
+    return derivative_path
+
 def pad_image_blur(img: Image, dimensions: tuple[int, int]) -> Image:
     bkg = ImageOps.fit(img, dimensions)
     bkg = bkg.filter(ImageFilter.BoxBlur(8))
@@ -0,0 +1,62 @@
+import builtins
+import importlib.util
+import logging
+import sys
+import time
+
+class ImportProfiler:
+    """Measures the time spent importing each module.
+
+    Wraps `builtins.__import__` while active and records, for every module that is actually
+    loaded, the cumulative import time and the time excluding nested imports.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._stack = []
+        self._original_import = None
+        self._start_time = None
+
+    def start(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+            self._start_time = time.perf_counter()
+
+    def stop(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = name
+        if level > 0:
+            try:
+                module_name = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+            except (ImportError, ValueError):
+                pass
+
+        if module_name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if module_name in sys.modules and module_name not in self.timings:
+                self.timings[module_name] = (elapsed, elapsed - nested)
+
+    def log_report(self, limit=25):
+        """Logs the slowest imports, ordered by cumulative time."""
+        # the logger is created here, as loggers created before logging is configured get disabled
+        logger = logging.getLogger(__name__)
+        total = time.perf_counter() - self._start_time if self._start_time else 0
+        logger.info(f"Startup profile. | elapsed: {total * 1000:.1f} ms | modules imported: {len(self.timings)}")
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][0], reverse=True)
+        for module_name, (cumulative, own) in ranked[:limit]:
+            logger.info(f"Import time | cumulative: {cumulative * 1000:8.1f} ms | self: {own * 1000:8.1f} ms | module: {module_name}")
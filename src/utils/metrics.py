@@ -0,0 +1,238 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# bucket upper bounds in seconds, from fast cache hits to slow browser renders and panel refreshes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# stages recorded by plugins while rendering, subtracted from the plugin time to get the fetch time
+RENDER_STAGES = ("template", "browser", "decode", "native")
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for name, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """Base class of the metrics, holding one value per combination of label values."""
+    type_name = None
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels))
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(counts):
+                counts[index] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', _format_value(float(bound))))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', '+Inf'))} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(float(total))}")
+        lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Holds the application metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, label_names=()):
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=()):
+        return self.register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "inkypi_refresh_stage_seconds",
+    "Time spent in each stage of the refresh pipeline.",
+    ("stage", "plugin_id"))
+REFRESHES = REGISTRY.counter(
+    "inkypi_refreshes_total",
+    "Refreshes that generated an image, by plugin.",
+    ("plugin_id",))
+REFRESH_SKIPS = REGISTRY.counter(
+    "inkypi_refresh_skips_total",
+    "Refreshes not sent to the display because the image was unchanged.",
+    ("plugin_id",))
+PLUGIN_ERRORS = REGISTRY.counter(
+    "inkypi_plugin_errors_total",
+    "Refreshes that failed with an error, by plugin.",
+    ("plugin_id",))
+SYSTEM_STATS = REGISTRY.gauge(
+    "inkypi_system",
+    "System statistics sampled in the background.",
+    ("stat",))
+
+# stage timings of the refresh running on the current thread
+_collected = threading.local()
+
+def observe_stage(stage, seconds, plugin_id=""):
+    """Records the duration of a refresh pipeline stage."""
+    STAGE_SECONDS.observe(seconds, stage=stage, plugin_id=plugin_id or "")
+    stages = getattr(_collected, "stages", None)
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0) + seconds
+
+@contextmanager
+def time_stage(stage, plugin_id=""):
+    """Times the enclosed block as a refresh pipeline stage, and records it as a span of the current trace."""
+    start = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, plugin_id)
+
+@contextmanager
+def collect_stages():
+    """Collects the stages observed on this thread into the yielded dict."""
+    previous = getattr(_collected, "stages", None)
+    stages = {}
+    _collected.stages = stages
+    try:
+        yield stages
+    finally:
+        _collected.stages = previous
+
+def render_metrics():
+    return REGISTRY.render()
+
+def sample_system_stats():
+    """Samples system statistics without blocking, the cpu usage is measured since the previous call."""
+    net_io = psutil.net_io_counters()
+    stats = {
+        'cpu_percent': psutil.cpu_percent(interval=None),
+        'memory_percent': psutil.virtual_memory().percent,
+        'disk_percent': psutil.disk_usage('/').percent,
+        'swap_percent': psutil.swap_memory().percent,
+        'bytes_sent': net_io.bytes_sent,
+        'bytes_recv': net_io.bytes_recv
+    }
+    for stat, value in zip(("load_1", "load_5", "load_15"), os.getloadavg()):
+        stats[stat] = value
+    for stat, value in stats.items():
+        SYSTEM_STATS.set(value, stat=stat)
+    return stats
+
+def get_system_stats():
+    """Returns the latest sampled system statistics, sampling now if the sampler has not run yet."""
+    with SYSTEM_STATS.lock:
+        stats = {key[0]: value for key, value in SYSTEM_STATS.values.items()}
+    return stats or sample_system_stats()
+
+class SystemStatsSampler:
+    """Samples system statistics on a background thread, so readers never wait for psutil."""
+
+    def __init__(self, interval_seconds=15):
+        self.interval_seconds = interval_seconds
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if not self.thread or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                sample_system_stats()
+            except Exception as e:
+                logger.warning(f"Failed to sample system stats: {e}")
+            self.stop_event.wait(self.interval_seconds)
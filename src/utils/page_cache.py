@@ -0,0 +1,76 @@
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 32
+
+PAGE_CACHE_LOOKUPS = REGISTRY.counter(
+    "inkypi_page_cache_lookups_total",
+    "Page cache lookups by endpoint, a hit returns the page rendered earlier for the same config version.",
+    ("endpoint", "result"))
+
+_enabled = True
+_max_entries = DEFAULT_MAX_ENTRIES
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+def configure_page_cache(enabled=True, max_entries=DEFAULT_MAX_ENTRIES):
+    """Turns the page cache on or off, it is off in development where templates change on disk."""
+    global _enabled, _max_entries
+    _enabled = bool(enabled)
+    _max_entries = max(int(max_entries), 1)
+    clear()
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+def cached_page(max_age=None):
+    """Caches the html rendered by a route until the config changes.
+
+    Pages are keyed by endpoint, path with query string, language and config version. Every
+    config write publishes a new version, so pages rendered from an older config are never
+    served again and are dropped when the next page is stored. Pages showing the time relative
+    to now pass max_age, in seconds. Only html returned as a string is cached, error responses
+    are rendered on every request.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return view(*args, **kwargs)
+
+            device_config = current_app.config['DEVICE_CONFIG']
+            # read before rendering, a page rendered while the config changes is stored under the old version
+            version = device_config.version
+            key = (request.endpoint, request.full_path, device_config.config.get("language", "pl"), version)
+            now = time.monotonic()
+            with _lock:
+                entry = _entries.get(key)
+                if entry is not None and (entry[1] is None or entry[1] > now):
+                    _entries.move_to_end(key)
+                    PAGE_CACHE_LOOKUPS.inc(endpoint=request.endpoint, result="hit")
+                    return entry[0]
+            PAGE_CACHE_LOOKUPS.inc(endpoint=request.endpoint, result="miss")
+
+            page = view(*args, **kwargs)
+            if isinstance(page, str):
+                _store(key, page, now + max_age if max_age else None, version)
+            return page
+        return wrapper
+    return decorator
+
+def _store(key, page, expires_at, version):
+    with _lock:
+        for stale_key in [stale_key for stale_key in _entries if stale_key[3] != version]:
+            del _entries[stale_key]
+        _entries[key] = (page, expires_at)
+        _entries.move_to_end(key)
+        while len(_entries) > _max_entries:
+            _entries.popitem(last=False)
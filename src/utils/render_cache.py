@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from PIL import Image
+from utils.app_utils import resolve_path
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_DIR = resolve_path(os.path.join("cache", "renders"))
+DEFAULT_MAX_ENTRIES = 100
+
+# bumped whenever the rendering itself changes in a way the digest cannot see
+RENDER_CACHE_VERSION = 1
+
+RENDER_CACHE_LOOKUPS = REGISTRY.counter(
+    "inkypi_render_cache_lookups_total",
+    "Render cache lookups by plugin, a hit returns the image rendered earlier for identical inputs.",
+    ("plugin_id", "result"))
+
+_enabled = True
+_max_entries = DEFAULT_MAX_ENTRIES
+_lock = threading.Lock()
+
+def configure_render_cache(device_config):
+    """Configures the render cache from the 'render_cache' key of the device config.
+
+        {"enabled": true, "max_entries": 100}
+    """
+    global _max_entries
+    cache_config = device_config.get_config("render_cache", default={}) or {}
+    set_enabled(cache_config.get("enabled", True))
+    _max_entries = max(int(cache_config.get("max_entries", DEFAULT_MAX_ENTRIES)), 1)
+
+def set_enabled(enabled):
+    """Turns the render cache on or off, tools measuring render times turn it off."""
+    global _enabled
+    _enabled = bool(enabled)
+
+def is_enabled():
+    return _enabled
+
+def _get_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def compute_render_digest(plugin_id, backend, dimensions, template_files, css_files, template_params, volatile_params=()):
+    """Returns a stable digest of everything a render depends on.
+
+    Files are identified by their path and modification time, template params by their JSON
+    encoding with sorted keys. Params listed in volatile_params are left out of the digest.
+    """
+    params = {key: value for key, value in template_params.items() if key not in volatile_params}
+    digest = hashlib.sha256()
+    digest.update(f"{RENDER_CACHE_VERSION}:{plugin_id}:{backend}:{dimensions[0]}x{dimensions[1]}".encode("utf-8"))
+    for path in (*template_files, *css_files):
+        digest.update(f"{path}:{_get_mtime(path)}".encode("utf-8"))
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+def _get_path(digest):
+    return os.path.join(RENDER_CACHE_DIR, f"{digest}.png")
+
+def get_cached_render(digest, plugin_id=""):
+    """Returns the image rendered for the digest, or None. A hit marks the entry as recently used."""
+    path = _get_path(digest)
+    try:
+        with Image.open(path) as img:
+            img.load()
+            image = img.copy()
+        os.utime(path)
+    except FileNotFoundError:
+        image = None
+    except Exception as e:
+        logger.warning(f"Failed to read cached render, rendering again. | digest: {digest} | error: {e}")
+        image = None
+
+    RENDER_CACHE_LOOKUPS.inc(plugin_id=plugin_id, result="hit" if image is not None else "miss")
+    return image
+
+def put_cached_render(digest, image):
+    """Stores the rendered image for the digest, evicting the least recently used entries beyond the limit."""
+    path = _get_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(RENDER_CACHE_DIR, exist_ok=True)
+        image.save(tmp_path, format="PNG")
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to write cached render. | digest: {digest} | error: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+    _evict()
+
+def _evict():
+    with _lock:
+        try:
+            entries = [entry for entry in os.scandir(RENDER_CACHE_DIR) if entry.name.endswith(".png")]
+        except OSError:
+            return
+        if len(entries) <= _max_entries:
+            return
+
+        entries.sort(key=lambda entry: _get_mtime(entry.path) or 0)
+        for entry in entries[:len(entries) - _max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        logger.debug(f"Evicted cached renders. | removed: {len(entries) - _max_entries}")
+
+def get_hit_rates():
+    """Returns the hit rate of the render cache by plugin id."""
+    lookups = {}
+    with RENDER_CACHE_LOOKUPS.lock:
+        for (plugin_id, result), count in RENDER_CACHE_LOOKUPS.values.items():
+            hits, total = lookups.get(plugin_id, (0, 0))
+            lookups[plugin_id] = (hits + (count if result == "hit" else 0), total + count)
+    return {plugin_id: hits / total for plugin_id, (hits, total) in lookups.items() if total}
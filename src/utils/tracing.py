@@ -0,0 +1,245 @@
+import contextvars
+import functools
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TRACES = 20
+
+_enabled = False
+_traces = deque(maxlen=DEFAULT_MAX_TRACES)
+# guards _traces, appended by the refresh thread while the web threads read it
+_traces_lock = threading.Lock()
+_current_span = contextvars.ContextVar("current_span", default=None)
+_http_hook_lock = threading.Lock()
+_http_hook_installed = False
+
+class Span:
+    """A timed operation within a trace, with attributes and child spans."""
+    __slots__ = ("name", "start", "end", "attributes", "children", "thread_id")
+
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.children = []
+        self.thread_id = threading.get_ident()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def walk(self, depth=0):
+        """Yields (depth, span) for this span and its descendants, depth first."""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+class _NoopSpan:
+    """Returned while tracing is disabled or outside of a trace, so callers never need to check."""
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """A finished root span, stored in the ring buffer of recent traces."""
+
+    def __init__(self, root, wall_start):
+        self.id = uuid.uuid4().hex[:12]
+        self.root = root
+        self.wall_start = wall_start
+
+    @property
+    def started_at(self):
+        return datetime.fromtimestamp(self.wall_start).strftime("%Y-%m-%d %H:%M:%S")
+
+    @property
+    def bytes_fetched(self):
+        return sum(span.attributes.get("bytes") or 0 for _, span in self.root.walk() if span.name == "http")
+
+    def get_rows(self):
+        """Returns the spans as waterfall rows, with offsets and widths relative to the trace."""
+        total = self.root.duration or 1e-9
+        rows = []
+        for depth, span in self.root.walk():
+            rows.append({
+                "name": span.name,
+                "depth": depth,
+                "offset_ms": (span.start - self.root.start) * 1000,
+                "duration_ms": span.duration * 1000,
+                "left": (span.start - self.root.start) / total * 100,
+                "width": max(span.duration / total * 100, 0.2),
+                "attributes": span.attributes
+            })
+        return rows
+
+    def to_chrome_events(self, pid=1):
+        events = []
+        for _, span in self.root.walk():
+            events.append({
+                "name": span.name,
+                "cat": "inkypi",
+                "ph": "X",
+                "ts": (self.wall_start + span.start - self.root.start) * 1_000_000,
+                "dur": span.duration * 1_000_000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {key: _json_safe(value) for key, value in span.attributes.items()}
+            })
+        return events
+
+def configure_tracing(device_config):
+    """Enables tracing from the 'tracing' key of the device config.
+
+        {"enabled": true, "max_traces": 20}
+    """
+    global _enabled, _traces
+    tracing_config = device_config.get_config("tracing", default={}) or {}
+    max_traces = tracing_config.get("max_traces", DEFAULT_MAX_TRACES)
+    with _traces_lock:
+        if max_traces != _traces.maxlen:
+            _traces = deque(_traces, maxlen=max_traces)
+    _enabled = bool(tracing_config.get("enabled", False))
+    if _enabled:
+        _install_http_hook()
+        logger.info(f"Tracing enabled. | max_traces: {max_traces}")
+
+def is_enabled():
+    return _enabled
+
+@contextmanager
+def trace(name, **attributes):
+    """Records the enclosed block as the root span of a new trace."""
+    if not _enabled:
+        yield NOOP_SPAN
+        return
+
+    wall_start = time.time()
+    root = Span(name, attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except Exception as e:
+        root.set(error=str(e) or e.__class__.__name__)
+        raise
+    finally:
+        root.end = time.perf_counter()
+        _current_span.reset(token)
+        recorded = Trace(root, wall_start)
+        with _traces_lock:
+            _traces.append(recorded)
+
+@contextmanager
+def span(name, **attributes):
+    """Records the enclosed block as a child of the current span, does nothing outside of a trace."""
+    parent = _current_span.get() if _enabled else None
+    if parent is None:
+        yield NOOP_SPAN
+        return
+
+    child = Span(name, attributes)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.set(error=str(e) or e.__class__.__name__)
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+def traced(name):
+    """Decorates a function to run in a span, recording the size of a returned image."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled or _current_span.get() is None:
+                return function(*args, **kwargs)
+            with span(name) as current:
+                result = function(*args, **kwargs)
+                if hasattr(result, "size") and hasattr(result, "mode"):
+                    current.set(image_size=list(result.size), image_mode=result.mode)
+                return result
+        return wrapper
+    return decorator
+
+def annotate(**attributes):
+    """Adds attributes to the current span."""
+    if _enabled:
+        current = _current_span.get()
+        if current is not None:
+            current.set(**attributes)
+
+def get_traces():
+    """Returns the recent traces, newest first."""
+    with _traces_lock:
+        return list(reversed(_traces))
+
+def get_trace(trace_id):
+    with _traces_lock:
+        return next((recorded for recorded in _traces if recorded.id == trace_id), None)
+
+def to_chrome_trace(traces):
+    """Returns the traces in the Chrome trace event format, loadable in chrome://tracing or Perfetto."""
+    events = []
+    for recorded in traces:
+        events.extend(recorded.to_chrome_events())
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def _json_safe(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return str(value)
+
+def _install_http_hook():
+    """Records requests made through the requests library as 'http' spans, with the bytes received."""
+    global _http_hook_installed
+    with _http_hook_lock:
+        if _http_hook_installed:
+            return
+        try:
+            import requests
+        except ImportError:
+            return
+
+        send = requests.Session.send
+
+        @functools.wraps(send)
+        def traced_send(session, request, **kwargs):
+            if _current_span.get() is None:
+                return send(session, request, **kwargs)
+            # the query string is left out as it often contains api keys
+            url = urlsplit(request.url)
+            with span("http", method=request.method, url=f"{url.scheme}://{url.netloc}{url.path}") as current:
+                response = send(session, request, **kwargs)
+                current.set(status=response.status_code, bytes=_get_response_size(response, kwargs.get("stream")))
+                return response
+
+        requests.Session.send = traced_send
+        _http_hook_installed = True
+
+def _get_response_size(response, stream):
+    # streamed bodies have not been read yet, so rely on the announced length
+    if not stream:
+        return len(response.content)
+    try:
+        return int(response.headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,112 @@
+import functools
+import logging
+import mimetypes
+import os
+import threading
+from flask import current_app, jsonify, request, send_from_directory
+from werkzeug.security import safe_join
+from utils.locale_utils import t
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THREADS = 4
+
+# versioned static assets never change under the same url, browsers keep them for a year
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+# variants written next to the static assets by scripts/compress_static.py, in order of preference
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# requests allowed to wait for a refresh at the same time, at least one thread is left for the UI
+_long_running_slots = threading.BoundedSemaphore(DEFAULT_THREADS - 1)
+
+def get_server_threads(device_config):
+    """Returns the number of waitress threads from the 'web_server' key of the device config.
+
+        {"threads": 4}
+    """
+    server_config = device_config.get_config("web_server", default={}) or {}
+    return max(int(server_config.get("threads", DEFAULT_THREADS)), 1)
+
+def configure_web_server(app, device_config):
+    """Serves the static assets with versioned urls and limits the long running requests to the threads.
+
+    Returns the number of threads to serve the app with.
+    """
+    global _long_running_slots
+    threads = get_server_threads(device_config)
+    _long_running_slots = threading.BoundedSemaphore(max(threads - 1, 1))
+
+    app.url_defaults(_add_static_version)
+    app.view_functions["static"] = _send_static_file
+    return threads
+
+def get_static_version(filename):
+    """Returns the version of a static asset, changing whenever the file is modified."""
+    path = safe_join(current_app.static_folder, filename)
+    try:
+        return format(os.stat(path).st_mtime_ns, "x")
+    except (OSError, TypeError):
+        return None
+
+def _add_static_version(endpoint, values):
+    if endpoint == "static" and "filename" in values and "v" not in values:
+        version = get_static_version(values["filename"])
+        if version:
+            values["v"] = version
+
+def _get_precompressed(filename):
+    """Returns the encoding and file name of the best precompressed variant accepted by the client."""
+    path = safe_join(current_app.static_folder, filename)
+    if path is None:
+        return None, filename
+    try:
+        source_mtime = os.path.getmtime(path)
+    except OSError:
+        return None, filename
+    for encoding, extension in PRECOMPRESSED_ENCODINGS:
+        if encoding not in request.accept_encodings:
+            continue
+        try:
+            # variants older than the asset are left over from before an update
+            if os.path.getmtime(path + extension) >= source_mtime:
+                return encoding, filename + extension
+        except OSError:
+            continue
+    return None, filename
+
+def _send_static_file(filename):
+    """Sends a static asset, precompressed if possible, cached for a year when requested by its current version."""
+    encoding, variant = _get_precompressed(filename)
+    if encoding:
+        response = send_from_directory(current_app.static_folder, variant,
+                                       mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response = send_from_directory(current_app.static_folder, filename)
+    response.vary.add("Accept-Encoding")
+
+    version = request.args.get("v")
+    if version and version == get_static_version(filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+def long_running(view):
+    """Marks a route waiting for a refresh, answered with 503 when the other threads already wait.
+
+    Refreshes can take a minute, limiting the requests waiting for them keeps a thread free for
+    the pages, images and static assets of the UI.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _long_running_slots.acquire(blocking=False):
+            lang = current_app.config['DEVICE_CONFIG'].config.get("language", "pl")
+            return jsonify({"error": t("server_busy", lang)}), 503
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _long_running_slots.release()
+    return wrapper
@@ -0,0 +1,27 @@
+import json
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+@pytest.fixture
+def device_config(tmp_path, monkeypatch):
+    """A Config backed by a temporary device.json."""
+    from config import Config
+
+    config_file = tmp_path / "device.json"
+    config_file.write_text(json.dumps({
+        "name": "InkyPi Test",
+        "display_type": "mock",
+        "resolution": [400, 300],
+        "orientation": "horizontal",
+        "timezone": "Europe/Warsaw",
+        "time_format": "24h",
+        "language": "pl"
+    }))
+    monkeypatch.setattr(Config, "config_file", str(config_file))
+    monkeypatch.setattr(Config, "plugin_image_dir", str(tmp_path / "plugins"))
+    return Config()
@@ -0,0 +1,115 @@
+import io
+import os
+import random
+
+import pytest
+
+from utils.app_utils import get_font, get_text_length, save_uploaded_file, wrap_text
+
+class FakeUpload:
+    def __init__(self, stream):
+        self.stream = stream
+
+class DisconnectingStream(io.BytesIO):
+    """Returns the first chunk, then fails like a client that disconnected."""
+
+    def read(self, size=-1):
+        if self.tell():
+            raise OSError("client disconnected")
+        return super().read(size)
+
+WORDS = "the quick brown fox jumps over a lazy dog while pack my box with five dozen liquor jugs".split()
+
+def greedy_wrap(text, font, max_width, letter_spacing=0):
+    """Reference wrapping that measures one more word at a time."""
+    def width(line):
+        return get_text_length(font, line) + letter_spacing * len(line)
+
+    lines = []
+    for paragraph in text.split("\n"):
+        line = None
+        for word in paragraph.split():
+            if line is not None and width(line + " " + word) <= max_width:
+                line += " " + word
+            else:
+                if line is not None:
+                    lines.append(line)
+                line = word
+        if line is not None:
+            lines.append(line)
+    return lines
+
+@pytest.fixture
+def font():
+    return get_font("Jost", 20)
+
+class TestSaveUploadedFile:
+
+    def test_names_file_by_content(self, tmp_path):
+        first, is_new = save_uploaded_file(FakeUpload(io.BytesIO(b"photo")), str(tmp_path), "jpg")
+        second, is_second_new = save_uploaded_file(FakeUpload(io.BytesIO(b"photo")), str(tmp_path), "jpg")
+
+        assert first == second
+        assert (is_new, is_second_new) == (True, False)
+        assert [path.name for path in tmp_path.iterdir()] == [os.path.basename(first)]
+
+    def test_removes_partial_file_on_error(self, tmp_path):
+        with pytest.raises(OSError):
+            save_uploaded_file(FakeUpload(DisconnectingStream(b"photo")), str(tmp_path), "jpg")
+
+        assert not list(tmp_path.iterdir())
+
+class TestWrapText:
+
+    @pytest.mark.parametrize("letter_spacing", [0, 2])
+    def test_matches_greedy_wrapping(self, font, letter_spacing):
+        rng = random.Random(31)
+        for _ in range(200):
+            paragraphs = [" ".join(rng.choices(WORDS, k=rng.randint(0, 30))) for _ in range(rng.randint(1, 3))]
+            text = "\n".join(paragraphs)
+            max_width = rng.randint(60, 400)
+
+            assert wrap_text(text, font, max_width, letter_spacing) == greedy_wrap(text, font, max_width, letter_spacing)
+
+    def test_lines_fit_max_width(self, font):
+        text = " ".join(WORDS)
+
+        for line in wrap_text(text, font, 150):
+            assert get_text_length(font, line) <= 150
+
+    def test_keeps_word_wider_than_max_width(self, font):
+        lines = wrap_text("a incomprehensibilities b", font, 60)
+
+        assert lines == ["a", "incomprehensibilities", "b"]
+        assert get_text_length(font, lines[1]) > 60
+
+    def test_letter_spacing_narrows_lines(self, font):
+        text = " ".join(WORDS)
+        lines = wrap_text(text, font, 200)
+        spaced_lines = wrap_text(text, font, 200, letter_spacing=3)
+
+        assert len(spaced_lines) > len(lines)
+        assert " ".join(spaced_lines) == text
+        for line in spaced_lines:
+            assert get_text_length(font, line) + 3 * len(line) <= 200
+
+    def test_pre_line_keeps_empty_lines(self, font):
+        assert wrap_text("fox\n\ndog", font, 200) == ["fox", "dog"]
+        assert wrap_text("fox\n\ndog", font, 200, pre_line=True) == ["fox", "", "dog"]
+
+    def test_pre_line_breaks_word_wider_than_max_width(self, font):
+        lines = wrap_text("a incomprehensibilities b", font, 60, pre_line=True)
+
+        assert lines[0] == "a"
+        assert "".join(lines[1:]).replace(" ", "") == "incomprehensibilitiesb"
+        for line in lines:
+            assert get_text_length(font, line) <= 60
+        # each piece is the longest prefix that fits
+        for line, following in zip(lines[1:], lines[2:]):
+            assert get_text_length(font, line + following[0]) > 60
+
+    def test_pre_line_continues_remainder_with_next_word(self, font):
+        max_width = get_text_length(font, "hensible a")
+        assert get_text_length(font, "incompre") <= max_width < get_text_length(font, "incompreh")
+
+        assert wrap_text("incomprehensible a", font, max_width, pre_line=True) == ["incompre", "hensible a"]
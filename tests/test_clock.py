@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+from PIL import ImageChops
+
+from plugins.clock import clock
+from plugins.clock.clock import Clock, configure_frame_cache
+
+SETTINGS = {"selectedClockFace": "Cyfrowy Zegar", "primaryColor": "#ffffff", "secondaryColor": "#000000"}
+
+@pytest.fixture(autouse=True)
+def empty_frame_cache(monkeypatch):
+    monkeypatch.setattr(clock, "_frame_cache", clock.OrderedDict())
+    monkeypatch.setattr(clock, "_frame_cache_bytes", 0)
+    monkeypatch.setattr(clock, "_frame_cache_max_bytes", clock.DEFAULT_FRAME_CACHE_MAX_MB * 1024 * 1024)
+
+def render(device_config):
+    return Clock({"id": "clock"}).generate_image(dict(SETTINGS), device_config)
+
+class TestFrameCache:
+
+    def test_cached_frame_matches_drawn_frame(self):
+        plugin = Clock({"id": "clock"})
+        time = datetime(2026, 10, 19, 12, 34)
+        drawn = plugin.draw_digital_clock((400, 300), time)
+        assert len(clock._frame_cache) == 1
+
+        cached = plugin.draw_digital_clock((400, 300), time)
+
+        assert ImageChops.difference(drawn, cached).getbbox() is None
+
+    def test_disabled(self, device_config):
+        device_config.update_value("clock_frame_cache", {"enabled": False})
+
+        render(device_config)
+
+        assert not clock._frame_cache
+
+    def test_shrinking_evicts_frames(self, device_config):
+        render(device_config)
+        assert clock._frame_cache
+
+        device_config.update_value("clock_frame_cache", {"max_mb": 0})
+        configure_frame_cache(device_config)
+
+        assert not clock._frame_cache
+        assert clock._frame_cache_bytes == 0
@@ -0,0 +1,29 @@
+import pickle
+
+from plugin_sandbox import PluginSandbox
+
+CLOCK_SETTINGS = {"selectedClockFace": "Cyfrowy Zegar", "primaryColor": "#ffffff", "secondaryColor": "#000000"}
+
+class TestConfig:
+
+    def test_pickle_round_trip(self, device_config):
+        device_config.update_value("time_format", "12h", write=True)
+
+        restored = pickle.loads(pickle.dumps(device_config))
+
+        assert restored.get_config("time_format") == "12h"
+        assert restored.version == device_config.version
+        assert restored.get_snapshot().version == device_config.version
+        assert restored.get_snapshot().get_config("time_format") == "12h"
+        with restored.lock:
+            restored.update_value("time_format", "24h")
+
+    def test_sandboxed_generate_image(self, device_config):
+        sandbox = PluginSandbox(timeout_seconds=60)
+        try:
+            settings = dict(CLOCK_SETTINGS)
+            image = sandbox.generate_image(device_config.get_plugin("clock"), settings, device_config)
+        finally:
+            sandbox.stop()
+
+        assert image.size == (400, 300)
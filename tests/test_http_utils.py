@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from utils import http_utils
+from utils.http_utils import COALESCED_REQUESTS
+
+URL = "https://api.example.com/forecast?b=2&a=1"
+
+class FakeResponse:
+    def __init__(self, ok=True):
+        self.ok = ok
+
+class FakeUpstream:
+    """Replaces requests.request, counting the requests sent and optionally holding them."""
+
+    def __init__(self, monkeypatch):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.results = []
+        monkeypatch.setattr(http_utils.requests, "request", self)
+
+    def __call__(self, method, url, **kwargs):
+        self.calls += 1
+        self.release.wait(timeout=10)
+        result = self.results.pop(0) if self.results else FakeResponse()
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+@pytest.fixture
+def upstream(monkeypatch):
+    monkeypatch.setattr(http_utils, "_flights", {})
+    monkeypatch.setattr(http_utils, "_connectivity", None)
+    return FakeUpstream(monkeypatch)
+
+def coalesced(reason):
+    return COALESCED_REQUESTS.values.get(("api.example.com", reason), 0)
+
+class TestSingleFlight:
+
+    def test_concurrent_requests_share_one_call(self, upstream):
+        upstream.release.clear()
+        before = coalesced("in_flight") + coalesced("fresh")
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(http_utils.get(URL))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        # the first request is sent, the others wait for it
+        while upstream.calls == 0:
+            time.sleep(0.001)
+        upstream.release.set()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert upstream.calls == 1
+        assert len(responses) == 5 and all(response is responses[0] for response in responses)
+        # threads started after the response arrived share it as a fresh response
+        assert coalesced("in_flight") + coalesced("fresh") - before == 4
+
+    def test_fresh_response_is_shared(self, upstream):
+        fresh = coalesced("fresh")
+        first = http_utils.get(URL)
+
+        assert http_utils.get("https://API.example.com/forecast?a=1&b=2") is first
+        assert upstream.calls == 1
+        assert coalesced("fresh") - fresh == 1
+
+    def test_expired_response_is_sent_again(self, upstream):
+        http_utils.get(URL, max_age=0)
+        http_utils.get(URL, max_age=0)
+
+        assert upstream.calls == 2
+
+    def test_auth_scope_is_not_shared(self, upstream):
+        http_utils.get(URL, headers={"Authorization": "Bearer a"})
+        http_utils.get(URL, headers={"Authorization": "Bearer b"})
+
+        assert upstream.calls == 2
+
+    def test_failures_are_not_shared(self, upstream):
+        upstream.results = [requests.ConnectionError("unreachable"), FakeResponse(ok=False)]
+        with pytest.raises(requests.ConnectionError):
+            http_utils.get(URL)
+        assert not http_utils.get(URL).ok
+
+        assert http_utils.get(URL).ok
+        assert upstream.calls == 3
+
+    def test_connection_failure_marks_offline(self, upstream):
+        marked = []
+
+        class Monitor:
+            def mark_offline(self):
+                marked.append(True)
+
+        http_utils.configure_connectivity(Monitor())
+        upstream.results = [requests.Timeout("slow")]
+        with pytest.raises(requests.Timeout):
+            http_utils.get(URL)
+
+        assert marked == [True]
+
+    def test_interrupted_request_raises_original_error(self, upstream):
+        upstream.results = [KeyboardInterrupt()]
+        with pytest.raises(KeyboardInterrupt):
+            http_utils.get(URL)
+
+        assert http_utils.get(URL).ok
+        assert upstream.calls == 2
+
+    def test_is_connection_error_follows_wrapped_errors(self):
+        try:
+            try:
+                raise requests.ConnectionError("unreachable")
+            except requests.ConnectionError:
+                raise RuntimeError("Weather request failure")
+        except RuntimeError as e:
+            assert http_utils.is_connection_error(e)
+        assert not http_utils.is_connection_error(RuntimeError("bad settings"))
@@ -1,6 +1,7 @@
 import pytest
+from datetime import datetime, timedelta
 
-from src.model import Playlist
+from src.model import Playlist, PlaylistManager, PluginInstance
 
 class TestPlaylist:
 
@@ -49,4 +50,217 @@ class TestPlaylist:
         playlist = Playlist("Test Playlist", start, end)
         assert playlist.is_active(current) == expected
         assert playlist.get_priority() == priority
-        
\ No newline at end of file
+        
+
+    @pytest.mark.parametrize(
+        "start,end,expected",
+        [
+            ("09:00", "15:00", (540, 900)),
+            ("21:00", "03:00", (1260, 180)),
+            ("00:00", "24:00", (0, 1440)),
+        ]
+    )
+    def test_get_minutes(self, start, end, expected):
+        assert Playlist("Test Playlist", start, end).get_minutes() == expected
+
+    @staticmethod
+    def plugin_data(plugin_id, name):
+        return {"plugin_id": plugin_id, "name": name, "plugin_settings": {}, "refresh": {"interval": 3600}}
+
+    def test_find_plugin_index(self):
+        playlist = Playlist("Test Playlist", "00:00", "24:00", [self.plugin_data("clock", "Clock")])
+        assert playlist.find_plugin("clock", "Clock").name == "Clock"
+
+        assert playlist.add_plugin(self.plugin_data("weather", "Weather"))
+        assert not playlist.add_plugin(self.plugin_data("weather", "Weather"))
+        assert playlist.find_plugin("weather", "Weather") is playlist.plugins[1]
+        assert playlist.find_plugin("clock", "Weather") is None
+
+        assert playlist.update_plugin("weather", "Weather", {"name": "Forecast"})
+        assert playlist.find_plugin("weather", "Weather") is None
+        assert playlist.find_plugin("weather", "Forecast") is playlist.plugins[1]
+
+        assert playlist.delete_plugin("weather", "Forecast")
+        assert playlist.find_plugin("weather", "Forecast") is None
+        assert not playlist.delete_plugin("weather", "Forecast")
+        assert playlist.find_plugin("clock", "Clock") is playlist.plugins[0]
+
+    def test_peek_next_plugin(self):
+        playlist = Playlist("Test Playlist", "00:00", "24:00", [self.plugin_data("clock", "Clock"), self.plugin_data("weather", "Weather")])
+        assert playlist.peek_next_plugin().name == "Clock"
+        assert playlist.get_next_plugin().name == "Clock"
+        assert playlist.peek_next_plugin().name == "Weather"
+        assert playlist.get_next_plugin().name == "Weather"
+        assert playlist.peek_next_plugin().name == "Clock"
+        assert Playlist("Empty", "00:00", "24:00").peek_next_plugin() is None
+
+    def test_slots(self):
+        playlist = Playlist("Test Playlist", "00:00", "24:00", [self.plugin_data("clock", "Clock")])
+        with pytest.raises(AttributeError):
+            playlist.unknown = True
+        with pytest.raises(AttributeError):
+            playlist.plugins[0].unknown = True
+
+class TestPlaylistManager:
+
+    PLAYLISTS = [
+        ("Default", "00:00", "24:00"),
+        ("Morning", "06:00", "10:00"),
+        ("Breakfast", "07:00", "08:00"),
+        ("Night", "22:00", "02:00"),
+        ("Same Length", "23:00", "03:00"),
+        ("Empty", "12:00", "12:00"),
+    ]
+
+    def create_manager(self, playlists=PLAYLISTS):
+        manager = PlaylistManager()
+        for name, start, end in playlists:
+            manager.add_playlist(name, start, end)
+        return manager
+
+    @staticmethod
+    def brute_force_active_playlist(manager, current_time):
+        active = [p for p in manager.playlists if p.is_active(current_time)]
+        active.sort(key=lambda p: p.get_priority())
+        return active[0] if active else None
+
+    def test_timeline_matches_every_minute(self):
+        manager = self.create_manager()
+        for minute in range(24 * 60):
+            current_dt = datetime(2025, 1, 1, minute // 60, minute % 60)
+            expected = self.brute_force_active_playlist(manager, current_dt.strftime("%H:%M"))
+            assert manager.determine_active_playlist(current_dt) is expected
+
+    @pytest.mark.parametrize(
+        "current,expected",
+        [
+            ("05:30", "Default"),
+            ("06:00", "Morning"),
+            ("07:15", "Breakfast"),
+            ("08:00", "Morning"),
+            ("22:30", "Night"),
+            ("23:30", "Night"),          # same length as 'Same Length', listed first
+            ("02:30", "Same Length"),
+            ("12:00", "Default"),
+        ]
+    )
+    def test_determine_active_playlist(self, current, expected):
+        manager = self.create_manager()
+        hour, minute = map(int, current.split(":"))
+        assert manager.determine_active_playlist(datetime(2025, 1, 1, hour, minute)).name == expected
+
+    def test_no_active_playlist(self):
+        manager = self.create_manager([("Morning", "06:00", "10:00")])
+        assert manager.determine_active_playlist(datetime(2025, 1, 1, 11, 0)) is None
+
+    @pytest.mark.parametrize(
+        "current,expected",
+        [
+            ("05:30:20", datetime(2025, 1, 1, 6, 0)),
+            ("07:15:00", datetime(2025, 1, 1, 8, 0)),
+            ("21:59:59", datetime(2025, 1, 1, 22, 0)),
+            ("23:30:00", datetime(2025, 1, 2, 2, 0)),   # wraps past midnight
+        ]
+    )
+    def test_get_next_transition(self, current, expected):
+        manager = self.create_manager()
+        current_dt = datetime.strptime(f"2025-01-01 {current}", "%Y-%m-%d %H:%M:%S")
+        assert manager.get_next_transition(current_dt) == expected
+
+    def test_no_transition_with_single_playlist(self):
+        manager = self.create_manager([("Default", "00:00", "24:00")])
+        assert manager.get_next_transition(datetime(2025, 1, 1, 12, 0)) is None
+
+    def test_timeline_rebuilt_on_change(self):
+        manager = self.create_manager([("Default", "00:00", "24:00")])
+        current_dt = datetime(2025, 1, 1, 9, 0)
+        assert manager.determine_active_playlist(current_dt).name == "Default"
+
+        manager.add_playlist("Work", "08:00", "16:00")
+        assert manager.determine_active_playlist(current_dt).name == "Work"
+
+        manager.update_playlist("Work", "Work", "10:00", "16:00")
+        assert manager.determine_active_playlist(current_dt).name == "Default"
+        assert manager.get_next_transition(current_dt) == datetime(2025, 1, 1, 10, 0)
+
+        manager.update_playlist("Work", "Work", "08:00", "16:00")
+        manager.delete_playlist("Work")
+        assert manager.determine_active_playlist(current_dt).name == "Default"
+
+    def test_get_playlist_index(self):
+        manager = self.create_manager([("Default", "00:00", "24:00"), ("Work", "08:00", "16:00")])
+        assert manager.get_playlist("Work") is manager.playlists[1]
+
+        manager.update_playlist("Work", "Office", "08:00", "16:00")
+        assert manager.get_playlist("Work") is None
+        assert manager.get_playlist("Office") is manager.playlists[1]
+
+        manager.delete_playlist("Office")
+        assert manager.get_playlist("Office") is None
+        assert manager.get_playlist("Default") is manager.playlists[0]
+
+    def test_find_plugin_across_playlists(self):
+        manager = self.create_manager([("Default", "00:00", "24:00"), ("Work", "08:00", "16:00")])
+        plugin_data = TestPlaylist.plugin_data("clock", "Clock")
+        assert manager.add_plugin_to_playlist("Work", plugin_data)
+        assert manager.find_plugin("clock", "Clock") is manager.get_playlist("Work").plugins[0]
+
+        manager.get_playlist("Work").delete_plugin("clock", "Clock")
+        assert manager.find_plugin("clock", "Clock") is None
+
+    def test_playlists_not_shared_between_managers(self):
+        first, second = PlaylistManager(), PlaylistManager()
+        first.add_default_playlist()
+        assert second.playlists == []
+
+class TestPluginInstance:
+
+    @staticmethod
+    def create_instance(refresh):
+        return PluginInstance("github", "Stars", {}, refresh, latest_refresh_time="2025-01-01T12:00:00")
+
+    def test_fixed_interval_ignores_history(self):
+        instance = self.create_instance({"interval": 300})
+        assert instance.record_refresh("a")
+        assert instance.record_refresh("a")
+        assert instance.get_refresh_interval() == 300
+        assert instance.refresh_history is None
+
+    def test_adaptive_backoff_and_reset(self):
+        instance = self.create_instance({"interval": 300, "adaptive": {"max_interval": 3600}})
+        assert instance.record_refresh("a", "data")
+        assert instance.get_refresh_interval() == 300
+
+        intervals = []
+        for _ in range(6):
+            assert not instance.record_refresh("a", "data")
+            intervals.append(instance.get_refresh_interval())
+        assert intervals == [600, 1200, 2400, 3600, 3600, 3600]
+
+        # changed data alone counts as a change
+        assert instance.record_refresh("a", "new data")
+        assert instance.get_refresh_interval() == 300
+
+    def test_adaptive_default_cap(self):
+        instance = self.create_instance({"interval": 60, "adaptive": {}})
+        instance.record_refresh("a")
+        for _ in range(100):
+            instance.record_refresh("a")
+        assert instance.get_refresh_interval() == 60 * PluginInstance.DEFAULT_ADAPTIVE_MAX_FACTOR
+
+    def test_should_refresh_uses_adaptive_interval(self):
+        instance = self.create_instance({"interval": 300, "adaptive": {"max_interval": 3600}})
+        latest_refresh = instance.get_latest_refresh_dt()
+        assert instance.should_refresh(latest_refresh + timedelta(seconds=300))
+
+        instance.record_refresh("a")
+        instance.record_refresh("a")
+        assert not instance.should_refresh(latest_refresh + timedelta(seconds=300))
+        assert instance.should_refresh(latest_refresh + timedelta(seconds=600))
+
+    def test_history_round_trip(self):
+        instance = self.create_instance({"interval": 300, "adaptive": {}})
+        instance.record_refresh("a")
+        instance.record_refresh("a")
+        restored = PluginInstance.from_dict(instance.to_dict())
+        assert restored.get_refresh_interval() == 600
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from flask import Flask
+
+from blueprints.playlist import playlist_bp
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def client(device_config, monkeypatch):
+    monkeypatch.setenv("PROJECT_DIR", PROJECT_DIR)
+
+    app = Flask(__name__)
+    app.register_blueprint(playlist_bp)
+    app.config["DEVICE_CONFIG"] = device_config
+    return app.test_client()
+
+@pytest.fixture
+def writes(device_config, monkeypatch):
+    """Counts the config writes."""
+    calls = []
+    write_config = device_config.write_config
+
+    def counting_write_config():
+        calls.append(1)
+        write_config()
+
+    monkeypatch.setattr(device_config, "write_config", counting_write_config)
+    return calls
+
+CREATE_MORNING = {"op": "create_playlist", "playlist_name": "Morning", "start_time": "06:00", "end_time": "09:00"}
+ADD_CLOCK = {"op": "add_plugin", "playlist_name": "Morning", "plugin_id": "clock", "instance_name": "Clock",
+             "refresh": {"interval": 3600}, "plugin_settings": {}}
+
+def playlist_names(device_config):
+    return [playlist.name for playlist in device_config.get_playlist_manager().playlists]
+
+class TestBatch:
+
+    def test_applies_operations_with_one_write(self, client, device_config, writes):
+        response = client.post("/api/batch", json={"operations": [CREATE_MORNING, ADD_CLOCK]})
+
+        assert response.status_code == 200
+        assert [result["success"] for result in response.get_json()["results"]] == [True, True]
+        assert len(writes) == 1
+        assert device_config.get_playlist_manager().find_plugin("clock", "Clock") is not None
+        assert device_config.get_snapshot().get_playlist_manager().get_playlist("Morning") is not None
+
+    def test_dry_run_validates_without_applying(self, client, device_config, writes):
+        response = client.post("/api/batch", json={"dry_run": True, "operations": [CREATE_MORNING, ADD_CLOCK]})
+
+        assert response.status_code == 200
+        assert response.get_json()["dry_run"] is True
+        assert playlist_names(device_config) == ["Default"]
+        assert not writes
+
+    @pytest.mark.parametrize("operation", [
+        {"op": ["create_playlist"]},
+        {"op": "rename_everything"},
+        dict(ADD_CLOCK, refresh={"interval": 3600, "adaptive": None}),
+        dict(ADD_CLOCK, refresh={"interval": 3600, "adaptive": {"max_interval": 60}}),
+        dict(ADD_CLOCK, playlist_name="Missing"),
+    ])
+    def test_failed_operation_applies_nothing(self, client, device_config, writes, operation):
+        response = client.post("/api/batch", json={"operations": [CREATE_MORNING, operation]})
+
+        results = response.get_json()["results"]
+        assert response.status_code == 400
+        assert [result["success"] for result in results] == [True, False]
+        assert results[1]["error"]
+        assert playlist_names(device_config) == ["Default"]
+        assert not writes
+
+    def test_failed_write_restores_playlists(self, client, device_config, monkeypatch):
+        version = device_config.get_snapshot().version
+
+        def failing_write_config():
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(device_config, "write_config", failing_write_config)
+        response = client.post("/api/batch", json={"operations": [CREATE_MORNING, ADD_CLOCK]})
+
+        assert response.status_code == 500
+        assert len(response.get_json()["results"]) == 2
+        assert playlist_names(device_config) == ["Default"]
+        assert device_config.get_snapshot().version == version
+
+    def test_failed_config_file_write_keeps_config(self, client, device_config, monkeypatch):
+        version = device_config.get_snapshot().version
+        playlist_config = device_config.get_config("playlist_config")
+        monkeypatch.setattr(type(device_config), "config_file", os.path.join(str(device_config.config_file), "missing", "device.json"))
+
+        response = client.post("/api/batch", json={"operations": [CREATE_MORNING]})
+
+        assert response.status_code == 500
+        assert device_config.get_config("playlist_config") == playlist_config
+        assert device_config.get_snapshot().version == version
+        assert playlist_names(device_config) == ["Default"]
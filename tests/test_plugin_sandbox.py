@@ -0,0 +1,70 @@
+import os
+import socket
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import plugin_sandbox
+from plugin_sandbox import PluginSandbox, PEAK_RSS
+
+SRC_DIR = os.path.dirname(os.path.abspath(plugin_sandbox.__file__))
+
+CLOCK_SETTINGS = {"selectedClockFace": "Cyfrowy Zegar", "primaryColor": "#ffffff", "secondaryColor": "#000000"}
+
+@pytest.fixture
+def sandbox():
+    sandbox = PluginSandbox(timeout_seconds=60)
+    yield sandbox
+    sandbox.stop()
+
+class TestPluginSandbox:
+
+    def test_generate_image_exports_peak_rss(self, sandbox, device_config):
+        image = sandbox.generate_image(device_config.get_plugin("clock"), dict(CLOCK_SETTINGS), device_config)
+
+        assert image.size == (400, 300)
+        assert PEAK_RSS.get(plugin_id="clock") > 0
+
+    def test_plugin_error_keeps_worker(self, sandbox, device_config):
+        with pytest.raises(RuntimeError, match="No images provided"):
+            sandbox.generate_image(device_config.get_plugin("image_upload"), {"imageFiles[]": []}, device_config)
+        process = sandbox.process
+
+        sandbox.generate_image(device_config.get_plugin("clock"), dict(CLOCK_SETTINGS), device_config)
+
+        assert sandbox.process is process
+
+    def test_timeout_kills_worker(self, sandbox, device_config):
+        # accepts connections but never answers
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        sandbox.timeout_seconds = 1
+        try:
+            with pytest.raises(RuntimeError, match="timed out"):
+                sandbox.generate_image(device_config.get_plugin("image_url"),
+                                       {"url": f"http://127.0.0.1:{server.getsockname()[1]}/image.png"}, device_config)
+        finally:
+            server.close()
+
+        assert sandbox.process is None
+
+    def test_browser_lifts_address_space_limit(self):
+        script = textwrap.dedent(f"""
+            import resource, subprocess, sys
+            sys.path.insert(0, {SRC_DIR!r})
+            from plugin_sandbox import _limit_address_space
+            from utils.image_utils import lift_address_space_limit
+            _limit_address_space(256)
+            child = subprocess.run([sys.executable, "-c", "import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0])"],
+                                   stdout=subprocess.PIPE, text=True, preexec_fn=lift_address_space_limit)
+            soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+            print(soft, hard, child.stdout.strip())
+        """)
+        output = subprocess.run([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True, check=True).stdout
+        soft, hard, child_soft = (int(value) for value in output.split())
+
+        assert soft == 256 * 1024 * 1024
+        assert child_soft == hard
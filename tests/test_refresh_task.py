@@ -0,0 +1,109 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from PIL import Image
+
+from refresh_task import PlaylistRefresh
+
+class FakePlugin:
+    """Generates a blank image, optionally running a hook while it does."""
+
+    def __init__(self, during_generate=None):
+        self.during_generate = during_generate
+        self.settings_seen = []
+
+    def generate_image(self, settings, device_config):
+        self.settings_seen.append(settings)
+        if self.during_generate:
+            self.during_generate(settings)
+        return Image.new("RGB", (40, 30), "white")
+
+@pytest.fixture
+def playlist(device_config):
+    os.makedirs(device_config.plugin_image_dir, exist_ok=True)
+    playlist_manager = device_config.get_playlist_manager()
+    playlist_manager.add_playlist("Default", "00:00", "24:00")
+    playlist = playlist_manager.get_playlist("Default")
+    playlist.add_plugin({"plugin_id": "image_upload", "name": "Photos",
+                         "plugin_settings": {"imageFiles[]": ["a.jpg", "b.jpg"], "image_index": 0},
+                         "refresh": {"interval": 3600}})
+    device_config.write_config()
+    return playlist
+
+def now():
+    return datetime.now(timezone.utc)
+
+class TestPlaylistRefresh:
+
+    def test_applies_settings_changed_by_plugin(self, device_config, playlist):
+        plugin_instance = playlist.find_plugin("image_upload", "Photos")
+        original_settings = plugin_instance.settings
+        plugin = FakePlugin(during_generate=lambda settings: settings.update(image_index=1))
+
+        PlaylistRefresh(playlist, plugin_instance, force=True).execute(plugin, device_config, now())
+
+        assert plugin.settings_seen[0] is not original_settings
+        assert plugin_instance.settings["image_index"] == 1
+        assert plugin_instance.latest_refresh_time is not None
+
+    def test_keeps_settings_replaced_during_generation(self, device_config, playlist):
+        plugin_instance = playlist.find_plugin("image_upload", "Photos")
+
+        def edit_from_web_thread(settings):
+            settings["image_index"] = 1
+            with device_config.lock:
+                plugin_instance.settings = {"imageFiles[]": ["c.jpg"]}
+                device_config.write_config()
+
+        PlaylistRefresh(playlist, plugin_instance, force=True).execute(
+            FakePlugin(during_generate=edit_from_web_thread), device_config, now())
+
+        assert plugin_instance.settings == {"imageFiles[]": ["c.jpg"]}
+        assert plugin_instance.latest_refresh_time is not None
+
+    def test_concurrent_writers_and_refresh(self, device_config, playlist):
+        plugin_instance = playlist.find_plugin("image_upload", "Photos")
+        errors = []
+        done = threading.Event()
+
+        def run(target):
+            try:
+                target()
+            except Exception as e:
+                errors.append(e)
+                done.set()
+
+        def write():
+            for index in range(200):
+                with device_config.lock:
+                    plugin_instance.settings = {"imageFiles[]": ["a.jpg"], "image_index": index}
+                    device_config.write_config()
+            done.set()
+
+        def refresh():
+            plugin = FakePlugin(during_generate=lambda settings: settings.update(image_index=-1))
+            while not done.is_set():
+                PlaylistRefresh(playlist, plugin_instance, force=True).execute(plugin, device_config, now())
+                with device_config.lock:
+                    device_config.write_config()
+
+        def read():
+            version = 0
+            while not done.is_set():
+                snapshot = device_config.get_snapshot()
+                assert snapshot.version >= version
+                version = snapshot.version
+                # the model objects of a snapshot match the config they were published with
+                assert snapshot.get_playlist_manager().to_dict() == snapshot.get_config("playlist_config")
+
+        threads = [threading.Thread(target=run, args=(target,)) for target in (write, refresh, read)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        assert not errors
+        assert not any(thread.is_alive() for thread in threads)
+        assert device_config.get_snapshot().get_config("playlist_config") == device_config.get_playlist_manager().to_dict()
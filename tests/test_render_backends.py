@@ -0,0 +1,116 @@
+import os
+import shutil
+
+import pytest
+from PIL import Image, ImageChops
+
+from plugins.base_plugin import base_plugin
+from plugins.plugin_registry import load_plugins, get_plugin_instance
+
+requires_chromium = pytest.mark.skipif(shutil.which("chromium-headless-shell") is None,
+                                       reason="chromium-headless-shell is not installed")
+
+# maximum share of pixels allowed to differ between the backends
+THRESHOLD = 0.03
+
+RESOLUTIONS = [
+    [400, 300], # Inky wHAT
+    [800, 480], # Inky Impression 7.3"
+    [480, 800], # Inky Impression 7.3" vertical
+]
+
+# pixels whose channels differ by less than this are considered equal, absorbing antialiasing
+PIXEL_TOLERANCE = 48
+
+STYLE_SETTINGS = [
+    {"selectedFrame": "None", "backgroundOption": "color", "backgroundColor": "#ffffff", "textColor": "#000000"},
+    {"selectedFrame": "Rectangle", "backgroundOption": "color", "backgroundColor": "#ffffff", "textColor": "#000000", "margin": "20"},
+    {"selectedFrame": "Corner", "backgroundOption": "color", "backgroundColor": "#000000", "textColor": "#ffffff"},
+    {"selectedFrame": "Top and Bottom", "backgroundOption": "color", "backgroundColor": "#ffffff", "textColor": "#ff0000"},
+]
+
+SAMPLES = [
+    ("countdown", "countdown.html", "countdown.css", {
+        "title": "Wakacje", "date": "01 lipca 2026", "day_count": 42, "label": "Pozostało dni"
+    }),
+    ("year_progress", "year_progress.html", "year_progress.css", {
+        "year": 2026, "year_percent": 79, "days_left": 73
+    }),
+    ("todo_list", "todo_list.html", "todo_list.css", {
+        "title": "Zadania", "list_style": "disc", "font_scale": 1,
+        "lists": [
+            {"title": "Dom", "elements": ["Kupić mleko", "Zrobić pranie", "Posprzątać kuchnię", "Podlać kwiaty"]},
+            {"title": "Praca", "elements": ["Raport kwartalny", "Spotkanie z zespołem"]}
+        ]
+    }),
+    ("github", "github_stars.html", "github.css", {
+        "repository": "fatihak/InkyPi", "stars": 1234
+    }),
+    ("github", "github_sponsors.html", "github.css", {
+        "username": "fatihak", "total_per_month": 321
+    }),
+    ("ai_text", "ai_text.html", "ai_text.css", {
+        "title": "Dziś w historii",
+        "content": "W 1969 roku człowiek po raz pierwszy postawił stopę na Księżycu, zmieniając postrzeganie kosmosu."
+    }),
+]
+
+def compare(chromium_image, native_image):
+    """Returns the share of pixels that differ between the two images."""
+    diff = ImageChops.difference(chromium_image.convert("RGB"), native_image.convert("RGB")).convert("L")
+    mask = diff.point(lambda value: 255 if value > PIXEL_TOLERANCE else 0)
+    changed = mask.histogram()[255]
+    return changed / (mask.width * mask.height), mask
+
+@pytest.fixture
+def plugins(device_config, monkeypatch):
+    monkeypatch.setattr("utils.render_cache._enabled", False)
+    monkeypatch.setattr(base_plugin, "_render_backends", {})
+    load_plugins(device_config.get_plugins())
+    return lambda plugin_id: get_plugin_instance({"id": plugin_id})
+
+class TestRenderBackendSelection:
+
+    def test_plugin_info_default(self, plugins):
+        assert plugins("countdown").get_render_backend() == "chromium"
+
+    def test_selected_in_device_config(self, plugins, device_config):
+        device_config.update_value("render_backends", {"countdown": "native"})
+        base_plugin.configure_render_backends(device_config)
+
+        assert plugins("countdown").get_render_backend() == "native"
+        assert plugins("year_progress").get_render_backend() == "chromium"
+
+    def test_native_backend_renders_without_browser(self, plugins, device_config, monkeypatch):
+        device_config.update_value("render_backends", {"countdown": "native"})
+        base_plugin.configure_render_backends(device_config)
+        monkeypatch.setattr(base_plugin.BasePlugin, "render_html", lambda *args: pytest.fail("rendered with chromium"))
+        _, html_file, css_file, params = SAMPLES[0]
+
+        image = plugins("countdown").render_image((400, 300), html_file, css_file, dict(params, plugin_settings=STYLE_SETTINGS[0]))
+
+        assert image.size == (400, 300)
+
+@requires_chromium
+@pytest.mark.parametrize("resolution", RESOLUTIONS, ids=lambda resolution: f"{resolution[0]}x{resolution[1]}")
+@pytest.mark.parametrize("style", STYLE_SETTINGS, ids=lambda style: style["selectedFrame"])
+@pytest.mark.parametrize("plugin_id,html_file,css_file,params", SAMPLES, ids=[sample[1] for sample in SAMPLES])
+def test_native_matches_chromium(plugins, tmp_path, plugin_id, html_file, css_file, params, style, resolution):
+    """The native render of each sample differs from its Chromium screenshot in few pixels."""
+    plugin = plugins(plugin_id)
+    template_params = dict(params, plugin_settings=style)
+    native_image = plugin.render_native(tuple(resolution), html_file, dict(template_params))
+    assert native_image is not None, f"{plugin_id} has no native implementation of {html_file}"
+    chromium_image = plugin.render_html(tuple(resolution), html_file, css_file, dict(template_params))
+    assert chromium_image is not None, "Chromium render failed"
+
+    changed, mask = compare(chromium_image, native_image)
+    if changed > THRESHOLD:
+        # the pair side by side with the differing pixels, for inspection
+        width, height = resolution
+        sheet = Image.new("RGB", (width * 3, height), "white")
+        sheet.paste(chromium_image.convert("RGB"), (0, 0))
+        sheet.paste(native_image.convert("RGB"), (width, 0))
+        sheet.paste(mask.convert("RGB"), (width * 2, 0))
+        sheet.save(os.path.join(tmp_path, "diff.png"))
+    assert changed <= THRESHOLD, f"{changed * 100:.2f}% pixels differ, see {tmp_path / 'diff.png'}"
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from PIL import Image
+
+from utils import render_cache
+from utils.render_cache import compute_render_digest, get_cached_render, put_cached_render, get_hit_rates
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_cache, "RENDER_CACHE_DIR", str(tmp_path / "renders"))
+    monkeypatch.setattr(render_cache, "_max_entries", render_cache.DEFAULT_MAX_ENTRIES)
+    return tmp_path / "renders"
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / "plugin.html"
+    path.write_text("<html></html>")
+    return str(path)
+
+def digest(template, params, dimensions=(800, 480), backend="html", volatile_params=()):
+    return compute_render_digest("weather", backend, dimensions, [template], [], params, volatile_params)
+
+class TestRenderDigest:
+
+    def test_stable_for_equal_inputs(self, template):
+        assert digest(template, {"a": 1, "b": [1, 2]}) == digest(template, {"b": [1, 2], "a": 1})
+
+    @pytest.mark.parametrize("changes", [
+        {"params": {"a": 2}},
+        {"dimensions": (480, 800)},
+        {"backend": "native"},
+    ])
+    def test_changes_with_inputs(self, template, changes):
+        arguments = {"params": {"a": 1}, **changes}
+        assert digest(template, **arguments) != digest(template, {"a": 1})
+
+    def test_changes_with_template_file(self, template):
+        before = digest(template, {"a": 1})
+        os.utime(template, (1000, 1000))
+        assert digest(template, {"a": 1}) != before
+
+    def test_ignores_volatile_params(self, template):
+        first = digest(template, {"a": 1, "now": "10:00"}, volatile_params=("now",))
+        assert first == digest(template, {"a": 1, "now": "10:05"}, volatile_params=("now",))
+        assert digest(template, {"a": 1, "now": "10:00"}) != digest(template, {"a": 1, "now": "10:05"})
+
+class TestRenderCache:
+
+    def test_hit_returns_stored_image(self, cache_dir):
+        image = Image.new("RGB", (20, 10), "red")
+        assert get_cached_render("abc", plugin_id="test_hit") is None
+
+        put_cached_render("abc", image)
+        cached = get_cached_render("abc", plugin_id="test_hit")
+
+        assert cached.size == image.size
+        assert cached.getpixel((0, 0)) == (255, 0, 0)
+
+    def test_hit_rates(self, cache_dir):
+        put_cached_render("abc", Image.new("RGB", (2, 2)))
+        get_cached_render("missing", plugin_id="test_rates")
+        for _ in range(3):
+            get_cached_render("abc", plugin_id="test_rates")
+
+        assert get_hit_rates()["test_rates"] == 0.75
+
+    def test_evicts_least_recently_used(self, cache_dir, monkeypatch):
+        monkeypatch.setattr(render_cache, "_max_entries", 2)
+        put_cached_render("old", Image.new("RGB", (2, 2)))
+        put_cached_render("used", Image.new("RGB", (2, 2)))
+        os.utime(cache_dir / "old.png", (2000, 2000))
+        os.utime(cache_dir / "used.png", (1000, 1000))
+        # a hit marks the entry as recently used
+        assert get_cached_render("used") is not None
+
+        put_cached_render("new", Image.new("RGB", (2, 2)))
+
+        assert sorted(os.listdir(cache_dir)) == ["new.png", "used.png"]
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from utils import tracing
+from utils.tracing import trace, span, get_traces, get_trace
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_enabled", True)
+    monkeypatch.setattr(tracing, "_traces", tracing.deque(maxlen=5))
+
+class TestTracing:
+
+    def test_records_traces_newest_first(self, enabled):
+        for name in ("first", "second"):
+            with trace("refresh", plugin_id=name):
+                with span("render"):
+                    pass
+
+        traces = get_traces()
+        assert [recorded.root.attributes["plugin_id"] for recorded in traces] == ["second", "first"]
+        assert get_trace(traces[1].id) is traces[1]
+
+    def test_reads_while_recording(self, enabled):
+        errors = []
+        done = threading.Event()
+
+        def record():
+            for _ in range(2000):
+                with trace("refresh"):
+                    pass
+            done.set()
+
+        def read():
+            try:
+                while not done.is_set():
+                    for recorded in get_traces():
+                        get_trace(recorded.id)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=record), threading.Thread(target=read)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        assert not errors
+        assert len(get_traces()) == 5